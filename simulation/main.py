@@ -1,8 +1,38 @@
-from fastapi import FastAPI, Query,HTTPException # type: ignore
+from fastapi import FastAPI, Depends, Query,HTTPException, Request, Response # type: ignore
 from fastapi.middleware.cors import CORSMiddleware  # type: ignore # <-- Add this import
+from fastapi.responses import StreamingResponse # type: ignore
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError # type: ignore
 import numpy as np # type: ignore
-from scipy.stats import gamma
+import scipy.fft # type: ignore
+import scipy.signal # type: ignore
+import scipy.special # type: ignore
+from typing import Dict, List, Optional, Union
+import asyncio
+import concurrent.futures
+import functools
+import gzip
+import inspect
+import itertools
+import json
 import math
+import os
+import struct
+import threading
+from collections import OrderedDict
+
+try:  # optional accelerators, used when installed
+    import orjson # type: ignore
+except ImportError:
+    orjson = None
+try:
+    import brotli # type: ignore
+except ImportError:
+    brotli = None
+try:  # GeoTIFF terrain (SRTM .hgt tiles need nothing more)
+    import rasterio # type: ignore
+    import rasterio.windows # type: ignore
+except ImportError:
+    rasterio = None
 
 app = FastAPI()
 
@@ -23,28 +53,126 @@ def generate_time_array(duration: float, Te: float) -> np.ndarray:
     """Generate centered time array [-duration/2, duration/2) with step Te"""
     return np.arange(-duration/2, duration/2, Te)
 
+# Threads per FFT (scipy.fft workers); -1 uses every core
+FFT_WORKERS = int(os.environ.get("SIM_FFT_WORKERS", -1))
+SPECTRUM_SCALINGS = ("magnitude", "power", "db")
+SPECTRUM_ESTIMATORS = ("fft", "welch")
+DB_FLOOR = 1e-12  # keeps log10 finite on empty bins
+
+
+@functools.lru_cache(maxsize=128)
+def frequency_axis(n: int, Te: float, one_sided: bool = False) -> np.ndarray:
+    """Frequency bins (Hz) of an n-point FFT, in FFT order; cached per (n, Te), read-only."""
+    f = scipy.fft.rfftfreq(n, d=Te) if one_sided else scipy.fft.fftfreq(n, d=Te)
+    f.flags.writeable = False
+    return f
+
 def generate_frequency(
     signal: np.ndarray,
     Te: float,    
+    one_sided: bool = False,
+    window: str = "boxcar",
+    scaling: str = "magnitude",
+    estimator: str = "fft",
+    fast_len: bool = False,
+    nperseg: int = 256,
 ):
     """
     Compute the magnitude spectrum |FFT(signal)| and its frequency axis in Hz.
 
+    Real signals go through a real FFT; the two-sided layout (FFT order, as
+    np.fft.fftfreq) is rebuilt by mirroring the positive half.
+
     Args:
-      signal    : real-valued 1D array of time‑domain samples
+      signal    : 1D array of time‑domain samples (real or complex)
       Te        : sampling interval in seconds
-      one_sided : if True, return only non-negative freqs (0 … Fs/2)
+      one_sided : if True, return only non-negative freqs (0 … Fs/2); real signals only
+      window    : scipy.signal window name applied before the FFT ("boxcar" = none)
+      scaling   : "magnitude" |X|, "power" |X|², or "db" 20·log10|X|
+      estimator : "fft" for one periodogram, "welch" for a Welch-averaged PSD
+      fast_len  : zero-pad to scipy.fft.next_fast_len (denser bins, faster FFT)
+      nperseg   : Welch segment length
 
     Returns:
-      freqs     : list of frequencies in Hz
-      spectrum  : list of magnitudes
+      freqs     : array of frequencies in Hz
+      spectrum  : array of magnitudes (or powers / dB)
     """    
-    signal = np.abs(np.fft.fft(signal))
-    N = signal.size
+    signal = np.asarray(signal)
+    real = np.isrealobj(signal)
+    one_sided = one_sided and real
+    if scaling not in SPECTRUM_SCALINGS:
+        raise HTTPException(400, f"scaling must be one of {', '.join(SPECTRUM_SCALINGS)}")
+    if estimator not in SPECTRUM_ESTIMATORS:
+        raise HTTPException(400, f"estimator must be one of {', '.join(SPECTRUM_ESTIMATORS)}")
+
+    if estimator == "welch":
+        try:
+            f, power = scipy.signal.welch(signal, fs=1 / Te, window=window,
+                                          nperseg=min(nperseg, signal.size),
+                                          return_onesided=one_sided)
+        except ValueError as error:
+            raise HTTPException(400, str(error))
+        if scaling == "magnitude":
+            return f, np.sqrt(power)
+        if scaling == "db":
+            return f, 10 * np.log10(np.maximum(power, DB_FLOOR))
+        return f, power
+
+    if window != "boxcar":
+        try:
+            signal = signal * scipy.signal.get_window(window, signal.size)
+        except ValueError as error:
+            raise HTTPException(400, str(error))
+    N = scipy.fft.next_fast_len(signal.size, real=real) if fast_len else signal.size
+
+    if not real:
+        spectrum = np.abs(scipy.fft.fft(signal, N, workers=FFT_WORKERS))
+    else:
+        spectrum = np.abs(scipy.fft.rfft(signal, N, workers=FFT_WORKERS))
+        if not one_sided:
+            # |X[N-k]| = |X[k]| for real input
+            spectrum = np.concatenate((spectrum, spectrum[1:(N + 1) // 2][::-1]))
+    f = frequency_axis(N, Te, one_sided)
+
+    if scaling == "power":
+        return f, spectrum ** 2
+    if scaling == "db":
+        return f, 20 * np.log10(np.maximum(spectrum, DB_FLOOR))
+    return f, spectrum
+
 
-    f = np.fft.fftfreq(N, d=Te)  
+class SpectrumParams:
+    """
+    Spectrum options shared by every endpoint with a frequency-domain view, injected
+    with Depends(). Options left unset fall back to the endpoint's defaults (`options`).
+    """
 
-    return f, signal
+    def __init__(
+        self,
+        one_sided: Optional[bool] = None,
+        window: str = "boxcar",
+        scaling: Optional[str] = None,
+        estimator: str = "fft",
+        fast_len: bool = False,
+        nperseg: int = Query(256, ge=8),
+    ):
+        self.one_sided = one_sided
+        self.window = window
+        self.scaling = scaling
+        self.estimator = estimator
+        self.fast_len = fast_len
+        self.nperseg = nperseg
+
+    def options(self, one_sided: bool = False, scaling: str = "magnitude") -> dict:
+        """Keyword arguments of generate_frequency."""
+        return {
+            "one_sided": one_sided if self.one_sided is None else self.one_sided,
+            "window": self.window,
+            "scaling": scaling if self.scaling is None else self.scaling,
+            "estimator": self.estimator,
+            "fast_len": self.fast_len,
+            "nperseg": self.nperseg,
+        }
 
 def generate_sinus(t,amplitude:float,freq:float,phase:float) -> np.ndarray:
     return amplitude * np.sin(2 * np.pi * freq * t + phase)
@@ -91,11 +219,126 @@ def validate_positive(**params):
         if value <= 0:
             raise HTTPException(400, f"{name} must be positive")
 
+def make_rng(seed: Optional[int] = None) -> np.random.Generator:
+    """
+    Independent PCG64 generator for one request, so concurrent requests never share
+    the global np.random state. The same seed reproduces the same draws.
+    """
+    if seed is not None and seed < 0:
+        raise HTTPException(400, "seed must be non-negative")
+    return np.random.default_rng(seed)
+
+def is_seeded(params: dict) -> bool:
+    """Cache predicate: stochastic endpoints are pure once their seed is fixed."""
+    return params.get("seed") is not None
+
 def rect(x: np.ndarray) -> np.ndarray:
     """Vectorized rectangular function"""
     return np.where(np.abs(x) <= 0.5, 1, 0).astype(int)
 
-def apply_fading_with_input(input_samples, fading_model, num_paths):
+# --------------------------
+# Convolution
+# --------------------------
+
+# Below this many taps the direct O(N·M) sum beats any FFT-based method
+CONV_DIRECT_MAX_TAPS = 64
+# Signal / taps length ratio from which overlap-add beats one FFT of the whole signal
+CONV_OVERLAP_ADD_RATIO = 8
+
+
+def convolve(signal, taps, mode: str = "full") -> np.ndarray:
+    """
+    Drop-in replacement for np.convolve choosing the strategy by size:
+    direct for short filters, overlap-add when the filter is much shorter than
+    the signal, one FFT of the whole output otherwise.
+
+    Args:
+        signal, taps: 1D real or complex arrays (commutative, as np.convolve)
+        mode: "full" or "same", with the same output length and alignment as np.convolve
+
+    Returns:
+        np.ndarray: the convolution
+    """
+    signal, taps = np.asarray(signal), np.asarray(taps)
+    short, long = sorted((signal.size, taps.size))
+    if short <= CONV_DIRECT_MAX_TAPS:
+        return np.convolve(signal, taps, mode)
+
+    if long >= CONV_OVERLAP_ADD_RATIO * short:
+        full = scipy.signal.oaconvolve(signal, taps)
+    else:
+        full = scipy.signal.fftconvolve(signal, taps)
+    if mode == "full":
+        return full
+    if mode == "same":
+        start = (short - 1) // 2
+        return full[start:start + long]
+    raise ValueError(f"Unsupported convolution mode {mode}")
+
+
+def batch_convolve(signals, taps) -> np.ndarray:
+    """
+    Causal convolution of many signals with many filters along the last axis, the
+    leading axes broadcasting (e.g. one signal (N,) through R channels (R, L)).
+
+    Returns:
+        np.ndarray: (..., N) outputs, the first N samples of each full convolution
+    """
+    signals, taps = np.atleast_2d(signals), np.atleast_2d(taps)
+    n = signals.shape[-1]
+    if taps.shape[-1] <= CONV_DIRECT_MAX_TAPS:
+        shape = np.broadcast_shapes(signals.shape[:-1], taps.shape[:-1]) + (n,)
+        out = np.zeros(shape, dtype=np.result_type(signals, taps))
+        for delay in range(min(taps.shape[-1], n)):
+            out[..., delay:] += taps[..., delay, None] * signals[..., :n - delay]
+        return out
+    return scipy.signal.fftconvolve(signals, taps, axes=-1)[..., :n]
+
+
+class OverlapAddConvolver:
+    """
+    Block convolution of a streamed signal with fixed taps (overlap-add).
+
+    Each call to `process` returns exactly as many output samples as it was given;
+    `flush` returns the remaining len(taps) - 1 samples of the tail. Concatenated,
+    the outputs equal convolve(signal, taps) over the whole stream.
+    """
+
+    def __init__(self, taps, block_size: int = 4096):
+        self.taps = np.asarray(taps)
+        self.block_size = max(int(block_size), self.taps.size)
+        self.nfft = scipy.fft.next_fast_len(self.block_size + self.taps.size - 1)
+        self.spectra = {}                        # taps spectrum per FFT flavour, computed once
+        self.tail = np.zeros(self.taps.size - 1, dtype=np.result_type(self.taps, float))
+
+    def _filter(self, chunk):
+        if np.isrealobj(chunk) and np.isrealobj(self.taps):
+            fft, ifft = scipy.fft.rfft, scipy.fft.irfft
+        else:
+            fft, ifft = scipy.fft.fft, scipy.fft.ifft
+        if fft not in self.spectra:
+            self.spectra[fft] = fft(self.taps, self.nfft)
+        return ifft(fft(chunk, self.nfft) * self.spectra[fft], self.nfft)
+
+    def process(self, block) -> np.ndarray:
+        block = np.asarray(block)
+        self.tail = self.tail.astype(np.result_type(self.tail, block), copy=False)
+        out = np.empty(block.size, dtype=self.tail.dtype)
+        overlap = self.taps.size - 1
+        for start in range(0, block.size, self.block_size):
+            chunk = block[start:start + self.block_size]
+            y = self._filter(chunk)[:chunk.size + overlap]
+            y[:overlap] += self.tail
+            out[start:start + chunk.size] = y[:chunk.size]
+            self.tail = y[chunk.size:]
+        return out
+
+    def flush(self) -> np.ndarray:
+        tail, self.tail = self.tail, np.zeros_like(self.tail)
+        return tail
+
+
+def apply_fading_with_input(input_samples, fading_model, num_paths, rng=None):
     """
     Apply fading to the input_samples.
 
@@ -105,6 +348,8 @@ def apply_fading_with_input(input_samples, fading_model, num_paths):
         11 -> Uniform profile with constant gain (for testing).
         2  -> Exponential profile.
         22 -> Exponential profile with constant gain (for testing).
+
+    rng: np.random.Generator for the Rayleigh gains (a fresh one if None).
     """
     # num_paths = num_paths
 
@@ -125,12 +370,13 @@ def apply_fading_with_input(input_samples, fading_model, num_paths):
     if fading_model in [11, 22]:
         gain = np.sqrt(variance)
     else:
-        gain = (np.random.randn(num_paths) + 1j * np.random.randn(num_paths)) * np.sqrt(variance / 2)
+        rng = make_rng() if rng is None else rng
+        gain = (rng.standard_normal(num_paths) + 1j * rng.standard_normal(num_paths)) * np.sqrt(variance / 2)
         #mean=0 , variance=1
         #np.sqrt(variance / 2) to ensure that is a scaling factor that ensures the resulting complex numbers have the desired variance
         #Var(Z)=Var(X)+Var(Y) for that we divide by 2
 
-    faded_samples = np.convolve(input_samples, gain)
+    faded_samples = convolve(input_samples, gain)
     return faded_samples, gain
 
 def db_to_watts(db: float) -> float:
@@ -158,8 +404,8 @@ def weissberger_loss(distances_km, foliage_depth_km, frequency_MHz):
 
     Args:
         distances_km (np.ndarray): Distance array in kilometers
-        foliage_depth_km (float): Depth of foliage in kilometers
-        frequency_MHz (float): Frequency in MHz
+        foliage_depth_km (float or np.ndarray): Depth of foliage in kilometers
+        frequency_MHz (float or np.ndarray): Frequency in MHz
 
     Returns:
         np.ndarray: Loss in dB
@@ -172,10 +418,10 @@ def hata_loss(f, h_b, h_m, d, environment='urban', city_size='Grande'):
     """
     Calcule l'atténuation de propagation selon le modèle Okumura-Hata.
 
-    :param f: Fréquence en MHz (150 ≤ f ≤ 1500)
-    :param h_b: Hauteur de l'antenne de la station de base en mètres (30 ≤ h_b ≤ 200)
-    :param h_m: Hauteur de l'antenne mobile en mètres (1 ≤ h_m ≤ 10)
-    :param d: Distance entre la station de base et le mobile en km (1 ≤ d ≤ 20)
+    :param f: Fréquence en MHz (150 ≤ f ≤ 1500), scalaire ou tableau
+    :param h_b: Hauteur de l'antenne de la station de base en mètres (30 ≤ h_b ≤ 200), scalaire ou tableau
+    :param h_m: Hauteur de l'antenne mobile en mètres (1 ≤ h_m ≤ 10), scalaire ou tableau
+    :param d: Distance entre la station de base et le mobile en km (1 ≤ d ≤ 20), scalaire ou tableau
     :param environment: Type d'environnement ('urban', 'suburban', 'rural')
     :param city_size: Taille de la ville ('Grande', 'Moyenne/Petite')
     :return: Atténuation en dB
@@ -186,21 +432,19 @@ def hata_loss(f, h_b, h_m, d, environment='urban', city_size='Grande'):
     # f *= 10e6       
     # d *= 1000 
     # Correction selon la hauteur de l'antenne mobile et la taille de la ville
-    if city_size == 'Grande':  
-        if f >= 400*10e6:
-            a_hm = 3.2 * (np.log10(11.75 * h_m))**2 - 4.97
-        else:
-            a_hm = (1.1 * np.log10(f) - 0.7) * h_m - (1.56 * np.log10(f) - 0.8)
-    else:
-        a_hm = (1.1 * np.log10(f) - 0.7) * h_m - (1.56 * np.log10(f) - 0.8)
+    # (toutes les grandeurs acceptent des tableaux NumPy, diffusés entre eux)
+    log_f = np.log10(f)
+    a_hm = (1.1 * log_f - 0.7) * h_m - (1.56 * log_f - 0.8)
+    if city_size == 'Grande':
+        a_hm = np.where(f >= 400*10e6, 3.2 * (np.log10(11.75 * h_m))**2 - 4.97, a_hm)
 
-    L = 69.55 + 26.16 * np.log10(f) - 13.82 * np.log10(h_b) - a_hm \
+    L = 69.55 + 26.16 * log_f - 13.82 * np.log10(h_b) - a_hm \
         + (44.9 - 6.55 * np.log10(h_b)) * np.log10(d)
 
     if environment == 'suburban':
-        L -= 2 * (np.log10(f / 28))**2 - 5.4
+        L = L - (2 * (np.log10(f / 28))**2 - 5.4)
     elif environment == 'rural':
-        L -= 4.78 * (np.log10(f))**2 - 18.33 * np.log10(f) + 40.94
+        L = L - (4.78 * log_f**2 - 18.33 * log_f + 40.94)
 
     return L
 
@@ -210,9 +454,9 @@ def nlos_loss(frequency_MHz, distance_km, delta_nlos=20):
     Calculate NLOS loss in dB with additional attenuation.
 
     Parameters:
-        frequency_MHz (float): Frequency in MHz
+        frequency_MHz (float or np.ndarray): Frequency in MHz
         distance_km (float or np.ndarray): Distance in km
-        delta_nlos (float): Additional attenuation in dB
+        delta_nlos (float or np.ndarray): Additional attenuation in dB
 
     Returns:
         float or np.ndarray: NLOS loss in dB
@@ -230,9 +474,9 @@ def two_ray_ground_loss(d, ht, hr, frequency_MHz):
 
     Paramètres:
         d (float ou array): distance entre émetteur et récepteur en mètres
-        ht (float): hauteur de l'antenne émettrice en mètres
-        hr (float): hauteur de l'antenne réceptrice en mètres
-        frequency_MHz (float): fréquence en MHz
+        ht (float ou array): hauteur de l'antenne émettrice en mètres
+        hr (float ou array): hauteur de l'antenne réceptrice en mètres
+        frequency_MHz (float ou array): fréquence en MHz
 
     Retour:
         L (float ou array): perte de chemin en dB
@@ -253,54 +497,73 @@ def two_ray_ground_loss(d, ht, hr, frequency_MHz):
 
     # choix du modèle selon la distance
     L = np.where(d <= d_c, fspl, two_ray)
-    return L
+    return L[()]  # scalaire si les entrées sont scalaires
 
 
-def rician_path_loss(distance, K=10, path_loss_exp=2.0, freq=900e6, d0=1.0):
+def log_distance_loss(distance, path_loss_exp=2.0, freq=900e6, d0=1.0):
+    """Large-scale log-distance path loss in dB (free space at d0, exponent n beyond)."""
     c = 3e8
     wavelength = c / freq
     PL0 = 20 * np.log10(4 * np.pi * d0 / wavelength)
-    PL = PL0 + 10 * path_loss_exp * np.log10(distance / d0)
+    return PL0 + 10 * path_loss_exp * np.log10(distance / d0)
+
+
+def rician_path_loss(distance, K=10, path_loss_exp=2.0, freq=900e6, d0=1.0, rng=None):
+    """
+    Effective path loss (dB) of a Rician channel: log-distance loss minus one fading draw.
+
+    All arguments may be NumPy arrays and are broadcast together; an
+    independent fading sample is drawn for every element of the result, from `rng`
+    (a fresh np.random.Generator if None).
+    """
+    PL = log_distance_loss(distance, path_loss_exp, freq, d0)
 
     sigma = 1.0
     s = np.sqrt(K / (K + 1))
     sigma_n = np.sqrt(1 / (2 * (K + 1)))
-    fading = np.random.normal(s, sigma_n) + 1j * np.random.normal(0, sigma_n)
+    # one independent fading draw per element of the broadcast result
+    size = np.shape(PL) or None
+    rng = make_rng() if rng is None else rng
+    fading = rng.normal(s, sigma_n, size) + 1j * rng.normal(0, sigma_n, size)
     fading_gain = np.abs(fading)**2
     fading_gain_dB = 10 * np.log10(fading_gain)
 
     return PL - fading_gain_dB  # Effective path loss (dB)
 
 
-def calculate_cost231(f: float, h_bs: float, h_ms: float, d: float, environment: str) -> float:
+def calculate_cost231(f, h_bs, h_ms, d, environment: str):
     """
     Computes the path loss (L) using the COST231-Hata model.
 
     Parameters:
-        f (float): Frequency in MHz (should be between 1500 and 2000 MHz).
-        h_bs (float): Base station height in meters.
-        h_ms (float): Mobile station height in meters.
-        d (float): Distance between BS and MS in kilometers.
+        f (float or np.ndarray): Frequency in MHz (should be between 1500 and 2000 MHz).
+        h_bs (float or np.ndarray): Base station height in meters.
+        h_ms (float or np.ndarray): Mobile station height in meters.
+        d (float or np.ndarray): Distance between BS and MS in kilometers.
         environment (str): 'urban', 'suburban', or 'rural'.
 
+    Array arguments are broadcast together.
+
     Returns:
-        float: Path loss (L) in dB.
+        float or np.ndarray: Path loss (L) in dB.
     """
+    log_f = np.log10(f)
+    log_hbs = np.log10(h_bs)
 
     # Correction factor for mobile antenna height a(h_ms)
-    a_hms = (1.1 * math.log10(f) - 0.7) * h_ms - (1.56 * math.log10(f) - 0.8)
+    a_hms = (1.1 * log_f - 0.7) * h_ms - (1.56 * log_f - 0.8)
 
-    C_values = {"urban": 3, "suburban": 0, "rural": 4.78 * (math.log10(f) ** 2) - 18.33 * math.log10(f) + 40.94}
+    C_values = {"urban": 3, "suburban": 0, "rural": 4.78 * (log_f ** 2) - 18.33 * log_f + 40.94}
     C = C_values.get(environment.lower(), 0)
 
     # COST231-Hata path loss formula
-    L = 46.3 + 33.9 * math.log10(f) - 13.82 * math.log10(h_bs) - a_hms + \
-        (44.9 - 6.55 * math.log10(h_bs)) * math.log10(d) + C
+    L = 46.3 + 33.9 * log_f - 13.82 * log_hbs - a_hms + \
+        (44.9 - 6.55 * log_hbs) * np.log10(d) + C
 
     return L
 
 
-def apply_fading(fading_model, num_paths,max_distance: float = 1000.0):
+def apply_fading(fading_model, num_paths,max_distance: float = 1000.0, rng=None):
     """
     Apply multipath fading to input_samples, but return path-loss (in dB) for each path.
 
@@ -310,6 +573,7 @@ def apply_fading(fading_model, num_paths,max_distance: float = 1000.0):
         11 -> Uniform profile with constant gain (for testing).
         2  -> Exponential profile.
         22 -> Exponential profile with constant gain (for testing).
+    rng: np.random.Generator for the Rayleigh gains (a fresh one if None).
     Returns:
         faded_samples: 1D np.array, result of convolving input with linear gains.
         path_loss_db: 1D np.array of length num_paths, loss per path in dB.
@@ -334,8 +598,9 @@ def apply_fading(fading_model, num_paths,max_distance: float = 1000.0):
     if fading_model in [11, 22]:
         gains = np.sqrt(variance)                      # deterministic
     else:
-        gains = (np.random.randn(num_paths)
-                 + 1j*np.random.randn(num_paths)) \
+        rng = make_rng() if rng is None else rng
+        gains = (rng.standard_normal(num_paths)
+                 + 1j*rng.standard_normal(num_paths)) \
                 * np.sqrt(variance/2)                 # Rayleigh
 
     # compute path-loss in dB:  PL = -20·log10(|gain|)
@@ -343,25 +608,35 @@ def apply_fading(fading_model, num_paths,max_distance: float = 1000.0):
     return path_loss_db , gains , distances
 
 
-def nakagami_fading(m, omega, size):
-    """Generate Nakagami fading samples"""
-    return gamma.rvs(m, scale=np.sqrt(omega / m), size=size)
+def nakagami_fading(m, omega, size, rng=None):
+    """Generate Nakagami fading samples (gamma variates from `rng`, a fresh Generator if None)"""
+    rng = make_rng() if rng is None else rng
+    return rng.gamma(m, scale=np.sqrt(omega / m), size=size)
+
 
+# Climate correction (dB) of calculate_longley_rice_loss, 0 for the other radio climates
+# (see LONGLEY_RICE_REFRACTIVITY for the climates known to the terrain model)
+LONGLEY_RICE_CLIMATE_DB = {
+    'Tempéré continental': 1.0,
+    'Tempéré maritime':   2.0,
+}
 
-def calculate_longley_rice_loss(distance_km: float, frequency_MHz: float, height_tx: float, height_rx: float, terrain_irregularity: float, climate: str) -> float:
+def calculate_longley_rice_loss(distance_km, frequency_MHz, height_tx, height_rx, terrain_irregularity, climate: str):
     """
     Calculate the Longley-Rice propagation loss in dB (simplified version).
 
     Args:
-        distance_km (float): Distance in kilometers
-        frequency_MHz (float): Frequency in MHz
-        height_tx (float): Transmitter height in meters
-        height_rx (float): Receiver height in meters
-        terrain_irregularity (float): Terrain irregularity in meters
+        distance_km (float or np.ndarray): Distance in kilometers
+        frequency_MHz (float or np.ndarray): Frequency in MHz
+        height_tx (float or np.ndarray): Transmitter height in meters
+        height_rx (float or np.ndarray): Receiver height in meters
+        terrain_irregularity (float or np.ndarray): Terrain irregularity in meters
         climate (str): Climate type (e.g., 'Tempéré continental')
 
+    Array arguments are broadcast together.
+
     Returns:
-        float: Loss in dB
+        float or np.ndarray: Loss in dB
     """
     # 1) Convert to SI
     d_m  = distance_km * 1e3       # km → m
@@ -379,15 +654,42 @@ def calculate_longley_rice_loss(distance_km: float, frequency_MHz: float, height
     terrain_dB = 0.1 * terrain_irregularity
 
     # 5) Climate correction (example values)
-    climate_dB = {
-        'Tempéré continental': 1.0,
-        'Tempéré maritime':   2.0
-    }.get(climate, 0.0)
+    climate_dB = LONGLEY_RICE_CLIMATE_DB.get(climate, 0.0)
 
     # 6) Total loss
     total_loss = fspl_dB + terrain_dB + climate_dB - height_gain_dB
     return total_loss
 
+# Additional NLOS attenuation (dB) of the ITU-R P.1411 model per environment
+NLOS_DELTA_DB = {"urban": 20, "suburban": 15, "open": 10}
+
+# Path loss (dB) of every large-scale model with a common signature
+#   model(distance_km, frequency_MHz, height_tx_m, height_rx_m, environment)
+# so that callers can mix models per transmitter. All numeric arguments broadcast.
+PROPAGATION_MODELS = {
+    "fspl":         lambda d, f, h_tx, h_rx, env: nlos_loss(f, d, 0),
+    "itu-r-p1411":  lambda d, f, h_tx, h_rx, env: nlos_loss(f, d, NLOS_DELTA_DB.get(env, 20)),
+    "hata":         lambda d, f, h_tx, h_rx, env: hata_loss(f, h_tx, h_rx, d, env, 'petite/meduim'),
+    "cost231":      lambda d, f, h_tx, h_rx, env: calculate_cost231(f, h_tx, h_rx, d, env),
+    "two-ray":      lambda d, f, h_tx, h_rx, env: two_ray_ground_loss(d * 1000, h_tx, h_rx, f),
+    "longley-rice": lambda d, f, h_tx, h_rx, env: calculate_longley_rice_loss(d, f, h_tx, h_rx, 50, 'Tempéré continental'),
+}
+
+# Published validity range of each model, as inclusive (min, max) per argument of
+# PROPAGATION_MODELS (distance in km, frequency in MHz, heights in m). Missing arguments
+# are unconstrained.
+PROPAGATION_VALIDITY = {
+    "fspl":         {},
+    "itu-r-p1411":  {"frequency_MHz": (300, 100_000), "distance_km": (0, 5)},   # short-range outdoor
+    "hata":         {"frequency_MHz": (150, 1500), "height_tx": (30, 200), "height_rx": (1, 10),
+                     "distance_km": (1, 20)},
+    "cost231":      {"frequency_MHz": (1500, 2000), "height_tx": (30, 200), "height_rx": (1, 10),
+                     "distance_km": (1, 20)},
+    "two-ray":      {},
+    "longley-rice": {"frequency_MHz": (20, 20_000), "height_tx": (0.5, 3000), "height_rx": (0.5, 3000),
+                     "distance_km": (1, 2000)},
+}
+
 def calculate_coverage_radius(distances: np.ndarray, path_loss_db: np.ndarray, threshold_db: float) -> float:
     """
     Finds the maximum distance at which the path loss is still ≤ threshold_db.
@@ -396,18 +698,1794 @@ def calculate_coverage_radius(distances: np.ndarray, path_loss_db: np.ndarray, t
     valid = distances[path_loss_db <= threshold_db]
     return float(valid.max()) if valid.size else 0.0
 
+
+def log_linear_coefficients(loss_fn, d_ref=1.0):
+    """
+    (A, B) such that loss_fn(d) = A + B·log10(d), from evaluations at d_ref and 10·d_ref.
+
+    Exact for log-linear models; d_ref (and 10·d_ref) must lie on the branch of interest.
+    """
+    loss_ref = loss_fn(d_ref)
+    slope = loss_fn(10 * d_ref) - loss_ref   # dB per decade
+    return loss_ref - slope * np.log10(d_ref), slope
+
+
+def propagation_coefficients(model, frequency_MHz, height_tx, height_rx, environment):
+    """
+    Log-linear reduction of a PROPAGATION_MODELS entry: loss = intercept + slope·log10(d_km)
+    up to breakpoint_km, intercept_far + slope_far·log10(d_km) beyond it.
+
+    Only two-ray has a breakpoint (its critical distance); it is inf for the other models.
+    Works element-wise on arrays.
+
+    Returns:
+        (intercept, slope, intercept_far, slope_far, breakpoint_km)
+    """
+    loss_fn = lambda d: PROPAGATION_MODELS[model](d, frequency_MHz, height_tx, height_rx, environment)
+    if model == "two-ray":
+        breakpoint_km = (4 * height_tx * height_rx) / (3e8 / (frequency_MHz * 1e6)) / 1000
+        intercept, slope = log_linear_coefficients(loss_fn, breakpoint_km / 100)
+        intercept_far, slope_far = log_linear_coefficients(loss_fn, 2 * breakpoint_km)
+        return intercept, slope, intercept_far, slope_far, breakpoint_km
+    intercept, slope = log_linear_coefficients(loss_fn)
+    return intercept, slope, intercept, slope, np.inf
+
+
+def propagation_validity(model, distance_km, frequency_MHz, height_tx, height_rx):
+    """True where every argument lies within PROPAGATION_VALIDITY[model]; arrays broadcast."""
+    arguments = {"distance_km": distance_km, "frequency_MHz": frequency_MHz,
+                 "height_tx": height_tx, "height_rx": height_rx}
+    valid = np.ones(np.broadcast_shapes(*(np.shape(value) for value in arguments.values())), dtype=bool)
+    for argument, (low, high) in PROPAGATION_VALIDITY[model].items():
+        valid &= (arguments[argument] >= low) & (arguments[argument] <= high)
+    return valid
+
+
+def invert_log_linear(loss_fn, threshold_db, d_ref=1.0):
+    """
+    Distance at which a model of the form L(d) = A + B·log10(d) reaches threshold_db.
+
+    A and B are recovered exactly from two evaluations (d_ref and 10·d_ref), so any
+    log-linear model (FSPL, Hata, COST231, ITU-R P.1411, Longley-Rice...) can be
+    inverted without knowing its coefficients. Works element-wise on arrays.
+    """
+    intercept, slope = log_linear_coefficients(loss_fn, d_ref)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        return 10 ** ((threshold_db - intercept) / slope)
+
+
+def invert_power_law(loss_fn, threshold_db, d_ref=1.0):
+    """
+    Distance at which a model of the form L(d) = k·d^p reaches threshold_db (e.g. Weissberger).
+    """
+    loss_ref = loss_fn(d_ref)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        exponent = np.log10(loss_fn(10 * d_ref) / loss_ref)
+        return d_ref * (threshold_db / loss_ref) ** (1 / exponent)
+
+
+def bisect_coverage_radius(loss_fn, threshold_db, d_min, d_max, tolerance):
+    """
+    Bracketed bisection for the largest distance in [d_min, d_max] with loss ≤ threshold_db.
+
+    Fallback for models that cannot be inverted analytically. The loss must increase
+    with distance; all arguments may be arrays, every bracket is halved in lock-step
+    and the search stops once the widest bracket is below `tolerance`.
+    """
+    lo, hi, threshold_db = np.broadcast_arrays(
+        np.asarray(d_min, dtype=float), np.asarray(d_max, dtype=float), threshold_db)
+    lo, hi = lo.copy(), hi.copy()
+    width = np.max(hi - lo) if hi.size else 0.0
+    iterations = int(np.ceil(np.log2(width / tolerance))) if width > tolerance else 0
+    for _ in range(iterations):
+        mid = 0.5 * (lo + hi)
+        inside = loss_fn(mid) <= threshold_db
+        lo = np.where(inside, mid, lo)
+        hi = np.where(inside, hi, mid)
+    return lo
+
+
+def solve_coverage_radius(loss_fn, threshold_db, d_min, d_max, inverse=None, tolerance=1e-3):
+    """
+    Largest distance in [d_min, d_max] at which loss_fn(d) ≤ threshold_db, 0.0 if none.
+
+    Args:
+        loss_fn: vectorized callable returning the path loss (dB) at a distance
+        threshold_db: max acceptable path loss (dB)
+        d_min, d_max: search interval, in the units loss_fn expects
+        inverse: analytic inverse `inverse(loss_fn, threshold_db)` (e.g. invert_log_linear);
+                 when None the radius is found by bracketed bisection
+        tolerance: bisection precision, in the units of d; an analytic inverse is exact
+                   (to floating point) and does not use it
+
+    Every argument may be an array (one search per element); the cost is O(1)
+    with an analytic inverse and O(log((d_max - d_min) / tolerance)) otherwise.
+    """
+    loss_near = loss_fn(d_min)
+    loss_far = loss_fn(d_max)
+    if inverse is not None:
+        root = inverse(loss_fn, threshold_db)
+    else:
+        root = bisect_coverage_radius(loss_fn, threshold_db, d_min, d_max, tolerance)
+    radius = np.where(loss_far <= threshold_db, d_max,
+                      np.where(loss_near > threshold_db, 0.0, np.clip(root, d_min, d_max)))
+    return radius[()]
+
+
+def two_ray_coverage_radius(ht, hr, frequency_MHz, threshold_db, d_min, d_max, tolerance=1.0):
+    """
+    Coverage radius (m) of the piecewise Two-Ray Ground model.
+
+    Both branches are log-linear in d but the loss may jump at the critical distance
+    d_c, so each branch is inverted on its own interval and the farthest hit is kept.
+    """
+    d_c = (4 * ht * hr) / (3e8 / (frequency_MHz * 1e6))
+    loss_fn = lambda d: two_ray_ground_loss(d, ht, hr, frequency_MHz)
+
+    # FSPL branch on [d_min, d_c], two-ray branch on (d_c, d_max]
+    near = solve_coverage_radius(loss_fn, threshold_db, d_min, np.clip(d_c, d_min, d_max),
+                                 inverse=lambda fn, th: invert_log_linear(fn, th, d_ref=d_c / 100),
+                                 tolerance=tolerance)
+    far = solve_coverage_radius(loss_fn, threshold_db, np.clip(d_c * (1 + 1e-9), d_min, d_max), d_max,
+                                inverse=lambda fn, th: invert_log_linear(fn, th, d_ref=2 * d_c),
+                                tolerance=tolerance)
+    return np.maximum(near, far)[()]
+
+# --------------------------
+# Complex Baseband
+# --------------------------
+
+SPEED_OF_LIGHT = 299792458.0  # m/s
+# How the carrier-based endpoints represent their signal:
+#   "rf"       the carrier itself, sin(2π·f_c·(t - τ)), aliased unless sampling_interval < 1 / (2·f_c)
+#   "baseband" its complex envelope a·exp(-j2π·f_c·τ), RF = Im{envelope · exp(j2π·f_c·t)}
+#   "passband" that envelope upconverted to display_frequency_Hz, for plotting only
+SIGNAL_REPRESENTATIONS = ("rf", "baseband", "passband")
+# Samples per period of the fastest envelope component (Doppler shift + display carrier)
+BASEBAND_OVERSAMPLING = 4
+
+
+class BasebandParams:
+    """
+    Signal representation of the carrier-based endpoints, injected with Depends().
+    """
+
+    def __init__(self, representation: str = "rf", display_frequency_Hz: float = Query(10.0, gt=0)):
+        self.representation = representation
+        self.display_frequency_Hz = display_frequency_Hz
+
+    @property
+    def enabled(self) -> bool:
+        return self.representation != "rf"
+
+    def represent(self, t: np.ndarray, envelope: np.ndarray) -> np.ndarray:
+        """The complex envelope as requested: as is, or on the display carrier."""
+        if self.representation == "passband":
+            return np.imag(envelope * np.exp(2j * np.pi * self.display_frequency_Hz * t))
+        return envelope
+
+
+def doppler_shift(frequency_Hz, radial_speed_m_s):
+    """Doppler shift (Hz) of a carrier seen by a receiver moving away at radial_speed_m_s."""
+    return -frequency_Hz * radial_speed_m_s / SPEED_OF_LIGHT
+
+
+def delay_envelope(frequency_Hz, delays_s) -> np.ndarray:
+    """
+    Complex envelope exp(-j2π·f·τ) of a unit carrier delayed by τ; a time-varying delay
+    turns into the Doppler shift of the envelope.
+    """
+    return np.exp(-2j * np.pi * frequency_Hz * delays_s)
+
+
+def baseband_sampling(step: str = "sampling_interval", distance_scale_m: float = 1000.0):
+    """
+    Parameter hook (see simulation_endpoint(prepare=...)) of the endpoints moving their
+    receiver from d_min to d_max during `duration`: in baseband / passband representation
+    the sampling interval is refined, when needed, to resolve the envelope's Doppler shift
+    (and display carrier) rather than the carrier itself.
+
+    Args:
+        step: name of the sampling-interval parameter
+        distance_scale_m: meters per unit of d_min / d_max
+
+    The hook's `max_step(params)` gives that envelope-resolving interval (None when
+    unconstrained), so that degrading an over-budget request never coarsens past it.
+    """
+    def max_step(params: dict) -> Optional[float]:
+        baseband = params["baseband"]
+        if not baseband.enabled:
+            return None
+        speed = (params["d_max"] - params["d_min"]) * distance_scale_m / params["duration"]
+        bandwidth = abs(doppler_shift(params["frequency_MHz"] * 1e6, speed))
+        if baseband.representation == "passband":
+            bandwidth += baseband.display_frequency_Hz
+        return 1 / (2 * BASEBAND_OVERSAMPLING * bandwidth) if bandwidth > 0 else None
+
+    def prepare(params: dict) -> dict:
+        baseband = params["baseband"]
+        if baseband.representation not in SIGNAL_REPRESENTATIONS:
+            raise HTTPException(400, f"representation must be one of {', '.join(SIGNAL_REPRESENTATIONS)}")
+        if not baseband.enabled:
+            return params
+        validate_positive(duration=params["duration"], **{step: params[step]})
+        limit = max_step(params)
+        if limit is None:
+            return params
+        return {**params, step: min(params[step], limit)}
+    prepare.max_step = max_step
+    return prepare
+
+
+def quadrature_payload(payload: dict) -> dict:
+    """Split a complex "y" into its in-phase "y" and quadrature "y_quadrature" parts."""
+    y = payload.get("y")
+    if not np.iscomplexobj(y):
+        return payload
+    return {**payload, "y": np.ascontiguousarray(y.real), "y_quadrature": np.ascontiguousarray(y.imag)}
+
+# --------------------------
+# Doppler Fading
+# --------------------------
+
+# Sinusoids per quadrature of the sum-of-sinusoids generator; 16 already follows the
+# Clarke autocorrelation J0(2π·f_D·τ) closely over the first fades
+FADING_SINUSOIDS = 16
+# Samples evaluated at once, bounding the (samples × sinusoids) temporaries to a few MiB
+FADING_CHUNK = 16384
+FADING_ENVELOPES = ("rayleigh", "rician", "nakagami")
+
+
+def max_doppler(speed_kmh, carrier_Hz):
+    """Maximum Doppler shift f_D = v·f_c / c (Hz) of a receiver moving at speed_kmh."""
+    return speed_kmh / 3.6 * carrier_Hz / SPEED_OF_LIGHT
+
+
+class FadingProcess:
+    """
+    Time-correlated flat fading with the Clarke/Jakes Doppler spectrum, generated as a
+    sum of sinusoids (Zheng & Xiao). The arrival angles and phases are drawn once; the
+    complex gain is then a function of time, evaluated in O(sinusoids) per sample, so
+    that blocks, windows and full runs of the same process agree sample for sample.
+
+    Args:
+        doppler_Hz: maximum Doppler shift f_D (see max_doppler)
+        envelope: "rayleigh", "rician" (Rice factor K) or "nakagami" (shape m)
+        K: linear Rice factor, line-of-sight over scattered power
+        m: Nakagami shape parameter (≥ 0.5); the phase stays that of the Rayleigh process
+        omega: mean power E|h|²
+        sinusoids: sinusoids per quadrature
+        rng: np.random.Generator of the angles and phases (a fresh one if None)
+    """
+
+    def __init__(self, doppler_Hz: float, envelope: str = "rayleigh", K: float = 0.0, m: float = 1.0,
+                 omega: float = 1.0, sinusoids: int = FADING_SINUSOIDS, rng=None):
+        validate_fading_envelope(envelope, m)
+        if doppler_Hz < 0:
+            raise HTTPException(400, "speed must be non-negative")
+        validate_positive(omega=omega)
+        rng = make_rng() if rng is None else rng
+        self.envelope = envelope
+        self.K, self.m, self.omega = K, m, omega
+        self.sinusoids = sinusoids
+
+        # Scattered component: M arrival angles per quadrature, one random rotation
+        theta = rng.uniform(-np.pi, np.pi)
+        alpha = (2 * np.pi * np.arange(1, sinusoids + 1) - np.pi + theta) / (4 * sinusoids)
+        self.w_i = 2 * np.pi * doppler_Hz * np.cos(alpha)
+        self.w_q = 2 * np.pi * doppler_Hz * np.sin(alpha)
+        self.phase_i, self.phase_q = rng.uniform(-np.pi, np.pi, (2, sinusoids))
+        # Line of sight: one arrival angle and phase
+        self.w_los = 2 * np.pi * doppler_Hz * np.cos(rng.uniform(-np.pi, np.pi))
+        self.phase_los = rng.uniform(-np.pi, np.pi)
+
+    def scattered(self, t) -> np.ndarray:
+        """Unit-power Rayleigh process at times t."""
+        t = np.asarray(t, dtype=float).ravel()
+        h = np.empty(t.size, dtype=complex)
+        for start in range(0, t.size, FADING_CHUNK):
+            chunk = t[start:start + FADING_CHUNK, None]
+            h.real[start:start + FADING_CHUNK] = np.cos(chunk * self.w_i + self.phase_i).sum(axis=1)
+            h.imag[start:start + FADING_CHUNK] = np.cos(chunk * self.w_q + self.phase_q).sum(axis=1)
+        return h / np.sqrt(self.sinusoids)
+
+    def gains(self, t) -> np.ndarray:
+        """Complex channel gains h(t), with E|h|² = omega."""
+        h = self.scattered(t)
+        if self.envelope == "rician":
+            los = np.exp(1j * (self.w_los * np.asarray(t, dtype=float).ravel() + self.phase_los))
+            h = (np.sqrt(self.K) * los + h) / np.sqrt(1 + self.K)
+        elif self.envelope == "nakagami" and self.m != 1:
+            # |h|² is Exp(1): map its quantiles onto those of the Gamma(m, 1/m) power
+            power = np.abs(h) ** 2
+            target = scipy.special.gammaincinv(self.m, -np.expm1(-power)) / self.m
+            h = h * np.sqrt(np.divide(target, power, out=np.ones_like(power), where=power > 0))
+        return h * np.sqrt(self.omega)
+
+# --------------------------
+# Tapped Delay Line
+# --------------------------
+
+# 3GPP TS 36.104 Annex B.2 power-delay profiles: (delays in ns, relative powers in dB)
+TDL_PROFILES = {
+    "EPA": ([0, 30, 70, 90, 110, 190, 410],
+            [0.0, -1.0, -2.0, -3.0, -8.0, -17.2, -20.8]),
+    "EVA": ([0, 30, 150, 310, 370, 710, 1090, 1730, 2510],
+            [0.0, -1.5, -1.4, -3.6, -0.6, -9.1, -7.0, -12.0, -16.9]),
+    "ETU": ([0, 50, 120, 200, 230, 500, 1600, 2300, 5000],
+            [-1.0, -1.0, -1.0, 0.0, 0.0, 0.0, -3.0, -5.0, -7.0]),
+}
+# An exponential profile is truncated this many delay spreads after its first tap (-21.7 dB)
+TDL_EXPONENTIAL_SPAN = 5
+# Working set of one batch of channel realizations in TappedDelayLine.apply
+TDL_BATCH_BYTES = 64 * 2**20
+
+
+class TappedDelayLine:
+    """
+    Multipath channel given by its paths' delays and mean powers, each path fading
+    independently (Rayleigh) from one realization to the next.
+
+    Paths are resampled onto the simulation's sample grid (each to its nearest sample,
+    powers of merged paths adding up), so that one realization is a causal FIR filter.
+
+    Args:
+        delays_s: path delays (s)
+        powers_db: mean path powers (dB), normalized to a total of 1
+    """
+
+    def __init__(self, delays_s, powers_db):
+        delays_s, powers_db = np.atleast_1d(np.asarray(delays_s, dtype=float)), np.atleast_1d(np.asarray(powers_db, dtype=float))
+        if delays_s.ndim != 1 or delays_s.size == 0 or delays_s.shape != powers_db.shape:
+            raise HTTPException(400, "delays and powers must be two non-empty lists of the same length")
+        if np.any(delays_s < 0) or not np.all(np.isfinite(delays_s)) or not np.all(np.isfinite(powers_db)):
+            raise HTTPException(400, "delays must be finite and non-negative, powers finite")
+        order = np.argsort(delays_s, kind="stable")
+        powers = db_to_watts(powers_db[order])
+        self.delays_s = delays_s[order]
+        self.powers = powers / powers.sum()
+
+    @classmethod
+    def profile(cls, name: str) -> "TappedDelayLine":
+        """One of the TDL_PROFILES (EPA, EVA, ETU)."""
+        if name not in TDL_PROFILES:
+            raise HTTPException(400, f"profile must be one of {', '.join(TDL_PROFILES)}")
+        delays_ns, powers_db = TDL_PROFILES[name]
+        return cls(np.asarray(delays_ns) * 1e-9, powers_db)
+
+    @classmethod
+    def exponential(cls, delay_spread_s: float, spacing_s: float) -> "TappedDelayLine":
+        """Exponential profile exp(-τ / delay_spread_s) sampled every spacing_s."""
+        validate_positive(delay_spread_s=delay_spread_s, spacing_s=spacing_s)
+        delays = np.arange(math.floor(TDL_EXPONENTIAL_SPAN * delay_spread_s / spacing_s) + 1) * spacing_s
+        return cls(delays, -10 * np.log10(np.e) * delays / delay_spread_s)
+
+    @classmethod
+    def from_query(cls, profile: str, Te: float, delay_spread_ns: float = 100.0,
+                   delays_ns: Optional[List[float]] = None, powers_db: Optional[List[float]] = None):
+        """Channel of the `profile` query parameter: a TDL_PROFILES name, "exponential" or "custom"."""
+        if profile == "exponential":
+            return cls.exponential(delay_spread_ns * 1e-9, Te)
+        if profile == "custom":
+            if not delays_ns or not powers_db:
+                raise HTTPException(400, "a custom profile needs delays_ns and powers_db")
+            return cls(np.asarray(delays_ns) * 1e-9, powers_db)
+        return cls.profile(profile)
+
+    @property
+    def mean_delay_s(self) -> float:
+        return float(np.sum(self.powers * self.delays_s))
+
+    @property
+    def rms_delay_spread_s(self) -> float:
+        return float(np.sqrt(np.sum(self.powers * (self.delays_s - self.mean_delay_s) ** 2)))
+
+    def tap_indices(self, Te: float) -> np.ndarray:
+        validate_positive(Te=Te)
+        return np.rint(self.delays_s / Te).astype(int)
+
+    def tap_powers(self, Te: float) -> np.ndarray:
+        """Mean power of every sample-spaced tap at sampling interval Te."""
+        return np.bincount(self.tap_indices(Te), weights=self.powers)
+
+    def realizations(self, count: int, Te: float, rng=None) -> np.ndarray:
+        """(count, taps) complex FIR filters, one independent Rayleigh draw of every path per row."""
+        rng = make_rng() if rng is None else rng
+        index = self.tap_indices(Te)
+        gains = (rng.standard_normal((count, index.size)) + 1j * rng.standard_normal((count, index.size))) \
+            * np.sqrt(self.powers / 2)
+        taps = np.zeros((count, index[-1] + 1), dtype=complex)
+        for path, tap in enumerate(index):
+            taps[:, tap] += gains[:, path]
+        return taps
+
+    def apply(self, signals, Te: float, count: Optional[int] = None, rng=None, taps=None):
+        """
+        Pass signals through independent channel realizations in one batched call.
+
+        Args:
+            signals: (N,) signal sent through every realization, or (count, N) signals,
+                     one per realization
+            Te: sampling interval (s)
+            count: number of realizations (default: one per signal row)
+            rng: np.random.Generator of the realizations (a fresh one if None)
+            taps: (count, L) realizations to reuse instead of drawing new ones
+
+        Returns:
+            (outputs (count, N), taps (count, L))
+        """
+        signals = np.atleast_2d(signals)
+        if taps is None:
+            taps = self.realizations(count or signals.shape[0], Te, rng)
+        n_fft = scipy.fft.next_fast_len(signals.shape[-1] + taps.shape[-1] - 1)
+        rows = max(1, TDL_BATCH_BYTES // (48 * n_fft))
+        outputs = np.empty((taps.shape[0], signals.shape[-1]), dtype=complex)
+        for start in range(0, taps.shape[0], rows):
+            batch = signals if signals.shape[0] == 1 else signals[start:start + rows]
+            outputs[start:start + rows] = batch_convolve(batch, taps[start:start + rows])
+        return outputs, taps
+
+# --------------------------
+# Fading Statistics
+# --------------------------
+
+FADING_STATISTICS_METHODS = ("auto", "closed_form", "monte_carlo")
+# Fading draws generated at once by the Monte-Carlo statistics (32 MiB of float64)
+FADING_STATISTICS_CHUNK = 2**22
+
+
+def fading_power_cdf(envelope: str, x, K: float = 0.0, m: float = 1.0):
+    """
+    P(|h|² / Ω ≤ x) of a fading envelope, in closed form:
+    Rayleigh 1 - exp(-x), Rician 1 - Q1(√(2K), √(2(K+1)x)) (non-central χ², 2 degrees of
+    freedom), Nakagami-m the regularized incomplete gamma P(m, m·x).
+    """
+    x = np.maximum(x, 0)
+    if envelope == "rayleigh":
+        return -np.expm1(-x)
+    if envelope == "rician":
+        return scipy.special.chndtr(2 * (K + 1) * x, 2, 2 * K)
+    return scipy.special.gammainc(m, m * x)
+
+
+def fading_power_quantile(envelope: str, p, K: float = 0.0, m: float = 1.0):
+    """Inverse of fading_power_cdf: the normalized power below which a fraction p of the time is spent."""
+    if envelope == "rayleigh":
+        return -np.log1p(-p)
+    if envelope == "rician":
+        return scipy.special.chndtrix(p, 2, 2 * K) / (2 * (K + 1))
+    return scipy.special.gammaincinv(m, p) / m
+
+
+def fading_power_samples(envelope: str, size, K: float = 0.0, m: float = 1.0, shadowing_db: float = 0.0,
+                         rng=None) -> np.ndarray:
+    """Normalized powers |h|² / Ω of independent fades, times log-normal shadowing of shadowing_db."""
+    rng = make_rng() if rng is None else rng
+    if envelope == "rayleigh":
+        power = rng.standard_exponential(size)
+    elif envelope == "rician":
+        los, sigma = np.sqrt(K / (K + 1)), np.sqrt(1 / (2 * (K + 1)))
+        power = (los + sigma * rng.standard_normal(size)) ** 2 + (sigma * rng.standard_normal(size)) ** 2
+    else:
+        power = rng.gamma(m, 1 / m, size)
+    if shadowing_db:
+        power *= 10 ** (shadowing_db * rng.standard_normal(size) / 10)
+    return power
+
+
+def validate_fading_envelope(envelope: str, m: float):
+    if envelope not in FADING_ENVELOPES:
+        raise HTTPException(400, f"envelope must be one of {', '.join(FADING_ENVELOPES)}")
+    if envelope == "nakagami" and m < 0.5:
+        raise HTTPException(400, "m must be at least 0.5")
+
+# --------------------------
+# OFDM Link
+# --------------------------
+
+# BPSK and square Gray-coded QAM
+MODULATION_ORDERS = (2, 4, 16, 64, 256)
+# Working set of one batch of OFDM symbols × SNR points in the link simulation
+OFDM_BATCH_BYTES = 64 * 2**20
+# Set bits of every byte, to count bit errors from XORed symbol indices
+BIT_COUNTS = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1, dtype=np.int64)
+
+
+@functools.lru_cache(maxsize=None)
+def qam_constellation(order: int) -> np.ndarray:
+    """
+    Unit-energy constellation, point i carrying the bits of i (I bits then Q bits),
+    Gray-coded along each axis so that neighbours differ by one bit. Read-only.
+    """
+    if order not in MODULATION_ORDERS:
+        raise HTTPException(400, f"modulation order must be one of {', '.join(map(str, MODULATION_ORDERS))}")
+    if order == 2:
+        points = np.array([-1.0, 1.0], dtype=complex)
+    else:
+        bits = int(math.log2(order)) // 2
+        levels = gray_levels(bits)
+        symbols = np.arange(order)
+        points = levels[symbols >> bits] + 1j * levels[symbols & ((1 << bits) - 1)]
+        points /= np.sqrt(np.mean(np.abs(points) ** 2))
+    points.flags.writeable = False
+    return points
+
+
+def gray_levels(bits: int) -> np.ndarray:
+    """Amplitude -(L-1), …, L-1 of every Gray-coded label of `bits` bits (L = 2**bits)."""
+    labels = np.arange(1 << bits)
+    index = labels.copy()                      # Gray → binary: prefix XOR of the label
+    shift = labels >> 1
+    while shift.any():
+        index ^= shift
+        shift >>= 1
+    return 2.0 * index - ((1 << bits) - 1)
+
+
+def qam_demap(received: np.ndarray, order: int) -> np.ndarray:
+    """Hard decisions: index of the nearest point of qam_constellation(order), per axis."""
+    if order == 2:
+        return (received.real > 0).astype(np.uint8)
+    bits = int(math.log2(order)) // 2
+    size = 1 << bits
+    unit = np.sqrt(2 * (order - 1) / 3)          # RMS amplitude of the unnormalized grid
+    def axis_labels(values):
+        index = np.clip(np.rint((values * unit + size - 1) / 2), 0, size - 1).astype(np.intp)
+        return index ^ (index >> 1)              # binary → Gray
+    return (axis_labels(received.real) << bits | axis_labels(received.imag)).astype(np.uint8)
+
+
+def ofdm_data_subcarriers(fftlen: int, data_sc: int) -> np.ndarray:
+    """FFT bins of the data subcarriers: around DC (left empty), half above and half below."""
+    if not 0 < data_sc < fftlen:
+        raise HTTPException(400, "data_sc must be between 1 and fftlen - 1")
+    return np.r_[1:(data_sc + 1) // 2 + 1, fftlen - data_sc // 2:fftlen]
+
+
+def qam_awgn_ser(esn0_db, order: int):
+    """Theoretical symbol error rate of qam_constellation(order) in AWGN."""
+    snr = db_to_watts(np.asarray(esn0_db, dtype=float))
+    q = lambda x: 0.5 * scipy.special.erfc(x / np.sqrt(2))
+    if order == 2:
+        return q(np.sqrt(2 * snr))
+    p = 2 * (1 - 1 / np.sqrt(order)) * q(np.sqrt(3 * snr / (order - 1)))
+    return 1 - (1 - p) ** 2
+
+
+def simulate_ofdm_link(order: int, fftlen: int, gilen: int, data_sc: int, num_symbols: int, esn0_db,
+                       channel: Optional["TappedDelayLine"] = None, Te: float = 50e-9, rng=None):
+    """
+    Monte-Carlo OFDM link: random bits → QAM → IFFT + cyclic prefix → TDL channel (a new
+    realization every OFDM symbol, the tail of each symbol spilling into the following
+    ones, however many it reaches) →
+    AWGN at every Es/N0 point → CP removal, FFT → one-tap zero-forcing equalizer → hard
+    demapping. All SNR points × symbols of a batch are processed as one 3D array.
+
+    Returns:
+        (symbol errors, bit errors) per SNR point
+    """
+    rng = make_rng() if rng is None else rng
+    constellation = qam_constellation(order)
+    subcarriers = ofdm_data_subcarriers(fftlen, data_sc)
+    # per-subcarrier noise variance, the same in time and (orthonormal) frequency domain
+    n0 = db_to_watts(-np.asarray(esn0_db, dtype=float))[:, None, None]
+    symbol_errors = np.zeros(n0.shape[0], dtype=np.int64)
+    bit_errors = np.zeros(n0.shape[0], dtype=np.int64)
+    tail = None
+
+    # working set of one OFDM symbol: ~96 B per decision (noise, received, equalized
+    # and demapped values at every SNR point), ~48 B per time sample, and the FFT
+    # buffers of the channel convolution (~128 B per point)
+    spill = 0 if channel is None else int(channel.tap_indices(Te)[-1])
+    row_bytes = 96 * n0.shape[0] * data_sc + 48 * (fftlen + gilen)
+    if spill:
+        row_bytes += 128 * scipy.fft.next_fast_len(fftlen + gilen + 2 * spill)
+    rows = max(1, OFDM_BATCH_BYTES // row_bytes)
+    for start in range(0, num_symbols, rows):
+        count = min(rows, num_symbols - start)
+        sent = rng.integers(0, order, (count, data_sc), dtype=np.uint8)
+        grid = np.zeros((count, fftlen), dtype=complex)
+        grid[:, subcarriers] = constellation[sent]
+        frames = scipy.fft.ifft(grid, axis=-1, norm="ortho", workers=FFT_WORKERS)
+        frames = np.concatenate((frames[:, fftlen - gilen:], frames), axis=1)
+
+        if channel is None:
+            response = np.ones((count, data_sc))
+        else:
+            taps = channel.realizations(count, Te, rng)
+            spill = taps.shape[-1] - 1
+            full = batch_convolve(np.pad(frames, ((0, 0), (0, spill))), taps)
+            # inter-symbol interference: overlap-add the tail of every symbol into all the
+            # `reach` symbols after it (more than one when the channel outlasts a symbol),
+            # carrying what spills past the batch into the next one
+            length = fftlen + gilen
+            reach = -(-spill // length)
+            pieces = np.pad(full, ((0, 0), (0, (reach + 1) * length - full.shape[1])))
+            pieces = pieces.reshape(count, reach + 1, length)
+            symbols = np.zeros((count + reach, length), dtype=complex)
+            for offset in range(reach + 1):
+                symbols[offset:offset + count] += pieces[:, offset]
+            if tail is not None:
+                symbols[:reach] += tail
+            frames, tail = symbols[:count], symbols[count:]
+            response = scipy.fft.fft(taps, fftlen, axis=-1, workers=FFT_WORKERS)[:, subcarriers]
+
+        received = scipy.fft.fft(frames[:, gilen:], axis=-1, norm="ortho", workers=FFT_WORKERS)[:, subcarriers]
+        noise = rng.standard_normal((2, n0.shape[0], count, data_sc))
+        noisy = received + np.sqrt(n0 / 2) * (noise[0] + 1j * noise[1])
+        decided = qam_demap(noisy / response, order)
+        wrong = decided ^ sent
+        symbol_errors += np.count_nonzero(wrong, axis=(1, 2))
+        bit_errors += BIT_COUNTS[wrong].sum(axis=(1, 2))
+    return symbol_errors, bit_errors
+
+# --------------------------
+# MIMO Channels
+# --------------------------
+
+MIMO_ENVELOPES = ("rayleigh", "rician")
+
+
+def exponential_correlation(size: int, rho: float) -> np.ndarray:
+    """Correlation matrix ρ^|i-j| of a uniform linear array (0 ≤ ρ < 1)."""
+    if not 0 <= rho < 1:
+        raise HTTPException(400, "correlation must be in [0, 1)")
+    index = np.arange(size)
+    return rho ** np.abs(index[:, None] - index[None, :])
+
+
+def hermitian_sqrt(matrix: np.ndarray) -> np.ndarray:
+    values, vectors = np.linalg.eigh(matrix)
+    return (vectors * np.sqrt(np.maximum(values, 0))) @ vectors.conj().T
+
+
+def mimo_channels(count: int, nr: int, nt: int, envelope: str = "rayleigh", K: float = 0.0,
+                  rx_correlation: float = 0.0, tx_correlation: float = 0.0, rng=None) -> np.ndarray:
+    """
+    (count, nr, nt) stack of channel matrices with unit-power entries: i.i.d. CN(0, 1)
+    scattering, shaped as R_r^½·H_w·R_t^½ (Kronecker model) when correlated, plus for
+    Rician fading a rank-one line-of-sight part carrying K / (K + 1) of the power.
+    """
+    if envelope not in MIMO_ENVELOPES:
+        raise HTTPException(400, f"envelope must be one of {', '.join(MIMO_ENVELOPES)}")
+    validate_positive(nr=nr, nt=nt)
+    rng = make_rng() if rng is None else rng
+    scattered = rng.standard_normal((2, count, nr, nt))
+    H = (scattered[0] + 1j * scattered[1]) / np.sqrt(2)
+    if rx_correlation:
+        H = hermitian_sqrt(exponential_correlation(nr, rx_correlation)) @ H
+    if tx_correlation:
+        H = H @ hermitian_sqrt(exponential_correlation(nt, tx_correlation))
+    if envelope == "rician":
+        H = np.sqrt(K / (K + 1)) + np.sqrt(1 / (K + 1)) * H
+    return H
+
+
+def mimo_capacities(H: np.ndarray, snr_db) -> np.ndarray:
+    """
+    Capacity log2 det(I + SNR/Nt·H·Hᴴ) (bit/s/Hz, equal power per transmit antenna) of
+    every channel at every SNR: one batched eigvalsh of the smaller Gram matrix, then
+    Σ log2(1 + SNR/Nt·λ) broadcast over the SNR points.
+
+    Returns:
+        (len(snr_db), count) capacities
+    """
+    nt = H.shape[-1]
+    gram = H @ H.conj().swapaxes(-1, -2) if H.shape[-2] <= nt else H.conj().swapaxes(-1, -2) @ H
+    eigenvalues = np.maximum(np.linalg.eigvalsh(gram), 0)
+    snr = db_to_watts(np.asarray(snr_db, dtype=float))[:, None, None]
+    return np.log2(1 + snr / nt * eigenvalues).sum(axis=-1)
+
+# --------------------------
+# Response Encoding
+# --------------------------
+# Signal endpoints return plain dicts of NumPy arrays; `simulation_endpoint` encodes them
+# according to the client's Accept / Accept-Encoding headers:
+#   application/json (default)        {"x": [...], "y": [...]}, gzip/br compressed if accepted
+#   application/octet-stream          raw little-endian buffers back to back, described by the
+#                                     X-Arrays header; append ";dtype=float32" to halve the size
+#   application/msgpack               {"x": {"dtype", "shape", "data": <bin>}, ...}
+
+BINARY_MEDIA_TYPES = ("application/octet-stream", "application/msgpack", "application/x-msgpack")
+MIN_COMPRESS_BYTES = 1024
+
+
+def parse_accept(header: str):
+    """Media ranges of an Accept header as (type, params, q), highest preference first."""
+    ranges = []
+    for position, item in enumerate(header.split(",")):
+        media_type, *raw_params = [part.strip() for part in item.split(";")]
+        params = dict(p.split("=", 1) for p in raw_params if "=" in p)
+        try:
+            q = float(params.pop("q", 1))
+        except ValueError:
+            q = 0.0
+        if media_type and q > 0:
+            ranges.append((media_type.lower(), params, q, position))
+    ranges.sort(key=lambda r: (-r[2], r[3]))
+    return [(media_type, params, q) for media_type, params, q, _ in ranges]
+
+
+def negotiate_format(accept: str):
+    """(media_type, dtype) to answer with; dtype is None to keep the arrays' own dtype."""
+    for media_type, params, _ in parse_accept(accept or "application/json"):
+        if media_type in BINARY_MEDIA_TYPES:
+            dtype = params.get("dtype")
+            if dtype not in (None, "float32", "float64"):
+                raise HTTPException(406, "dtype must be float32 or float64")
+            return media_type, dtype
+        if media_type in ("application/json", "application/*", "*/*"):
+            return "application/json", None
+    raise HTTPException(406, f"Supported media types: application/json, {', '.join(BINARY_MEDIA_TYPES)}")
+
+
+def negotiate_encoding(accept_encoding: str):
+    """Content-Encoding for a JSON body: br if available and accepted, else gzip, else None."""
+    accepted = {media_type for media_type, _, _ in parse_accept(accept_encoding or "")}
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def as_wire_array(value: np.ndarray, dtype=None) -> np.ndarray:
+    """Contiguous little-endian view of an array, cast to float `dtype` when requested."""
+    if dtype is not None and value.dtype.kind in "fiub":
+        value = value.astype(dtype, copy=False)
+    elif np.iscomplexobj(value):
+        value = value.real
+    return np.ascontiguousarray(value, dtype=value.dtype.newbyteorder("<"))
+
+
+def byte_view(array: np.ndarray) -> memoryview:
+    """Zero-copy byte view of a contiguous array."""
+    return memoryview(array.reshape(-1)).cast("B")
+
+
+def json_default(value):
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == "f" and not np.isfinite(value).all():
+            # NaN/inf → null, as orjson does (e.g. points outside a model's validity range)
+            return np.where(np.isfinite(value), value, None).tolist()
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def encode_json(payload: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, default=json_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, default=json_default, ensure_ascii=False, allow_nan=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def encode_octet_stream(payload: dict, dtype=None):
+    """Array fields as raw buffers (no intermediate lists); other fields go in X-Meta."""
+    buffers, layout, meta, offset = [], [], {}, 0
+    for name, value in payload.items():
+        if isinstance(value, np.ndarray):
+            array = as_wire_array(value, dtype)
+            buffers.append(byte_view(array))
+            layout.append({"name": name, "dtype": array.dtype.str, "shape": list(array.shape), "offset": offset})
+            offset += array.nbytes
+        else:
+            meta[name] = value
+    headers = {
+        "X-Arrays": json.dumps(layout, separators=(",", ":")),
+        "X-Meta": json.dumps(meta, default=json_default, separators=(",", ":")),
+    }
+    return b"".join(buffers), headers
+
+
+def msgpack_pack(value, out: list):
+    """Minimal MessagePack encoder for the payload types of this service (appends to `out`)."""
+    if value is None:
+        out.append(b"\xc0")
+    elif isinstance(value, (bool, np.bool_)):
+        out.append(b"\xc3" if value else b"\xc2")
+    elif isinstance(value, (int, np.integer)):
+        # the smallest encoding of the value, as reference packers choose
+        value = int(value)
+        if 0 <= value < 128:
+            out.append(struct.pack("B", value))
+        elif -32 <= value < 0:
+            out.append(struct.pack("b", value))
+        elif value >= 0:
+            out.append(struct.pack(">BB", 0xcc, value) if value < 2**8 else
+                       struct.pack(">BH", 0xcd, value) if value < 2**16 else
+                       struct.pack(">BI", 0xce, value) if value < 2**32 else struct.pack(">BQ", 0xcf, value))
+        else:
+            out.append(struct.pack(">Bb", 0xd0, value) if value >= -2**7 else
+                       struct.pack(">Bh", 0xd1, value) if value >= -2**15 else
+                       struct.pack(">Bi", 0xd2, value) if value >= -2**31 else struct.pack(">Bq", 0xd3, value))
+    elif isinstance(value, (float, np.floating)):
+        out.append(struct.pack(">Bd", 0xcb, float(value)))
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        n = len(data)
+        out.append(struct.pack("B", 0xa0 | n) if n < 32 else
+                   struct.pack(">BB", 0xd9, n) if n < 2**8 else
+                   struct.pack(">BH", 0xda, n) if n < 2**16 else struct.pack(">BI", 0xdb, n))
+        out.append(data)
+    elif isinstance(value, (bytes, memoryview)):
+        n = len(value) if isinstance(value, bytes) else value.nbytes
+        out.append(struct.pack(">BB", 0xc4, n) if n < 2**8 else
+                   struct.pack(">BH", 0xc5, n) if n < 2**16 else struct.pack(">BI", 0xc6, n))
+        out.append(value)
+    elif isinstance(value, np.ndarray):
+        value = as_wire_array(value)
+        msgpack_pack({"dtype": value.dtype.str, "shape": list(value.shape), "data": byte_view(value)}, out)
+    elif isinstance(value, dict):
+        n = len(value)
+        out.append(struct.pack("B", 0x80 | n) if n < 16 else
+                   struct.pack(">BH", 0xde, n) if n < 2**16 else struct.pack(">BI", 0xdf, n))
+        for key, item in value.items():
+            msgpack_pack(str(key), out)
+            msgpack_pack(item, out)
+    elif isinstance(value, (list, tuple)):
+        n = len(value)
+        out.append(struct.pack("B", 0x90 | n) if n < 16 else
+                   struct.pack(">BH", 0xdc, n) if n < 2**16 else struct.pack(">BI", 0xdd, n))
+        for item in value:
+            msgpack_pack(item, out)
+    else:
+        raise TypeError(f"{type(value).__name__} cannot be packed")
+
+
+def encode_msgpack(payload: dict, dtype=None) -> bytes:
+    out = []
+    msgpack_pack({name: as_wire_array(value, dtype) if isinstance(value, np.ndarray) else value
+                  for name, value in payload.items()}, out)
+    return b"".join(out)
+
+
+def encode_payload(payload: dict, accept: str = "", accept_encoding: str = "") -> Response:
+    """Serialize an endpoint payload according to the request's Accept headers."""
+    media_type, dtype = negotiate_format(accept)
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if media_type == "application/octet-stream":
+        body, array_headers = encode_octet_stream(payload, dtype)
+        headers.update(array_headers)
+    elif media_type in ("application/msgpack", "application/x-msgpack"):
+        body = encode_msgpack(payload, dtype)
+    else:
+        body = encode_json(payload)
+        encoding = negotiate_encoding(accept_encoding) if len(body) >= MIN_COMPRESS_BYTES else None
+        if encoding == "br":
+            body = brotli.compress(body, quality=4)
+        elif encoding == "gzip":
+            body = gzip.compress(body, compresslevel=5)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+# --------------------------
+# Plot Downsampling
+# --------------------------
+
+def _first_arg_per_bucket(values, reduced, starts, sizes):
+    """Index of the first element of each bucket equal to its reduced (min/max) value."""
+    hits = np.flatnonzero(values == np.repeat(reduced, sizes))
+    buckets = np.searchsorted(starts, hits, side="right") - 1
+    _, first = np.unique(buckets, return_index=True)
+    return hits[first]
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int, refinements: int = 2) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets selection of n_out points (first and last always kept).
+
+    Vectorized variant: classic LTTB anchors each bucket's triangle on the point picked in
+    the previous bucket, which is inherently sequential. Here every bucket is solved at
+    once, first anchored on the previous bucket's mean, then re-solved `refinements`
+    times anchored on the previous pass' picks.
+    """
+    n = len(x)
+    n_buckets = n_out - 2
+    starts = np.linspace(1, n - 1, n_buckets + 1).astype(np.int64)
+    sizes = np.diff(starts)
+    starts = starts[:-1]
+
+    mean_x = np.add.reduceat(x[:n - 1], starts) / sizes
+    mean_y = np.add.reduceat(y[:n - 1], starts) / sizes
+    cx = np.repeat(np.concatenate((mean_x[1:], [x[-1]])), sizes)
+    cy = np.repeat(np.concatenate((mean_y[1:], [y[-1]])), sizes)
+    middle_x, middle_y = x[1:n - 1], y[1:n - 1]
+
+    anchor_x, anchor_y = mean_x, mean_y
+    for _ in range(refinements + 1):
+        ax = np.repeat(np.concatenate(([x[0]], anchor_x[:-1])), sizes)
+        ay = np.repeat(np.concatenate(([y[0]], anchor_y[:-1])), sizes)
+        area = np.abs((ax - cx) * (middle_y - ay) - (ax - middle_x) * (cy - ay))
+        area = np.nan_to_num(area, nan=-1.0)
+        best = _first_arg_per_bucket(area, np.maximum.reduceat(area, starts - 1), starts - 1, sizes) + 1
+        anchor_x, anchor_y = x[best], y[best]
+    return np.concatenate(([0], best, [n - 1]))
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Min/max envelope: the lowest and highest sample of n_out // 2 buckets, in order."""
+    n = len(y)
+    starts = np.linspace(0, n, max(n_out // 2, 1) + 1).astype(np.int64)
+    sizes = np.diff(starts)
+    starts = starts[:-1]
+    lows = _first_arg_per_bucket(y, np.minimum.reduceat(y, starts), starts, sizes)
+    highs = _first_arg_per_bucket(y, np.maximum.reduceat(y, starts), starts, sizes)
+    return np.union1d(lows, highs)
+
+
+def downsample_xy(payload: dict, max_points: int, method: str = "lttb") -> dict:
+    """
+    Decimate the "x"/"y" arrays of a payload to at most max_points, keeping the peaks;
+    other arrays of the same length (e.g. "y_quadrature") keep the same samples.
+
+    Payloads without two same-length 1D x/y arrays, or already small enough, are
+    returned unchanged.
+    """
+    x, y = payload.get("x"), payload.get("y")
+    if not (isinstance(x, np.ndarray) and isinstance(y, np.ndarray)) or x.ndim != 1 or x.shape != y.shape:
+        return payload
+    if len(y) <= max_points:
+        return payload
+    if np.iscomplexobj(y):
+        y = y.real
+    if method == "minmax":
+        keep = minmax_indices(y, max_points)
+    elif method == "lttb":
+        keep = lttb_indices(x.astype(float, copy=False), y.astype(float, copy=False), max_points)
+    else:
+        raise HTTPException(400, "decimation must be 'lttb' or 'minmax'")
+    companions = {name: value[keep] for name, value in payload.items()
+                  if isinstance(value, np.ndarray) and value.shape == x.shape}
+    return {**payload, **companions, "x": x[keep], "y": y[keep]}
+
+
+# --------------------------
+# Implicit Axes
+# --------------------------
+
+AXIS_MODES = ("array", "implicit")
+
+
+def describe_uniform_axis(values) -> Optional[dict]:
+    """
+    {start, step, count} description of a regular axis, value i being start + i·step,
+    or None when `values` is not one (e.g. after decimation).
+
+    The description is exact: axes in FFT order (fftfreq) get "layout": "fft", value i
+    being k_i·step with k = 0, 1, …, ⌈count/2⌉-1, -⌊count/2⌋, …, -1; "stop" gives the
+    last value when it is pinned rather than computed (np.linspace).
+    """
+    if not isinstance(values, np.ndarray) or values.ndim != 1 or values.size < 2 or values.dtype.kind != "f":
+        return None
+    n = values.size
+    start = float(values[0])
+    # np.arange-style axes step by their first difference, np.linspace by (stop - start) / (n - 1)
+    for step in (float(values[1] - values[0]), float(values[-1] - values[0]) / (n - 1)):
+        regular = start + np.arange(n, dtype=float) * step
+        if np.array_equal(values[:-1], regular[:-1]):
+            axis = {"start": start, "step": step, "count": n}
+            if values[-1] != regular[-1]:
+                axis["stop"] = float(values[-1])
+            return axis
+
+    k = np.concatenate((np.arange((n - 1) // 2 + 1), np.arange(-(n // 2), 0))).astype(float)
+    step = float(values[1])
+    if start == 0 and np.array_equal(values, k * step):
+        return {"start": 0.0, "step": step, "count": n, "layout": "fft"}
+    return None
+
+
+def implicit_axes(payload: dict) -> dict:
+    """Replace a regular "x" axis by its description, leaving only "y" materialized."""
+    axis = describe_uniform_axis(payload.get("x"))
+    return payload if axis is None else {**payload, "x": axis}
+
+
+# --------------------------
+# Signal Models
+# --------------------------
+
+# Samples per streamed block: ~1 MiB of float64 x/y, small enough to plot as it arrives
+STREAM_BLOCK_SAMPLES = 65536
+# Normalization peaks kept per parameter set, so that successive zooms skip the full pass
+SIGNAL_PEAK_CACHE_SIZE = 256
+
+
+def time_array_length(duration: float, Te: float) -> int:
+    """len(generate_time_array(duration, Te)), without building it."""
+    return max(math.ceil((duration / 2 - (-duration / 2)) / Te), 0)
+
+
+def time_samples(duration: float, Te: float, index) -> np.ndarray:
+    """Samples `index` of generate_time_array(duration, Te), bit for bit (np.arange fill: start + i·delta)."""
+    start = -duration / 2
+    return start + index * ((start + Te) - start)
+
+
+def time_blocks(duration: float, Te: float, block: int = STREAM_BLOCK_SAMPLES, stop: Optional[int] = None):
+    """Yield (index, t) blocks of generate_time_array(duration, Te), up to sample `stop`."""
+    n = time_array_length(duration, Te) if stop is None else stop
+    for first in range(0, n, block):
+        index = np.arange(first, min(first + block, n))
+        yield index, time_samples(duration, Te, index)
+
+
+def linspace_samples(start: float, stop: float, num: int, index=None) -> np.ndarray:
+    """Samples `index` of np.linspace(start, stop, num), bit for bit; all of them if index is None."""
+    if index is None:
+        return np.linspace(start, stop, num)
+    if num <= 1:
+        return np.full(np.shape(index), float(start))
+    values = index * ((stop - start) / (num - 1)) + start
+    return np.where(index == num - 1, float(stop), values)
+
+
+class SignalModel:
+    """
+    Time-domain signal of an endpoint, which can be evaluated on any subset of its samples:
+    streamed in blocks (`stream=true`) or over a zoom window (`t_start`/`t_end`/`resolution`),
+    with the same values as the full run.
+
+    Args:
+        waveform: waveform(t, index, n, rng=..., **params) → signal at the times t of samples
+                  `index` (None for all n of them)
+        normalize: divide by the peak |signal| of the whole run
+        stochastic: True, or a predicate on the parameters, when the waveform draws from rng:
+                    a window is then generated from sample 0 to reproduce the full run
+        complex_valued: True, or a predicate on the parameters, when the waveform returns a
+                    complex envelope, sent as "y" / "y_quadrature" (see quadrature_payload)
+        fading: fading(rng, **params) → FadingProcess (or None), drawn once per run and
+                    passed to every waveform call as `fading`, so that all blocks share it
+        step: name of the sampling-interval parameter
+    """
+
+    def __init__(self, waveform, normalize: bool = False, stochastic=False, complex_valued=False,
+                 fading=None, step: str = "sampling_interval"):
+        self.waveform = waveform
+        self.normalize = normalize
+        self.stochastic = stochastic
+        self.complex_valued = complex_valued
+        self.fading = fading
+        self.step = step
+        self.peaks = OrderedDict()
+        self.lock = threading.Lock()
+
+    def length(self, params: dict) -> int:
+        return time_array_length(params["duration"], params[self.step])
+
+    def is_stochastic(self, params: dict) -> bool:
+        return self.stochastic if isinstance(self.stochastic, bool) else self.stochastic(params)
+
+    def run_state(self, params: dict) -> dict:
+        """Waveform keyword arguments of one run: its rng, and what is drawn before the first sample."""
+        rng = make_rng(params.get("seed"))
+        if self.fading is None:
+            return {"rng": rng}
+        return {"rng": rng, "fading": self.fading(rng, **params)}
+
+    def fields(self, params: dict) -> tuple:
+        """Arrays of every block."""
+        complex_valued = self.complex_valued if isinstance(self.complex_valued, bool) else self.complex_valued(params)
+        return ("x", "y", "y_quadrature") if complex_valued else ("x", "y")
+
+    def time_domain_only(self, params: dict, feature: str):
+        if params.get("showDomain") == "domaine fréquentiel":
+            raise HTTPException(400, f"{feature} is only available in the time domain")
+
+    def peak(self, params: dict) -> float:
+        """Peak |signal| over the whole run (1 without normalization), cached per parameter set."""
+        if not self.normalize:
+            return 1.0
+        key = canonical_params(params)
+        with self.lock:
+            if key in self.peaks:
+                self.peaks.move_to_end(key)
+                return self.peaks[key]
+        n = self.length(params)
+        peak = max((np.max(np.abs(self.waveform(t, index, n, **params)))
+                    for index, t in time_blocks(params["duration"], params[self.step])), default=0.0)
+        peak = float(peak) or 1.0      # an all-zero signal is left as is
+        with self.lock:
+            self.peaks[key] = peak
+            while len(self.peaks) > SIGNAL_PEAK_CACHE_SIZE:
+                self.peaks.popitem(last=False)
+        return peak
+
+    def blocks(self, params: dict):
+        """Generator of {"x", "y"} blocks covering the whole run."""
+        self.time_domain_only(params, "stream")
+        return self._blocks(params)
+
+    def _blocks(self, params: dict):
+        n = self.length(params)
+        peak = self.peak(params)
+        state = self.run_state(params)
+        for index, t in time_blocks(params["duration"], params[self.step]):
+            yield quadrature_payload({"x": t, "y": self.waveform(t, index, n, **state, **params) / peak})
+
+    def window_bounds(self, params: dict, t_start: Optional[float], t_end: Optional[float],
+                      resolution: Optional[int]):
+        """
+        (first, stop, stride) of the samples with t_start <= t <= t_end, one every
+        ⌈count / resolution⌉, found without building the time array.
+        """
+        duration, Te = params["duration"], params[self.step]
+        n = self.length(params)
+        start = -duration / 2
+        delta = (start + Te) - start
+        first, stop = 0, n
+        if t_start is not None:
+            first = min(max(math.ceil((t_start - start) / delta), 0), n)
+            while first > 0 and start + (first - 1) * delta >= t_start:
+                first -= 1
+            while first < n and start + first * delta < t_start:
+                first += 1
+        if t_end is not None:
+            stop = min(max(math.floor((t_end - start) / delta) + 1, 0), n)
+            while stop > 0 and start + (stop - 1) * delta > t_end:
+                stop -= 1
+            while stop < n and start + stop * delta <= t_end:
+                stop += 1
+        if first >= stop:
+            raise HTTPException(400, "t_start / t_end select no samples")
+        stride = 1 if resolution is None else max(1, math.ceil((stop - first) / resolution))
+        return first, stop, stride
+
+    def window_cost(self, cost, t_start: Optional[float], t_end: Optional[float], resolution: Optional[int]):
+        """Cost model `cost` restricted to the samples a window evaluates."""
+        def estimate(params: dict) -> CostEstimate:
+            full = cost(params)
+            first, stop, stride = self.window_bounds(params, t_start, t_end, resolution)
+            n = max(self.length(params), 1)
+            kept = len(range(first, stop, stride))
+            evaluated = stop if self.is_stochastic(params) else kept
+            if self.normalize and canonical_params(params) not in self.peaks:
+                evaluated += n
+            return CostEstimate(evaluated, full.flops * evaluated / n, full.nbytes * kept / n,
+                                values=full.values * kept / n, taps=full.taps)
+        return estimate
+
+    def window(self, params: dict, t_start: Optional[float], t_end: Optional[float],
+               resolution: Optional[int]) -> dict:
+        """The signal over [t_start, t_end] only, at most `resolution` samples of it."""
+        self.time_domain_only(params, "t_start / t_end / resolution")
+        duration, Te = params["duration"], params[self.step]
+        n = self.length(params)
+        index = np.arange(*self.window_bounds(params, t_start, t_end, resolution))
+        t = time_samples(duration, Te, index)
+        state = self.run_state(params)
+        if not self.is_stochastic(params) or params.get("seed") is None:
+            # Deterministic, or unseeded draws that need not match another run: evaluate the window only
+            return {"x": t, "y": self.waveform(t, index, n, **state, **params) / self.peak(params)}
+
+        # Seeded per-sample draws are sequential: replay them from the first sample, keeping the window's
+        parts = []
+        for block, t_block in time_blocks(duration, Te, stop=int(index[-1]) + 1):
+            y = self.waveform(t_block, block, n, **state, **params)
+            kept = index[(index >= block[0]) & (index <= block[-1])]
+            parts.append(y[kept - block[0]])
+        return {"x": t, "y": np.concatenate(parts) / self.peak(params)}
+
+
+# --------------------------
+# Streaming
+# --------------------------
+
+def negotiate_stream_format(accept: str):
+    """As negotiate_format, JSON being streamed as application/x-ndjson."""
+    if any(media_type == "application/x-ndjson" for media_type, _, _ in parse_accept(accept or "")):
+        return "application/x-ndjson", None
+    media_type, dtype = negotiate_format(accept)
+    return ("application/x-ndjson" if media_type == "application/json" else media_type), dtype
+
+
+def encode_stream(blocks, accept: str = "", axis: str = "array", fields: tuple = ("x", "y")):
+    """
+    Encode blocks of {"x", "y"} arrays (or of the given `fields`) one at a time, as they
+    are generated.
+
+    JSON is sent as NDJSON (one object per line), msgpack as a sequence of maps, and
+    application/octet-stream as frames of a little-endian uint32 sample count followed
+    by the samples of each field in turn (X-Stream-Fields), of the dtype given in
+    X-Stream-Dtype. With axis="implicit" the x of JSON and msgpack blocks is described
+    rather than sent (see implicit_axes).
+
+    Returns:
+        (iterator of encoded frames, media_type, headers)
+    """
+    media_type, dtype = negotiate_stream_format(accept)
+    headers = {"Vary": "Accept", "X-Stream-Fields": ",".join(fields)}
+
+    if media_type == "application/octet-stream":
+        headers["X-Stream-Dtype"] = np.dtype(dtype or "float64").newbyteorder("<").str
+
+        def frames():
+            for block in blocks:
+                arrays = [as_wire_array(block[field], dtype) for field in fields]
+                yield struct.pack("<I", arrays[0].size) + b"".join(bytes(byte_view(array)) for array in arrays)
+    elif media_type in ("application/msgpack", "application/x-msgpack"):
+        def frames():
+            for block in blocks:
+                yield encode_msgpack(implicit_axes(block) if axis == "implicit" else block, dtype)
+    else:
+        def frames():
+            for block in blocks:
+                yield encode_json(implicit_axes(block) if axis == "implicit" else block) + b"\n"
+    return frames(), media_type, headers
+
+
+# --------------------------
+# Response Cache
+# --------------------------
+
+class ResponseCache:
+    """
+    Thread-safe LRU of encoded responses, bounded by the total size of the cached bodies.
+
+    Entries store the final body and headers, so a hit skips both the NumPy work and
+    the serialization.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = self.misses = self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        body, media_type, headers = entry
+        return Response(content=body, media_type=media_type, headers={**headers, "X-Cache": "HIT"})
+
+    def put(self, key, response: Response):
+        body = bytes(response.body)
+        if len(body) > self.max_bytes:
+            return
+        headers = {name: value for name, value in response.headers.items() if name != "content-length"}
+        with self.lock:
+            if key in self.entries:
+                self.size -= len(self.entries.pop(key)[0])
+            self.entries[key] = (body, response.media_type, headers)
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, (evicted, _, _) = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "entries": len(self.entries), "bytes": self.size, "max_bytes": self.max_bytes}
+
+
+RESPONSE_CACHE = ResponseCache(int(os.environ.get("SIM_CACHE_BYTES", 64 * 2**20)))
+
+
+def canonical_params(params: dict) -> tuple:
+    """Hashable, order-independent form of a parameter dict (1 and 1.0 compare equal)."""
+    def canonical(value):
+        if isinstance(value, bool) or value is None or isinstance(value, str):
+            return value
+        if isinstance(value, (int, float, np.number)):
+            return float(value)
+        if isinstance(value, (list, tuple)):
+            return tuple(canonical(item) for item in value)
+        if isinstance(value, dict):
+            return canonical_params(value)
+        if hasattr(value, "__dict__"):
+            return (type(value).__name__, canonical_params(vars(value)))
+        return repr(value)
+    return tuple(sorted((name, canonical(value)) for name, value in params.items()))
+
+
+# --------------------------
+# Admission Control
+# --------------------------
+
+# Budget of a single request: larger ones are degraded or rejected (SIM_OVERLOAD)
+SIM_MAX_SECONDS = float(os.environ.get("SIM_MAX_SECONDS", 10.0))
+SIM_MAX_BYTES = int(os.environ.get("SIM_MAX_BYTES", 512 * 2**20))
+SIM_OVERLOAD = os.environ.get("SIM_OVERLOAD", "degrade")      # "degrade" or "reject"
+# Sustained throughput of the NumPy kernels (flop/s), to turn operation counts into seconds
+SIM_FLOPS = float(os.environ.get("SIM_FLOPS", 1e9))
+
+# Calibrated on the signal endpoints: elementwise work and peak working set per time sample
+SAMPLE_FLOPS = 50
+SAMPLE_BYTES = 128
+# Sum-of-sinusoids fading (FadingProcess) per sample: 2·FADING_SINUSOIDS cosines
+FADING_SAMPLE_FLOPS = 40 * FADING_SINUSOIDS
+# Serialization time per output value; JSON dominates every other cost without orjson
+JSON_SECONDS_PER_VALUE = 5e-8 if orjson is not None else 8e-7
+BINARY_SECONDS_PER_VALUE = 5e-9
+# Server-side decimation (LTTB) per input value
+DECIMATION_SECONDS_PER_VALUE = 6e-8
+# Output size of degraded requests that did not ask for max_points
+DEGRADED_MAX_POINTS = 5000
+
+
+class CostEstimate:
+    """
+    Predicted size of one simulation, computed from its parameters before any work starts.
+
+    Args:
+        samples: length of the main working arrays
+        flops: floating-point operations of the computation itself
+        nbytes: peak memory (bytes)
+        values: number of values in the response, before max_points
+        fft_size, taps: FFT length and convolution taps, reported for information
+    """
+
+    def __init__(self, samples: float, flops: float, nbytes: float, values: float,
+                 fft_size: int = 0, taps: int = 0):
+        self.samples = samples
+        self.flops = flops
+        self.nbytes = nbytes
+        self.values = values
+        self.fft_size = fft_size
+        self.taps = taps
+        self.seconds = flops / SIM_FLOPS
+
+    def for_response(self, media_type: str, max_points: Optional[int], streamed: bool = False,
+                     implicit_axis: bool = False) -> "CostEstimate":
+        """
+        Add the serialization of the response in `media_type`, decimated to max_points;
+        a streamed response only ever holds one block in memory and is not decimated.
+        With an implicit axis only y is serialized.
+        """
+        self.seconds = self.flops / SIM_FLOPS
+        values = self.values / 2 if implicit_axis else self.values
+        if streamed:
+            self.nbytes = min(self.nbytes, SAMPLE_BYTES * STREAM_BLOCK_SAMPLES)
+        elif max_points is not None and values > 2 * max_points:
+            self.seconds += values * DECIMATION_SECONDS_PER_VALUE
+            values = 2 * max_points     # a decimated axis is no longer regular
+        json_types = ("application/json", "application/x-ndjson")
+        per_value = JSON_SECONDS_PER_VALUE if media_type in json_types else BINARY_SECONDS_PER_VALUE
+        self.seconds += values * per_value
+        return self
+
+    def over_budget(self) -> bool:
+        return self.seconds > SIM_MAX_SECONDS or self.nbytes > SIM_MAX_BYTES
+
+    def headers(self) -> dict:
+        headers = {"X-Estimated-Samples": str(int(self.samples)),
+                   "X-Estimated-Seconds": f"{self.seconds:.3g}",
+                   "X-Estimated-Bytes": str(int(self.nbytes))}
+        if self.fft_size:
+            headers["X-Estimated-FFT-Size"] = str(int(self.fft_size))
+        if self.taps:
+            headers["X-Estimated-Taps"] = str(int(self.taps))
+        return headers
+
+    def describe(self) -> str:
+        return (f"~{self.samples:.3g} samples, {self.seconds:.3g} s and {self.nbytes / 2**20:.0f} MiB estimated "
+                f"(limits {SIM_MAX_SECONDS:g} s, {SIM_MAX_BYTES / 2**20:.0f} MiB)")
+
+
+def fft_flops(n: float) -> float:
+    return 5 * n * math.log2(max(n, 2))
+
+
+def convolution_flops(n: float, taps: float) -> float:
+    """Cost of convolve(), following its choice of strategy."""
+    short, long = sorted((n, taps))
+    if short <= CONV_DIRECT_MAX_TAPS:
+        return 2 * n * taps
+    if long >= CONV_OVERLAP_ADD_RATIO * short:
+        blocks = math.ceil((n + taps) / (2 * short))
+        return 2 * blocks * fft_flops(4 * short)
+    return 3 * fft_flops(n + taps)
+
+
+def signal_cost(step: str = "sampling_interval", taps=None, block: Optional[str] = None, fading=None):
+    """
+    Cost model of the endpoints simulating `duration / step` time samples.
+
+    Args:
+        step: name of the sampling-interval parameter
+        taps: optional function of the parameters giving the convolution length
+        block: optional name of a parameter giving an FFT size applied per block (OFDM)
+        fading: optional predicate on the parameters, true when a FadingProcess is
+                evaluated at every sample
+    """
+    def estimate(params: dict) -> CostEstimate:
+        duration, Te = params["duration"], params[step]
+        validate_positive(**{"duration": duration, step: Te})
+        n = duration / Te
+        flops, nbytes = SAMPLE_FLOPS * n, SAMPLE_BYTES * n
+        if fading is not None and fading(params):
+            flops += FADING_SAMPLE_FLOPS * n
+        n_taps = taps(params) if taps is not None else 0
+        if n_taps:
+            flops += convolution_flops(n, n_taps)
+            nbytes += 16 * (n + n_taps)
+        fft_size = 0
+        if block is not None:
+            validate_positive(**{block: params[block]})
+            flops += n * 5 * math.log2(max(params[block], 2))
+        if params.get("showDomain") == "domaine fréquentiel":
+            fft_size = n
+            flops += fft_flops(n)
+        return CostEstimate(n, flops, nbytes, values=2 * n, fft_size=fft_size, taps=n_taps)
+    return estimate
+
+
+def sweep_cost(points: str):
+    """Cost model of the endpoints evaluating a model over `params[points]` distances."""
+    def estimate(params: dict) -> CostEstimate:
+        validate_positive(**{points: params[points]})
+        n = params[points]
+        return CostEstimate(n, SAMPLE_FLOPS * n, SAMPLE_BYTES * n, values=2 * n)
+    return estimate
+
+
+def degrade_request(cost, params: dict, step: str, media_type: str, max_points: Optional[int],
+                    streamed: bool = False, implicit_axis: bool = False, max_step: Optional[float] = None):
+    """
+    Coarsen the sampling interval `step` of an over-budget request until it fits.
+
+    The interval is never made coarser than `max_step` (e.g. the Nyquist-safe interval
+    set by baseband_sampling).
+
+    Returns:
+        (params, estimate), or None when no coarser sampling fits the budget
+    """
+    for _ in range(8):
+        estimate = cost(params).for_response(media_type, max_points, streamed, implicit_axis)
+        if not estimate.over_budget():
+            return params, estimate
+        if max_step is not None and params[step] >= max_step:
+            return None
+        factor = max(estimate.seconds / SIM_MAX_SECONDS, estimate.nbytes / SIM_MAX_BYTES)
+        coarser = params[step] * factor * 1.05
+        params = {**params, step: coarser if max_step is None else min(coarser, max_step)}
+    return None
+
+
+# --------------------------
+# Execution
+# --------------------------
+
+SIM_EXECUTOR = os.environ.get("SIM_EXECUTOR", "thread")            # "thread" or "process"
+SIM_WORKERS = int(os.environ.get("SIM_WORKERS", os.cpu_count() or 1))
+# Requests admitted beyond the busy workers before answering 429
+SIM_MAX_QUEUE = int(os.environ.get("SIM_MAX_QUEUE", 4 * SIM_WORKERS))
+# Concurrency limit of the heaviest endpoints, so they cannot hold every worker
+HEAVY_CONCURRENCY = max(1, SIM_WORKERS // 2)
+# How often a queued or running simulation checks whether its client is still there (s)
+DISCONNECT_POLL_S = 0.1
+
+# Undecorated handlers and signal models by qualified name, so that process-pool workers can find them
+SIMULATION_HANDLERS = {}
+SIGNAL_MODELS = {}
+
+
+class ClientDisconnected(Exception):
+    """The client went away before its simulation finished."""
+
+
+def render_simulation(name: str, kwargs: dict, max_points, decimation, axis: str,
+                      accept: str, accept_encoding: str, window: Optional[tuple] = None):
+    """
+    Run a simulation handler and encode its result; executed in the worker pool.
+
+    Handlers are looked up by name so that the call can be pickled for a process pool.
+    With a (t_start, t_end, resolution) window, only that part of the endpoint's signal
+    model is evaluated.
+    """
+    if window is not None:
+        result = SIGNAL_MODELS[name].window(kwargs, *window)
+    else:
+        result = SIMULATION_HANDLERS[name](**kwargs)
+    if isinstance(result, Response):
+        return result
+    result = quadrature_payload(result)
+    if max_points is not None:
+        result = downsample_xy(result, max_points, decimation)
+    if axis == "implicit":
+        result = implicit_axes(result)
+    return encode_payload(result, accept, accept_encoding)
+
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """StreamingResponse releasing its executor slot however the response ends."""
+
+    def __init__(self, content, release, **kwargs):
+        super().__init__(content, **kwargs)
+        self.release = release
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.release()
+
+
+class SimulationExecutor:
+    """
+    Bounded pool running the CPU-bound simulations off the event loop.
+
+    At most `workers + max_queue` requests are admitted at once (429 beyond), each
+    endpoint within its own concurrency limit. When the client disconnects, queued
+    work is cancelled; work already running cannot be interrupted and its result
+    is dropped.
+    """
+
+    def __init__(self, kind: str = "thread", workers: int = 1, max_queue: int = 0):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor {kind}")
+        self.kind = kind
+        self.workers = workers
+        self.max_queue = max_queue
+        self.pool = None
+        self.stream_pool = None          # threads iterating streamed responses
+        self.limits = {}                 # endpoint name → asyncio.Semaphore
+        self.in_flight = 0
+        self.rejected = self.cancelled = 0
+        self.lock = threading.Lock()
+
+    def get_pool(self) -> concurrent.futures.Executor:
+        with self.lock:
+            if self.pool is None:
+                if self.kind == "process":
+                    self.pool = concurrent.futures.ProcessPoolExecutor(self.workers)
+                else:
+                    self.pool = concurrent.futures.ThreadPoolExecutor(self.workers, thread_name_prefix="simulation")
+            return self.pool
+
+    def get_stream_pool(self) -> concurrent.futures.Executor:
+        """Generators cannot be sent to other processes: streams always run in threads."""
+        if self.kind == "thread":
+            return self.get_pool()
+        with self.lock:
+            if self.stream_pool is None:
+                self.stream_pool = concurrent.futures.ThreadPoolExecutor(self.workers, thread_name_prefix="stream")
+            return self.stream_pool
+
+    def limit(self, name: str, concurrency: Optional[int]) -> asyncio.Semaphore:
+        if name not in self.limits:
+            self.limits[name] = asyncio.Semaphore(min(concurrency or self.workers, self.workers))
+        return self.limits[name]
+
+    def admit(self):
+        """Count one more request in flight, 429 when the pool and its queue are full."""
+        if self.in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(429, "Simulation queue is full, retry later", headers={"Retry-After": "1"})
+        self.in_flight += 1
+
+    async def run(self, request: Request, name: str, concurrency: Optional[int], fn, *args):
+        """Run fn(*args) in the pool on behalf of `request`."""
+        self.admit()
+        try:
+            async with self.limit(name, concurrency):
+                if await request.is_disconnected():
+                    raise ClientDisconnected
+                future = asyncio.get_running_loop().run_in_executor(self.get_pool(), fn, *args)
+                while True:
+                    done, _ = await asyncio.wait({future}, timeout=DISCONNECT_POLL_S)
+                    if done:
+                        return future.result()
+                    if await request.is_disconnected():
+                        future.cancel()
+                        raise ClientDisconnected
+        except ClientDisconnected:
+            self.cancelled += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+    def stream(self, name: str, concurrency: Optional[int], frames, **response) -> StreamingResponse:
+        """
+        Streamed response of `frames`, admitted now like `run` admits its request: the
+        slot is released once the frames are exhausted or abandoned, or once the response
+        has been sent (or failed) when its body was never iterated.
+        """
+        self.admit()
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                self.in_flight -= 1
+
+        return AdmittedStreamingResponse(self.iterate(name, concurrency, frames, release), release, **response)
+
+    async def iterate(self, name: str, concurrency: Optional[int], frames, release):
+        """
+        Pull the frames of a streamed response one at a time from the pool. Starlette
+        cancels the iteration when the client disconnects; the block being computed is
+        the last one.
+        """
+        try:
+            async with self.limit(name, concurrency):
+                loop = asyncio.get_running_loop()
+                while True:
+                    frame = await loop.run_in_executor(self.get_stream_pool(), next, frames, None)
+                    if frame is None:
+                        return
+                    yield frame
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            release()
+
+    def stats(self) -> dict:
+        return {"executor": self.kind, "workers": self.workers, "max_queue": self.max_queue,
+                "in_flight": self.in_flight, "rejected": self.rejected, "cancelled": self.cancelled}
+
+
+SIMULATION_EXECUTOR = SimulationExecutor(SIM_EXECUTOR, SIM_WORKERS, SIM_MAX_QUEUE)
+
+
+def simulation_endpoint(endpoint=None, *, cache=False, concurrency: Optional[int] = None,
+                        cost=None, degrade: Optional[str] = None, signal_model: Optional[SignalModel] = None,
+                        prepare=None):
+    """
+    Decorator for endpoints returning dicts of NumPy arrays.
+
+    Adds the optional `max_points` / `decimation` query parameters (see downsample_xy),
+    `axis=implicit` to describe a regular x axis instead of sending it (see
+    describe_uniform_axis), and encodes the result with `encode_payload` from the
+    request's Accept headers.
+    Responses returned by the endpoint are passed through untouched.
+
+    The (synchronous) endpoint and the encoding run in SIMULATION_EXECUTOR, never on
+    the event loop.
+
+    Args:
+        cache: True for endpoints that are pure functions of their parameters, or a
+               predicate `cache(params) -> bool` for endpoints that are only pure for some
+               parameter values; such responses are served from RESPONSE_CACHE.
+        concurrency: maximum number of concurrent runs of this endpoint (default: the
+               pool size).
+        cost: cost model `cost(params) -> CostEstimate`, checked against the request
+              budget before the simulation is queued; the estimate is sent back in
+              X-Estimated-* headers.
+        degrade: name of the sampling-interval parameter that may be coarsened (and
+                 max_points capped) to bring an over-budget request within budget when
+                 SIM_OVERLOAD is "degrade"; requests that cannot be degraded get a 400.
+        signal_model: the endpoint's time-domain signal as a SignalModel; adds a `stream`
+                 query parameter sending the result as it is generated (see encode_stream),
+                 with constant memory whatever the duration, and `t_start` / `t_end` /
+                 `resolution` to evaluate only a window of it, e.g. to zoom on a plot.
+        prepare: `prepare(params) -> params` applied before anything else, to validate or
+                 derive parameters (e.g. baseband_sampling); a `prepare.max_step(params)`
+                 caps how far `degrade` may coarsen the sampling interval.
+    """
+    if endpoint is None:
+        return functools.partial(simulation_endpoint, cache=cache, concurrency=concurrency,
+                                 cost=cost, degrade=degrade, signal_model=signal_model, prepare=prepare)
+
+    name = endpoint.__qualname__
+    SIMULATION_HANDLERS[name] = endpoint
+    if signal_model is not None:
+        SIGNAL_MODELS[name] = signal_model
+    signature = inspect.signature(endpoint)
+    extra_params = [
+        inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+        inspect.Parameter("max_points", inspect.Parameter.KEYWORD_ONLY, annotation=Optional[int],
+                          default=Query(None, ge=3)),
+        inspect.Parameter("decimation", inspect.Parameter.KEYWORD_ONLY, annotation=str, default="lttb"),
+        inspect.Parameter("axis", inspect.Parameter.KEYWORD_ONLY, annotation=str, default="array"),
+    ]
+    if signal_model is not None:
+        extra_params += [
+            inspect.Parameter("stream", inspect.Parameter.KEYWORD_ONLY, annotation=bool, default=False),
+            inspect.Parameter("t_start", inspect.Parameter.KEYWORD_ONLY, annotation=Optional[float], default=None),
+            inspect.Parameter("t_end", inspect.Parameter.KEYWORD_ONLY, annotation=Optional[float], default=None),
+            inspect.Parameter("resolution", inspect.Parameter.KEYWORD_ONLY, annotation=Optional[int],
+                              default=Query(None, ge=2)),
+        ]
+    params = [p.replace(kind=inspect.Parameter.KEYWORD_ONLY) for p in signature.parameters.values()]
+
+    @functools.wraps(endpoint)
+    async def wrapper(*, request: Request, max_points=None, decimation="lttb", axis="array", stream=False,
+                      t_start=None, t_end=None, resolution=None, **kwargs):
+        accept = request.headers.get("accept", "")
+        accept_encoding = request.headers.get("accept-encoding", "")
+        if axis not in AXIS_MODES:
+            raise HTTPException(400, f"axis must be one of {', '.join(AXIS_MODES)}")
+        if prepare is not None:
+            kwargs = prepare(kwargs)
+        window = None
+        if (t_start, t_end, resolution) != (None, None, None):
+            if stream:
+                raise HTTPException(400, "stream cannot be combined with t_start / t_end / resolution")
+            window = (t_start, t_end, resolution)
+            signal_model.time_domain_only(kwargs, "t_start / t_end / resolution")
+        model_cost = cost
+        if cost is not None and window is not None:
+            model_cost = signal_model.window_cost(cost, *window)
+        headers = {}
+        if cost is not None:
+            media_type = (negotiate_stream_format if stream else negotiate_format)(accept)[0]
+            estimate = model_cost(kwargs).for_response(media_type, max_points, stream, implicit_axis=axis == "implicit")
+            if estimate.over_budget():
+                degraded = None
+                if SIM_OVERLOAD == "degrade" and degrade is not None:
+                    max_points = max_points or DEGRADED_MAX_POINTS
+                    max_step = getattr(prepare, "max_step", None)
+                    degraded = degrade_request(model_cost, kwargs, degrade, media_type, max_points, stream,
+                                               implicit_axis=axis == "implicit",
+                                               max_step=max_step(kwargs) if max_step is not None else None)
+                if degraded is None:
+                    raise HTTPException(400, f"Simulation too large: {estimate.describe()}")
+                kwargs, estimate = degraded
+                headers["X-Degraded"] = f"{degrade}={kwargs[degrade]:.6g}" + ("" if stream else f"; max_points={max_points}")
+            headers.update(estimate.headers())
+
+        if stream:
+            frames, media_type, stream_headers = encode_stream(signal_model.blocks(kwargs), accept, axis,
+                                                               signal_model.fields(kwargs))
+            return SIMULATION_EXECUTOR.stream(name, concurrency, frames,
+                                              media_type=media_type, headers={**stream_headers, **headers})
+
+        key = None
+        if cache is True or (cache and cache(kwargs)):
+            key = (name, canonical_params(kwargs), window, max_points, decimation, axis,
+                   negotiate_format(accept), negotiate_encoding(accept_encoding))
+            cached = RESPONSE_CACHE.get(key)
+            if cached is not None:
+                return cached
+
+        try:
+            response = await SIMULATION_EXECUTOR.run(
+                request, name, concurrency,
+                render_simulation, name, kwargs, max_points, decimation, axis, accept, accept_encoding, window)
+        except ClientDisconnected:
+            return Response(status_code=499)    # nobody is listening any more
+
+        response.headers.update(headers)
+        if key is not None:
+            RESPONSE_CACHE.put(key, response)
+            response.headers["X-Cache"] = "MISS"
+        return response
+
+    wrapper.__signature__ = signature.replace(parameters=[*extra_params, *params])
+    return wrapper
+
+
+@app.get("/cache-stats")
+def cache_stats():
+    """Hit / miss / eviction counters and current size of the response cache."""
+    return RESPONSE_CACHE.stats()
+
+
+@app.get("/executor-stats")
+def executor_stats():
+    """Pool configuration, requests in flight and rejected (429) / cancelled counters."""
+    return SIMULATION_EXECUTOR.stats()
+
+
 # --------------------------
 # Signal Generation Endpoints
 # --------------------------
 
 
 @app.get("/rayleign-path-loss")
+@simulation_endpoint(cache=is_seeded, cost=sweep_cost("num_paths"))
 def rayleginPathLoss(
     fading_model: int = 2,
     num_paths: int = 500,
     threshold_db: float = 120.0,
+    seed: Optional[int] = None,
 ):
-    path_loss_db , gains,distances = apply_fading(fading_model, num_paths)
+    path_loss_db , gains,distances = apply_fading(fading_model, num_paths, rng=make_rng(seed))
     # Option B: mean of individual losses
     loss = float(np.mean(path_loss_db))            
     coverageRadius = calculate_coverage_radius(distances, path_loss_db, threshold_db)
@@ -419,6 +2497,9 @@ def rayleginPathLoss(
 
 
 @app.get("/fading")
+@simulation_endpoint(cache=lambda params: params["showLoss"] != "Oui" or is_seeded(params),
+                     cost=signal_cost("Te", taps=lambda params: params["num_paths"] if params["showLoss"] == "Oui" else 0),
+                     degrade="Te")
 def fading_endpoint(
     duration: float = 1.0,
     Te: float = 0.001,
@@ -428,7 +2509,9 @@ def fading_endpoint(
     fading_model: int = 2,
     num_paths: int = 500,
     showLoss:str = "Oui",
-    showDomain:str = "domaine fréquentiel" #domaine temporel || domaine fréquentiel
+    showDomain:str = "domaine fréquentiel", #domaine temporel || domaine fréquentiel
+    seed: Optional[int] = None,
+    spectrum: SpectrumParams = Depends(),
 ):
     """
     Returns a JSON with:
@@ -443,76 +2526,229 @@ def fading_endpoint(
 
     if showLoss == "Oui":
         # Apply fading (multipath) to the sinusoidal signal.
-        path_loss_db , gains = apply_fading(fading_model, num_paths)    
-        sampled_signal = np.convolve(signal, gains)    
+        path_loss_db , gains, _ = apply_fading(fading_model, num_paths, rng=make_rng(seed))
+        # causal multipath output, kept on the time axis of the input
+        sampled_signal = convolve(signal, gains)[:t.size]
         # In case the sampled signal is complex, we take the real part.
-        signal = [float(x.real) for x in sampled_signal.tolist()]
-        # signal = np.abs(sampled_signal).tolist()
+        signal = sampled_signal.real
+        # signal = np.abs(sampled_signal)
 
 
     if showDomain == "domaine fréquentiel":
-        f, signal = generate_frequency(signal=signal, Te=Te)
+        f, signal = generate_frequency(signal=signal, Te=Te, **spectrum.options())
         return {
-            "x":         f.tolist(),
-            "y":         signal.tolist(),
+            "x":         f,
+            "y":         signal,
             "x_label":   "Fréquence (Hz)"
         }
     else:
         return {
-            "x":         t.tolist(),
+            "x":         t,
             "y":         signal,            
         }
 
 
+def tdl_cost(params: dict) -> CostEstimate:
+    """Cost model of /tdl-channel: one FFT of every realization."""
+    validate_positive(realizations=params["realizations"], fft_size=params["fft_size"])
+    count, n = params["realizations"], params["fft_size"]
+    return CostEstimate(count * n, count * fft_flops(n), 48 * count * n, values=2 * n, fft_size=n)
+
+
+@app.get("/tdl-channel")
+@simulation_endpoint(cache=lambda params: params["show"] == "pdp" or is_seeded(params),
+                     concurrency=HEAVY_CONCURRENCY, cost=tdl_cost)
+def tdl_channel(
+    profile: str = "EPA",                 # EPA | EVA | ETU | exponential | custom
+    delay_spread_ns: float = 100.0,       # decay of the exponential profile (≈ its RMS delay spread)
+    delays_ns: Optional[List[float]] = Query(None),   # custom profile
+    powers_db: Optional[List[float]] = Query(None),
+    sampling_interval_ns: float = 10.0,
+    realizations: int = 1000,
+    fft_size: int = 1024,
+    show: str = "frequency_response",     # pdp | impulse | frequency_response
+    seed: Optional[int] = None,
+):
+    """
+    Tapped-delay-line multipath channel resampled at sampling_interval_ns.
+
+    Returns, besides the delay statistics of the profile:
+      - pdp: mean power (dB) of every sample-spaced tap
+      - impulse: |h| of one channel realization
+      - frequency_response: |H(f)|² (dB) averaged over `realizations` draws, and of the first one
+    """
+    Te = sampling_interval_ns * 1e-9
+    validate_positive(sampling_interval_ns=sampling_interval_ns)
+    channel = TappedDelayLine.from_query(profile, Te, delay_spread_ns, delays_ns, powers_db)
+    stats = {
+        "mean_delay_ns": channel.mean_delay_s * 1e9,
+        "rms_delay_spread_ns": channel.rms_delay_spread_s * 1e9,
+        # 50 % frequency correlation, ≈ 1 / (5·σ_τ)
+        "coherence_bandwidth_Hz": 1 / (5 * channel.rms_delay_spread_s) if channel.rms_delay_spread_s else None,
+    }
+    if show == "pdp":
+        powers = channel.tap_powers(Te)
+        return {**stats, "x": np.arange(powers.size) * sampling_interval_ns,
+                "y": 10 * np.log10(np.maximum(powers, DB_FLOOR)),
+                "x_label": "Retard (ns)", "y_label": "Puissance (dB)"}
+
+    rng = make_rng(seed)
+    if show == "impulse":
+        taps = channel.realizations(1, Te, rng)[0]
+        return {**stats, "x": np.arange(taps.size) * sampling_interval_ns, "y": np.abs(taps),
+                "x_label": "Retard (ns)"}
+    if show != "frequency_response":
+        raise HTTPException(400, "show must be one of pdp, impulse, frequency_response")
+
+    taps = channel.realizations(realizations, Te, rng)
+    if taps.shape[-1] > fft_size:
+        raise HTTPException(400, f"fft_size must cover the {taps.shape[-1]} channel taps")
+    # every realization transformed in one batched FFT
+    response = np.abs(scipy.fft.fft(taps, fft_size, axis=-1, workers=FFT_WORKERS)) ** 2
+    f = scipy.fft.fftshift(scipy.fft.fftfreq(fft_size, d=Te))
+    return {
+        **stats,
+        "x": f,
+        "y": scipy.fft.fftshift(10 * np.log10(np.maximum(response.mean(axis=0), DB_FLOOR))),
+        "y_realization": scipy.fft.fftshift(10 * np.log10(np.maximum(response[0], DB_FLOOR))),
+        "x_label": "Fréquence (Hz)",
+        "y_label": "|H(f)|² (dB)",
+    }
+
+
+def fading_statistics_method(params: dict) -> str:
+    """Closed forms unless sampling is asked for, or needed for composite (shadowed) fading."""
+    method = params["method"]
+    if method not in FADING_STATISTICS_METHODS:
+        raise HTTPException(400, f"method must be one of {', '.join(FADING_STATISTICS_METHODS)}")
+    if method == "auto":
+        return "monte_carlo" if params["shadowing_db"] else "closed_form"
+    if method == "closed_form" and params["shadowing_db"]:
+        raise HTTPException(400, "shadowed fading has no closed form, use method=monte_carlo")
+    return method
+
+
+def fading_statistics_cost(params: dict) -> CostEstimate:
+    points = params["points"]
+    if fading_statistics_method(params) == "closed_form":
+        return CostEstimate(points, SAMPLE_FLOPS * points, SAMPLE_BYTES * points, values=2 * points)
+    validate_positive(realizations=params["realizations"], samples=params["samples"])
+    draws = params["realizations"] * params["samples"]
+    # every draw kept in dB for the sort, plus the ~3 temporaries of the chunk being drawn
+    return CostEstimate(draws, draws * (SAMPLE_FLOPS + 5 * math.log2(max(draws, 2))),
+                        8 * draws + 24 * min(draws, FADING_STATISTICS_CHUNK), values=2 * points)
+
+
+@app.get("/fading-statistics")
+@simulation_endpoint(cache=lambda params: fading_statistics_method(params) == "closed_form" or is_seeded(params),
+                     cost=fading_statistics_cost)
+def fading_statistics(
+    envelope: str = "rayleigh",        # rayleigh | rician | nakagami
+    k_db: float = 10.0,                # Rice factor (dB)
+    m: float = 1.0,                    # Nakagami shape parameter
+    shadowing_db: float = 0.0,         # log-normal shadowing standard deviation (dB), 0 for none
+    threshold_db: float = -10.0,       # outage threshold, relative to the mean power
+    reliability: float = Query(0.99, gt=0, lt=1),   # target for the fade margin
+    db_min: float = -40.0,
+    db_max: float = 10.0,
+    points: int = Query(201, ge=2),
+    method: str = "auto",              # auto | closed_form | monte_carlo
+    realizations: int = 1000,          # Monte-Carlo: M rows ...
+    samples: int = 1000,               # ... of N independent fades
+    seed: Optional[int] = None,
+):
+    """
+    Distribution of the received power of a fading channel, relative to its mean power Ω.
+
+    Returns:
+      - x / y: CDF P(|h|²/Ω ≤ x dB), i.e. the outage probability for a threshold of x dB
+      - outage_probability: the CDF at threshold_db
+      - fade_margin_db: margin above the mean power for which the outage is 1 - reliability
+      - method: "closed_form" (Rayleigh, Rician via Marcum-Q, Nakagami via the regularized
+        gamma) or "monte_carlo" (M×N draws, needed with shadowing), with its standard error
+    """
+    validate_fading_envelope(envelope, m)
+    if db_max <= db_min:
+        raise HTTPException(400, "db_max must be greater than db_min")
+    method = fading_statistics_method({"method": method, "shadowing_db": shadowing_db})
+    K = db_to_watts(k_db)
+    levels_db = np.linspace(db_min, db_max, points)
+
+    result = {"method": method, "x_label": "Seuil / puissance moyenne (dB)", "y_label": "P(coupure)"}
+    if method == "closed_form":
+        cdf = fading_power_cdf(envelope, db_to_watts(levels_db), K, m)
+        outage = fading_power_cdf(envelope, db_to_watts(threshold_db), K, m)
+        quantile = fading_power_quantile(envelope, 1 - reliability, K, m)
+    else:
+        # M×N draws, one 2D array per chunk of rows, written in dB into one buffer sorted in place
+        rng = make_rng(seed)
+        rows = max(1, FADING_STATISTICS_CHUNK // samples)
+        sorted_db = np.empty((realizations, samples))
+        for start in range(0, realizations, rows):
+            chunk = sorted_db[start:start + rows]
+            chunk[:] = 10 * np.log10(fading_power_samples(envelope, chunk.shape, K, m, shadowing_db, rng))
+        sorted_db = sorted_db.ravel()
+        sorted_db.sort()
+        draws = sorted_db.size
+        cdf = np.searchsorted(sorted_db, levels_db, side="right") / draws
+        outage = np.searchsorted(sorted_db, threshold_db, side="right") / draws
+        # linear interpolation between order statistics, as np.quantile does without its copy
+        position = (draws - 1) * (1 - reliability)
+        below = int(position)
+        above = min(below + 1, draws - 1)
+        quantile = db_to_watts(sorted_db[below] + (position - below) * (sorted_db[above] - sorted_db[below]))
+        result["y_stderr"] = np.sqrt(cdf * (1 - cdf) / draws)
+        result["outage_stderr"] = math.sqrt(outage * (1 - outage) / draws)
+
+    return {
+        **result,
+        "x": levels_db,
+        "y": cdf,
+        "outage_probability": float(outage),
+        "fade_margin_db": float(-10 * np.log10(quantile)) if quantile > 0 else None,
+    }
+
+
 @app.get("/Cost231/pathLoss")
+@simulation_endpoint(cache=True)
 def pathLossCost(
     f: float = 900,
     h_b: float = 30,
     h_m: float = 1.5,
     distance: float = 1,  # en km
-    steps: int = 1000,
-    max_distance_km:float = 5.0,        # sweep out to this (km)
+    max_distance_km:float = 5.0,        # search out to this (km)
     threshold_db:float=120,#max acceptable path loss
     environment: str = "rural",
+    tolerance_m: float = 1.0,           # precision of the radius search (m); analytic inverses are exact
 ):
     attenuation = calculate_cost231(f, h_b, h_m, distance, environment)
-    # 2) Compute path loss at each distance
+    # 2) Invert the (log-linear) model for the coverage radius
     min_d = 1e-4  # 1 m
-    distances = np.linspace(min_d, max_distance_km, steps)
-    losses = np.array([
-        calculate_cost231(f, h_b, h_m, d, environment)
-        for d in distances
-    ])
-    coverageRadius = calculate_coverage_radius(distances=distances,path_loss_db=losses,threshold_db=threshold_db) * 1000
+    coverageRadius = solve_coverage_radius(
+        lambda d: calculate_cost231(f, h_b, h_m, d, environment),
+        threshold_db, min_d, max_distance_km,
+        inverse=invert_log_linear, tolerance=tolerance_m / 1000) * 1000
     return {
         "value":attenuation,
         "coverageRadius":  coverageRadius
         }
 
-@app.get("/Cost231/fading")
-def simulate_parameters(
-    f: float = 900,
-    h_bs: float = 30,
-    h_ms: float = 1.5,
-    d: float = 0.001,  # 1 meter distance for visible signal
-    environment: str = "rural",
-    apply_fading: str = "Non",            
+def cost231_fading(rng=None, *, f, apply_fading, speed_kmh=None, **_):
+    """Doppler fading of /Cost231/fading, or None for independent draws at every sample."""
+    if apply_fading != "Oui" or speed_kmh is None:
+        return None
+    return FadingProcess(max_doppler(speed_kmh, f * 1e6), "rayleigh", rng=rng)
 
-    duration:float = 1,    
-    sampling_interval: float = 0.001,
-    showLoss:str = "Oui",
-    showDomain:str = "domaine temporel" #domaine temporel || domaine fréquentiel
-):
+
+def cost231_waveform(t, index, n, *, f, h_bs, h_ms, d, environment, apply_fading, showLoss, rng=None,
+                     fading=None, **_):
     """
-    Simulate wireless channel with COST231 model and optional fading,
-    using predefined signal generation functions.
+    Signal of /Cost231/fading at times t: the Rayleigh fading follows `fading` (a
+    FadingProcess) if given, else is drawn independently per sample from `rng`.
     """
     # Calculate attenuation
     attenuation = calculate_cost231(f, h_bs, h_ms, d, environment)
 
-    # Generate time array using predefined function    
-    t = generate_time_array(duration=duration, Te=sampling_interval)
-
     # Create carrier signal using predefined sinus generator
     carrier_freq = 20  # Visualizable frequency
     tx_power_dbm = 50  # Stronger signal for visibility 
@@ -529,25 +2765,66 @@ def simulate_parameters(
     if(showLoss == "Oui"):
         signal *= db_to_watts(-attenuation)
 
-    if apply_fading == "Oui":
-        signal *= np.random.rayleigh(scale=1.0, size=len(t))
+    if apply_fading == "Oui" and fading is not None:
+        # same mean power (2) as rayleigh(scale=1.0)
+        signal *= np.sqrt(2) * np.abs(fading.gains(t))
+    elif apply_fading == "Oui":
+        rng = make_rng() if rng is None else rng
+        signal *= rng.rayleigh(scale=1.0, size=len(t))
+    return signal
 
 
+@app.get("/Cost231/fading")
+@simulation_endpoint(cache=lambda params: params["apply_fading"] != "Oui" or is_seeded(params),
+                     cost=signal_cost(fading=lambda params: params["apply_fading"] == "Oui"
+                                      and params["speed_kmh"] is not None),
+                     degrade="sampling_interval",
+                     signal_model=SignalModel(cost231_waveform, fading=cost231_fading,
+                                              stochastic=lambda params: params["apply_fading"] == "Oui"
+                                              and params["speed_kmh"] is None))
+def simulate_parameters(
+    f: float = 900,
+    h_bs: float = 30,
+    h_ms: float = 1.5,
+    d: float = 0.001,  # 1 meter distance for visible signal
+    environment: str = "rural",
+    apply_fading: str = "Non",            
+
+    duration:float = 1,    
+    sampling_interval: float = 0.001,
+    showLoss:str = "Oui",
+    showDomain:str = "domaine temporel", #domaine temporel || domaine fréquentiel
+    seed: Optional[int] = None,
+    speed_kmh: Optional[float] = None,   # mobile speed: time-correlated (Jakes) fading instead of i.i.d.
+    spectrum: SpectrumParams = Depends(),
+):
+    """
+    Simulate wireless channel with COST231 model and optional fading,
+    using predefined signal generation functions.
+    """
+    # Generate time array using predefined function    
+    t = generate_time_array(duration=duration, Te=sampling_interval)
+    rng = make_rng(seed)
+    fading = cost231_fading(rng, f=f, apply_fading=apply_fading, speed_kmh=speed_kmh)
+    signal = cost231_waveform(t, None, t.size, f=f, h_bs=h_bs, h_ms=h_ms, d=d, environment=environment,
+                              apply_fading=apply_fading, showLoss=showLoss, rng=rng, fading=fading)
+
     if showDomain == "domaine fréquentiel":
-        f, signal = generate_frequency(signal=signal, Te=sampling_interval)
+        f, signal = generate_frequency(signal=signal, Te=sampling_interval, **spectrum.options())
         return {
-            "x":         f.tolist(),
-            "y":         signal.tolist(),
+            "x":         f,
+            "y":         signal,
             "x_label":   "Fréquence (Hz)"
         }
     else:
         return {
-            "x":         t.tolist(),
-            "y":         signal.tolist(),            
+            "x":         t,
+            "y":         signal,            
         }
 
 
 @app.get("/fspl-dbLoss")
+@simulation_endpoint(cache=True)
 def fsplPathLoss(
     carrier_frequency_GHz: float = 2.4,  # Carrier frequency in GHz for FSPL * 10^9
     distance: float = 1,             # Distance in meters (e.g., 1km) en km               
@@ -557,29 +2834,16 @@ def fsplPathLoss(
 
     # 2) Analytic coverage radius (km) for FSPL ≤ threshold_db
     #    d_max = 10^((threshold - 20·log10(f_GHz) - 92.45) / 20)
-    coverageRadius = float(
-        10 ** ((threshold_db
+    coverageRadius = 10 ** ((threshold_db
                 - 20 * np.log10(carrier_frequency_GHz)
                 - 92.45) / 20) * 1000
-    )
     return {
         "value":fspl_db,
         "coverageRadius":  coverageRadius
         }
 
-@app.get('/fspl')
-def get_fspl(
-    carrier_frequency_GHz: float = 2.4,  # Carrier frequency in GHz for FSPL * 10^9
-    baseband_frequency_Hz: float = 10,  # Baseband signal frequency in Hz
-    distance_m: float = 1,             # Distance in meters (e.g., 1km) en km               
-
-    duration:float = 1,    
-    sampling_interval: float = 0.001,
-    showLoss:str = "Oui",
-    showDomain:str = "domaine temporel" #domaine temporel || domaine fréquentiel
-):     
-    t = generate_time_array(duration=duration, Te=sampling_interval)
-
+def fspl_waveform(t, index, n, *, carrier_frequency_GHz, baseband_frequency_Hz, distance_m, showLoss, **_):
+    """Signal of /fspl at times t (samples `index` of n, all of them if None)."""
     # Generate baseband signal (sine wave at baseband frequency)
     signal = np.sin(2 * np.pi * baseband_frequency_Hz * t)
 
@@ -590,46 +2854,86 @@ def get_fspl(
         attenuation = db_to_amplitude(-fspl_db)            
         # Apply attenuation to the signal
         signal *= attenuation * 1e4
+    return signal
 
 
+@app.get('/fspl')
+@simulation_endpoint(cache=True, cost=signal_cost(), degrade="sampling_interval",
+                     signal_model=SignalModel(fspl_waveform))
+def get_fspl(
+    carrier_frequency_GHz: float = 2.4,  # Carrier frequency in GHz for FSPL * 10^9
+    baseband_frequency_Hz: float = 10,  # Baseband signal frequency in Hz
+    distance_m: float = 1,             # Distance in meters (e.g., 1km) en km               
+
+    duration:float = 1,    
+    sampling_interval: float = 0.001,
+    showLoss:str = "Oui",
+    showDomain:str = "domaine temporel", #domaine temporel || domaine fréquentiel
+    spectrum: SpectrumParams = Depends(),
+):     
+    t = generate_time_array(duration=duration, Te=sampling_interval)
+    signal = fspl_waveform(t, None, t.size, carrier_frequency_GHz=carrier_frequency_GHz,
+                           baseband_frequency_Hz=baseband_frequency_Hz, distance_m=distance_m,
+                           showLoss=showLoss)
+
     if showDomain == "domaine fréquentiel":
-        f, signal = generate_frequency(signal=signal, Te=sampling_interval)
+        f, signal = generate_frequency(signal=signal, Te=sampling_interval, **spectrum.options())
         return {
-            "x":         f.tolist(),
-            "y":         signal.tolist(),
+            "x":         f,
+            "y":         signal,
             "x_label":   "Fréquence (Hz)"
         }
     else:
         return {
-            "x":         t.tolist(),
-            "y":         signal.tolist(),            
+            "x":         t,
+            "y":         signal,            
         }
 
 
 @app.get("/itu-r-p1411-pathLoss")
+@simulation_endpoint(cache=True)
 def ituPathLoss(
     frequency_MHz: float = 2400,    # Frequency in MHz
     environment: str = "urban",    # Options: urban, suburban, open        
     distance:float = 0.1, #distance en km
     threshold_db:    float = 120.0,     # max acceptable PL in dB    
     max_distance_km: float = 5.0,       # how far to search (km)
-    steps:           int   = 1000,      # sweep resolution
+    tolerance_m:     float = 1.0,       # precision of the radius search (m); analytic inverses are exact
 ):
-    delta_nlos = {"urban": 20, "suburban": 15, "open": 10}.get(environment, 20)
-    L_dB = nlos_loss(frequency_MHz, distance, delta_nlos)            
+    delta_nlos = NLOS_DELTA_DB.get(environment, 20)
+    L_dB = nlos_loss(frequency_MHz, distance, delta_nlos)
 
-     # 2) Sweep distances from ~0 up to max_distance_km
+    # 2) Invert the (log-linear) model between ~0 and max_distance_km
     min_d = 1e-4  # avoid log(0) or zero-distance artifacts
-    distances = np.linspace(min_d, max_distance_km, steps)
-    losses    = np.array([
-        nlos_loss(frequency_MHz, d, delta_nlos)
-        for d in distances
-    ])
-    coverageRadius = calculate_coverage_radius(distances, losses, threshold_db)*1000
+    coverageRadius = solve_coverage_radius(
+        lambda d: nlos_loss(frequency_MHz, d, delta_nlos),
+        threshold_db, min_d, max_distance_km,
+        inverse=invert_log_linear, tolerance=tolerance_m / 1000)*1000
 
     return {"value":L_dB,"coverageRadius":coverageRadius}
 
+def itu_r_p1411_waveform(t, index, n, *, frequency_MHz, d_min, d_max, environment, f_signal, P0,
+                         amplitude, showLoss, **_):
+    """Received power of /itu-r-p1411 at times t (samples `index` of n, all of them if None)."""
+    # Generate sinusoidal transmitted power
+    P_tx_dB = P0 + amplitude * np.sin(2 * np.pi * f_signal * t)    
+
+    # Apply path loss to get received signal
+    signal = db_to_watts(P_tx_dB)
+    if showLoss == "Oui":
+        # Distances (receiver moving from d_min to d_max)
+        distances_km = linspace_samples(d_min, d_max, n, index) / 1000
+        # Calculate path loss based on los        
+        # Determine delta_nlos based on environment
+        delta_nlos = NLOS_DELTA_DB.get(environment, 20)
+        L_dB = nlos_loss(frequency_MHz, distances_km, delta_nlos)
+        signal *= db_to_amplitude(-L_dB) * 1e15
+    return signal
+
+
 @app.get("/itu-r-p1411")
+@simulation_endpoint(cache=True, cost=signal_cost(), degrade="sampling_interval",
+                     signal_model=SignalModel(itu_r_p1411_waveform))
 def run_itu_r_p1411_simulation(
     frequency_MHz: float = 2400,    # Frequency in MHz
     d_min: float = 1,              # Minimum distance in meters
@@ -641,7 +2945,8 @@ def run_itu_r_p1411_simulation(
     amplitude:float=1,
     sampling_interval: float = 0.001,
     showLoss:str = "Oui",
-    showDomain:str = "domaine temporel" #domaine temporel || domaine fréquentiel
+    showDomain:str = "domaine temporel", #domaine temporel || domaine fréquentiel
+    spectrum: SpectrumParams = Depends(),
 ):
     """
     Simulate ITU-R P.1411 path loss model applied to a sinusoidal signal over time.
@@ -662,37 +2967,25 @@ def run_itu_r_p1411_simulation(
     """ 
     # Generate time points
     t = generate_time_array(duration=duration,Te=sampling_interval)
-
-    # Generate distances (receiver moving from d_min to d_max)
-    distances_m = np.linspace(d_min, d_max, len(t))
-    distances_km = distances_m / 1000
-
-    # Generate sinusoidal transmitted power
-    P_tx_dB = P0 + amplitude * np.sin(2 * np.pi * f_signal * t)    
-
-    # Apply path loss to get received signal
-    signal = db_to_watts(P_tx_dB)
-    if showLoss == "Oui":
-        # Calculate path loss based on los        
-        # Determine delta_nlos based on environment
-        delta_nlos = {"urban": 20, "suburban": 15, "open": 10}.get(environment, 20)
-        L_dB = nlos_loss(frequency_MHz, distances_km, delta_nlos)
-        signal *= db_to_amplitude(-L_dB) * 1e15
+    signal = itu_r_p1411_waveform(t, None, t.size, frequency_MHz=frequency_MHz, d_min=d_min, d_max=d_max,
+                                  environment=environment, f_signal=f_signal, P0=P0,
+                                  amplitude=amplitude, showLoss=showLoss)
 
     if showDomain == "domaine fréquentiel":
-        f, signal = generate_frequency(signal=signal, Te=sampling_interval)
+        f, signal = generate_frequency(signal=signal, Te=sampling_interval, **spectrum.options())
         return {
-            "x":         f.tolist(),
-            "y":         signal.tolist(),
+            "x":         f,
+            "y":         signal,
             "x_label":   "Fréquence (Hz)"
         }
     else:
         return {
-            "x":         t.tolist(),
-            "y":         signal.tolist(),            
+            "x":         t,
+            "y":         signal,            
         }
 
 @app.get("/hata-path-loss")
+@simulation_endpoint(cache=True)
 def hataPathLoss(
     f: float = 900,
     h_b: float = 30,
@@ -701,24 +2994,34 @@ def hataPathLoss(
     environment: str = 'urban',
     city_size: str = 'petite/meduim',
     threshold_db:   float = 120.0,       # max acceptable path loss (dB)
-    max_distance_km:float = 5.0,        # sweep out to this (km)
-    steps:          int   = 1000         # sampling resolution
+    max_distance_km:float = 5.0,        # search out to this (km)
+    tolerance_m:    float = 1.0,         # precision of the radius search (m); analytic inverses are exact
 ):
     loss = hata_loss(f, h_b, h_m, distance, environment, city_size)
 
-    # 2) Sweep distances (avoid zero to prevent log10(0))
+    # 2) Find coverage radius under threshold_db (avoid zero to prevent log10(0))
     min_d = 1e-4  # km (~1 m)
-    distances = np.linspace(min_d, max_distance_km, steps)
-    losses    = np.array([
-        hata_loss(f, h_b, h_m, d, environment, city_size)
-        for d in distances
-    ])
-
-    # 3) Find coverage radius under threshold_db
-    coverageRadius = calculate_coverage_radius(distances, losses, threshold_db) * 1000
+    coverageRadius = solve_coverage_radius(
+        lambda d: hata_loss(f, h_b, h_m, d, environment, city_size),
+        threshold_db, min_d, max_distance_km,
+        inverse=invert_log_linear, tolerance=tolerance_m / 1000) * 1000
     return {"value":loss,"coverageRadius":coverageRadius}
 
+def hata_waveform(t, index, n, *, f, signal_frequency, h_b, h_m, d, environment, city_size,
+                  amplitude, showLoss, **_):
+    """Signal of /hata at times t (samples `index` of n, all of them if None)."""
+    signal = amplitude *np.sin(2 * np.pi * signal_frequency * t)                 
+
+    if showLoss == "Oui":
+        loss = hata_loss(f, h_b, h_m, d, environment, city_size)
+        attenuation_factor = db_to_amplitude(-loss)    
+        signal *= 1e19 * attenuation_factor
+    return signal
+
+
 @app.get('/hata')
+@simulation_endpoint(cache=True, cost=signal_cost(), degrade="sampling_interval",
+                     signal_model=SignalModel(hata_waveform))
 def generate_hata_signal(
     f: float = 900,
     signal_frequency: float = 10.0,
@@ -731,61 +3034,65 @@ def generate_hata_signal(
     amplitude:float=1,
     sampling_interval: float = 0.001,
     showLoss:str = "Oui",
-    showDomain:str = "domaine temporel" #domaine temporel || domaine fréquentiel
+    showDomain:str = "domaine temporel", #domaine temporel || domaine fréquentiel
+    spectrum: SpectrumParams = Depends(),
 ):
     t = generate_time_array(duration=duration,Te=sampling_interval)
-    signal = amplitude *np.sin(2 * np.pi * signal_frequency * t)                 
-
-    if showLoss == "Oui":
-        loss = hata_loss(f, h_b, h_m, d, environment, city_size)
-        attenuation_factor = db_to_amplitude(-loss)    
-        signal *= 1e19 * attenuation_factor
+    signal = hata_waveform(t, None, t.size, f=f, signal_frequency=signal_frequency, h_b=h_b, h_m=h_m, d=d,
+                           environment=environment, city_size=city_size, amplitude=amplitude,
+                           showLoss=showLoss)
 
     if showDomain == "domaine fréquentiel":
-        f,signal = generate_frequency(signal=signal,Te=sampling_interval)
+        f,signal = generate_frequency(signal=signal, Te=sampling_interval, **spectrum.options())
         return {
-            "x":f.tolist(),
-            "y":signal.tolist(),
+            "x":f,
+            "y":signal,
             "x_label":"Fréquence (Hz)"
         }
     return {
-        "x": t.tolist(),
-        "y": signal.tolist(),        
+        "x": t,
+        "y": signal,        
     }
 
 
 
 @app.get("/two-ray-ground-path-loss")
+@simulation_endpoint(cache=True)
 def run_two_ray_path_loss(
     frequency_MHz: float = 900,       # Carrier frequency for path loss calculation
     h_b: float = 30,                    # Transmitter height (m)
     h_m: float = 1.5,                   # Receiver height (m)
     distance: float = 1,                  # en km
     threshold_db:   float = 120.0,   # Max acceptable path loss (dB)
-    max_distance_km:float = 5.0,     # Sweep out to this distance (km)
-    steps:          int   = 1000     # Resolution of sweep
+    max_distance_km:float = 5.0,     # Search out to this distance (km)
+    tolerance_m:    float = 1.0      # Precision of the radius search (m); analytic inverses are exact
 ):
     loss_db = two_ray_ground_loss(d=distance * 1000, ht=h_b, hr=h_m, frequency_MHz=frequency_MHz)
 
-    # Convert to native Python float:
-    # loss_py = float(loss_db)            # simplest, works if loss_db is scalar
-    # —or— 
-    loss_py = np.array(loss_db).item()  # robust for scalar or 1-element array
+    # 2) Coverage radius (m) under threshold_db, from a tiny min_d up to max_distance_km
+    min_d = 1e-4  # km (~1 m) to avoid singularities
+    coverageRadius = two_ray_coverage_radius(
+        h_b, h_m, frequency_MHz, threshold_db, min_d * 1000, max_distance_km * 1000, tolerance=tolerance_m)
+
+    return {"value": loss_db,"coverageRadius":coverageRadius}
 
-    # 2) Sweep from a tiny min_d up to max_distance_km
-    min_d = 1e-4  # km (~1 m) to avoid singularities
-    distances = np.linspace(min_d, max_distance_km, steps)
-    losses    = np.array([
-        two_ray_ground_loss(d=d*1000, ht=h_b, hr=h_m, frequency_MHz=frequency_MHz)
-        for d in distances
-    ])
-    # 3) Compute coverage radius (km) under threshold_db
-    coverageRadius = calculate_coverage_radius(distances, losses, threshold_db) * 1000
 
-    return {"value": loss_py,"coverageRadius":coverageRadius}
+def two_ray_waveform(t, index, n, *, frequency_MHz, signal_frequency_Hz, ht, hr, d, showLoss, **_):
+    """Signal of /two-ray-ground-with-signal at times t (samples `index` of n, all of them if None)."""
+    # Generate sine wave signal at baseband frequency
+    signal = np.sin(2 * np.pi * signal_frequency_Hz * t)
+
+    if showLoss == "Oui":
+        # Calculate attenuation based on two-ray model
+        losses_db = two_ray_ground_loss(d=d, ht=ht, hr=hr, frequency_MHz=frequency_MHz)
+        attenuation = db_to_amplitude(-losses_db)
+        signal *= attenuation*1e6  # Apply attenuation to the signal
+    return signal
 
 
 @app.get("/two-ray-ground-with-signal")
+@simulation_endpoint(cache=True, cost=signal_cost(), degrade="sampling_interval",
+                     signal_model=SignalModel(two_ray_waveform))
 def run_two_ray_simulation_with_sinus(
     frequency_MHz: float = 900,       # Carrier frequency for path loss calculation
     signal_frequency_Hz: float = 10, # Frequency of generated sine signal
@@ -795,34 +3102,29 @@ def run_two_ray_simulation_with_sinus(
     duration: float = 1.0,             # Duration in seconds    
     sampling_interval: float = 0.001,  # Sampling interval in seconds        
     showLoss:str = "Oui",
-    showDomain:str = "domaine fréquentiel" #domaine temporel || domaine fréquentiel
+    showDomain:str = "domaine fréquentiel", #domaine temporel || domaine fréquentiel
+    spectrum: SpectrumParams = Depends(),
 ):
     # Time and signal generation    
     t = generate_time_array(duration=duration, Te=sampling_interval)
-
-    # Generate sine wave signal at baseband frequency
-    signal = np.sin(2 * np.pi * signal_frequency_Hz * t)
-
-    if showLoss == "Oui":
-        # Calculate attenuation based on two-ray model
-        losses_db = two_ray_ground_loss(d=d, ht=ht, hr=hr, frequency_MHz=frequency_MHz)
-        attenuation = db_to_amplitude(-losses_db)
-        signal *= attenuation*1e6  # Apply attenuation to the signal
+    signal = two_ray_waveform(t, None, t.size, frequency_MHz=frequency_MHz, signal_frequency_Hz=signal_frequency_Hz,
+                              ht=ht, hr=hr, d=d, showLoss=showLoss)
 
     if showDomain == "domaine fréquentiel":
-        f,signal = generate_frequency(signal=signal,Te=sampling_interval)
+        f,signal = generate_frequency(signal=signal, Te=sampling_interval, **spectrum.options())
         return {
-            "x":f.tolist(),
-            "y":signal.tolist(),
+            "x":f,
+            "y":signal,
             "x_label":"Fréquence (Hz)"
         }
     return {
-        "x": t.tolist(),
-        "y": signal.tolist(),        
+        "x": t,
+        "y": signal,        
     }
 
 
 @app.get("/two-ray-ground")
+@simulation_endpoint(cache=True)
 def run_two_ray_simulation(
     frequency_MHz: float = 900, 
     ht: float = 30, 
@@ -835,40 +3137,67 @@ def run_two_ray_simulation(
     loss = two_ray_ground_loss(distances, ht, hr, frequency_MHz)
 
     return {
-        "x": distances.tolist(),
+        "x": distances,
         "x_label":'distance ',
         "y_label":'Perte en db',
-        "y": loss.tolist(),        
+        "y": loss,        
     }
 
 
 @app.get("/weissberger-path-loss")
+@simulation_endpoint(cache=True)
 def run_weissberger_pathLoss(
     frequency_MHz: float = 900,
     foliage_depth_km: float = 0.1,
     distance:float = 0.1, #distance en km
 
     threshold_db:   float = 120.0,   # Max acceptable path loss (dB)
-    max_distance_km:float = 5.0,     # Sweep out to this distance (km)
-    steps:          int   = 1000     # Resolution of sweep
+    max_distance_km:float = 5.0,     # Search out to this distance (km)
+    tolerance_m:    float = 1.0      # Precision of the radius search (m); analytic inverses are exact
 ):
     ref_loss = weissberger_loss(distance, foliage_depth_km, frequency_MHz)
 
-    # 2) Sweep distances [min_d … max_distance_km]
+    # 2) Determine coverage radius under threshold_db on [min_d … max_distance_km]
     min_d = 1e-4  # km (~0.1 m) to avoid log10(0)
-    distances = np.linspace(min_d, max_distance_km, steps)
-    losses    = np.array([
-        weissberger_loss(d, foliage_depth_km, frequency_MHz)
-        for d in distances
-    ])
+    coverageRadius = solve_coverage_radius(
+        lambda d: weissberger_loss(d, foliage_depth_km, frequency_MHz),
+        threshold_db, min_d, max_distance_km,
+        inverse=invert_power_law, tolerance=tolerance_m / 1000) * 1000
+
+    return {"value":ref_loss,"coverageRadius":coverageRadius}
 
+def weissberger_waveform(t, index, n, *, frequency_MHz, foliage_depth_km, d_min, d_max, showLoss,
+                         baseband=None, **_):
+    """Signal of /weissberger-signal-simulation at times t, before normalization."""
+    carrier_freq = frequency_MHz * 1e6  # Convert to Hz
 
-    # 3) Determine coverage radius under threshold_db
-    coverageRadius = calculate_coverage_radius(distances, losses, threshold_db) * 1000
+    # Distance varies linearly over time
+    distances_km = linspace_samples(d_min, d_max, n, index)
+
+    # Compute delays
+    time_delays = (distances_km * 1000) / SPEED_OF_LIGHT  # Delay in seconds
+
+    if baseband is not None and baseband.enabled:
+        # Delay phase and Doppler on the envelope instead of the sampled carrier
+        composite_signal = delay_envelope(carrier_freq, time_delays)
+    else:
+        # Generate vectorized signal
+        composite_signal = np.sin(2 * np.pi * carrier_freq * (t - time_delays))
+
+    if showLoss == "Oui":
+        # Compute Weissberger loss and attenuation
+        losses = weissberger_loss(distances_km, foliage_depth_km, frequency_MHz)
+        attenuation_factors = db_to_amplitude(-losses)  # Convert dB loss to linear scale
+        composite_signal *= attenuation_factors
+    if baseband is not None and baseband.enabled:
+        composite_signal = baseband.represent(t, composite_signal)
+    return composite_signal
 
-    return {"value":ref_loss,"coverageRadius":coverageRadius}
 
 @app.get("/weissberger-signal-simulation")
+@simulation_endpoint(cache=True, cost=signal_cost(), degrade="sampling_interval", prepare=baseband_sampling(),
+                     signal_model=SignalModel(weissberger_waveform, normalize=True,
+                                              complex_valued=lambda params: params["baseband"].representation == "baseband"))
 def run_weissberger_simulation_with_sinus(
     frequency_MHz: float = 900,
     foliage_depth_km: float = 0.1,
@@ -877,7 +3206,9 @@ def run_weissberger_simulation_with_sinus(
     duration: float = 1.0,             # Duration in seconds    
     sampling_interval: float = 0.001,  # Sampling interval in seconds        
     showLoss:str = "Oui",
-    showDomain:str = "domaine temporel" #domaine fréquentiel || domaine fréquentiel
+    showDomain:str = "domaine temporel", #domaine fréquentiel || domaine fréquentiel
+    spectrum: SpectrumParams = Depends(),
+    baseband: BasebandParams = Depends(),
 ):
     """
     Simulate a signal with Weissberger attenuation over a moving distance range.
@@ -887,28 +3218,17 @@ def run_weissberger_simulation_with_sinus(
         foliage_depth_km (float): Foliage depth in kilometers
         d_min (float): Minimum distance in kilometers
         d_max (float): Maximum distance in kilometers
+        baseband (BasebandParams): "rf" carrier, or its complex envelope ("baseband",
+            sampled at the rate of its Doppler shift) and display upconversion ("passband")
 
     Returns:
         dict: Time, signal, and simulation parameters
     """
-    # Time and frequency setup    
+    # Time setup    
     t = generate_time_array(duration=duration,Te=sampling_interval)
-    carrier_freq = frequency_MHz * 1e6  # Convert to Hz
-
-    # Distance varies linearly over time
-    distances_km = np.linspace(d_min, d_max, len(t))
-
-    # Compute delays
-    time_delays = (distances_km * 1000) / 299792458  # Delay in seconds
-
-    # Generate vectorized signal
-    composite_signal = np.sin(2 * np.pi * carrier_freq * (t - time_delays))
-
-    if showLoss == "Oui":
-        # Compute Weissberger loss and attenuation
-        losses = weissberger_loss(distances_km, foliage_depth_km, frequency_MHz)
-        attenuation_factors = db_to_amplitude(-losses)  # Convert dB loss to linear scale
-        composite_signal *= attenuation_factors
+    composite_signal = weissberger_waveform(t, None, t.size, frequency_MHz=frequency_MHz,
+                                            foliage_depth_km=foliage_depth_km, d_min=d_min, d_max=d_max,
+                                            showLoss=showLoss, baseband=baseband)
 
     # Normalize to prevent clipping
     max_abs = np.max(np.abs(composite_signal))
@@ -916,29 +3236,30 @@ def run_weissberger_simulation_with_sinus(
         composite_signal /= max_abs
 
     if showDomain == "domaine fréquentiel":
-        f,signal = generate_frequency(signal=composite_signal,Te=sampling_interval)
+        f,signal = generate_frequency(signal=composite_signal, Te=sampling_interval, **spectrum.options())
         return {
-            "x":f.tolist(),
-            "y":signal.tolist(),
+            "x":f,
+            "y":signal,
             "x_label":"Fréquence (Hz)"
         }
 
 
     return {
-        "x": t.tolist(),
-        "y": composite_signal.tolist(),
+        "x": t,
+        "y": composite_signal,
     }
 
 @app.get("/weissberger")
+@simulation_endpoint(cache=True)
 def run_weissberger_simulation(
     frequency_MHz: float = 900, 
     max_depth: float = 400):
 
     depths = np.linspace(1, max_depth, 400)  # Profondeurs de 1 m à max_depth m
-    losses = [weissberger_loss(distances_km=d,frequency_MHz=frequency_MHz,foliage_depth_km=max_depth) for d in depths]
+    losses = weissberger_loss(distances_km=depths,frequency_MHz=frequency_MHz,foliage_depth_km=max_depth)
 
     return {
-        "x": depths.tolist(),
+        "x": depths,
         "y": losses,
         "x_label":'distance ',
         "y_label":'Perte en db',        
@@ -946,6 +3267,7 @@ def run_weissberger_simulation(
 
 
 @app.get("/longley-rice-path-loss")
+@simulation_endpoint(cache=True)
 def longleyRacePathLoss(
     frequency_MHz: float = 900,
     h_b: float = 30,
@@ -955,26 +3277,54 @@ def longleyRacePathLoss(
     climate: str = 'Tempéré continental',
 
     threshold_db:   float = 120.0,   # Max acceptable path loss (dB)
-    max_distance_km:float = 5.0,     # Sweep out to this distance (km)
-    steps:          int   = 1000     # Resolution of sweep
+    max_distance_km:float = 5.0,     # Search out to this distance (km)
+    tolerance_m:    float = 1.0      # Precision of the radius search (m); analytic inverses are exact
 ):
 
     min_d = 1e-4  # km (~0.1 m) to avoid log10(0)
-    distances = np.linspace(min_d, max_distance_km, steps)
-    losses    = np.array([
-        calculate_longley_rice_loss(d, frequency_MHz, h_b, h_m, terrain_irregularity, climate)
-        for d in distances
-    ])
-
 
-    # 3) Determine coverage radius under threshold_db
-    coverageRadius = calculate_coverage_radius(distances, losses, threshold_db) * 1000
+    # Determine coverage radius under threshold_db
+    coverageRadius = solve_coverage_radius(
+        lambda d: calculate_longley_rice_loss(d, frequency_MHz, h_b, h_m, terrain_irregularity, climate),
+        threshold_db, min_d, max_distance_km,
+        inverse=invert_log_linear, tolerance=tolerance_m / 1000) * 1000
 
 
     loss = calculate_longley_rice_loss(distance, frequency_MHz, h_b, h_m, terrain_irregularity, climate)
     return {"value":loss,"coverageRadius":coverageRadius}
 
+def longley_rice_waveform(t, index, n, *, frequency_MHz, height_tx, height_rx, d_min, d_max,
+                          terrain_irregularity, climate, showLoss, baseband=None, **_):
+    """Signal of /longley-rice-signal-simulation at times t, before normalization."""
+    carrier_frequency = frequency_MHz * 1e6  # Convert to Hz
+
+    # Linear distance variation over time
+    distances_km = linspace_samples(d_min, d_max, n, index)
+
+    # Calculate time delays due to distance
+    time_delays = (distances_km * 1000) / SPEED_OF_LIGHT  # Delay in seconds
+
+    if baseband is not None and baseband.enabled:
+        # Delay phase and Doppler on the envelope instead of the sampled carrier
+        signal = delay_envelope(carrier_frequency, time_delays)
+    else:
+        # Generate signal with attenuation and delay
+        signal = np.sin(2 * np.pi * carrier_frequency * (t - time_delays))
+
+    if showLoss == "Oui":
+        # Calculate losses and attenuation factors
+        losses = calculate_longley_rice_loss(distances_km, frequency_MHz, height_tx, height_rx, terrain_irregularity, climate)
+        attenuation_factors = 10 ** (-losses / 20)  # Convert dB to linear scale
+        signal *= attenuation_factors
+    if baseband is not None and baseband.enabled:
+        signal = baseband.represent(t, signal)
+    return signal
+
+
 @app.get("/longley-rice-signal-simulation")
+@simulation_endpoint(cache=True, cost=signal_cost(), degrade="sampling_interval", prepare=baseband_sampling(),
+                     signal_model=SignalModel(longley_rice_waveform, normalize=True,
+                                              complex_valued=lambda params: params["baseband"].representation == "baseband"))
 def simulate_longley_rice_signal(
     frequency_MHz: float = 900,
     height_tx: float = 30,
@@ -986,7 +3336,9 @@ def simulate_longley_rice_signal(
     duration: float = 1.0,             # Duration in seconds    
     sampling_interval: float = 0.001,  # Sampling interval in seconds        
     showLoss:str = "Oui",
-    showDomain:str = "domaine temporel" #domaine temporel || domaine fréquentiel
+    showDomain:str = "domaine temporel", #domaine temporel || domaine fréquentiel
+    spectrum: SpectrumParams = Depends(),
+    baseband: BasebandParams = Depends(),
 ):
     """
     Simulate a radio signal with Longley-Rice attenuation for a moving receiver.
@@ -999,28 +3351,17 @@ def simulate_longley_rice_signal(
         d_max (float): Maximum distance in kilometers
         terrain_irregularity (float): Terrain irregularity in meters
         climate (str): Climate type (e.g., 'Tempéré continental')
+        baseband (BasebandParams): "rf" carrier, or its complex envelope ("baseband",
+            sampled at the rate of its Doppler shift) and display upconversion ("passband")
 
     Returns:
         dict: Time, simulated signal, and simulation parameters
     """    
     t = generate_time_array(duration=duration,Te=sampling_interval)
-    carrier_frequency = frequency_MHz * 1e6  # Convert to Hz
-
-    # Linear distance variation over time
-    distances_km = np.linspace(d_min, d_max, len(t))
-
-    # Calculate losses and attenuation factors
-    losses = [calculate_longley_rice_loss(d, frequency_MHz, height_tx, height_rx, terrain_irregularity, climate) for d in distances_km]
-    attenuation_factors = 10 ** (-np.array(losses) / 20)  # Convert dB to linear scale
-
-    # Calculate time delays due to distance
-    time_delays = (distances_km * 1000) / 299792458  # Delay in seconds (speed of light)
-
-    # Generate signal with attenuation and delay
-    signal = np.sin(2 * np.pi * carrier_frequency * (t - time_delays))
-
-    if showLoss == "Oui":
-         signal *= attenuation_factors
+    signal = longley_rice_waveform(t, None, t.size, frequency_MHz=frequency_MHz, height_tx=height_tx,
+                                   height_rx=height_rx, d_min=d_min, d_max=d_max,
+                                   terrain_irregularity=terrain_irregularity, climate=climate,
+                                   showLoss=showLoss, baseband=baseband)
 
     # Normalize signal to avoid clipping
     max_amplitude = np.max(np.abs(signal))
@@ -1028,19 +3369,20 @@ def simulate_longley_rice_signal(
         signal /= max_amplitude    
 
     if showDomain == "domaine fréquentiel":
-        f,signal = generate_frequency(signal=signal,Te=sampling_interval)
+        f,signal = generate_frequency(signal=signal, Te=sampling_interval, **spectrum.options())
         return {
-            "x":f.tolist(),
-            "y":signal.tolist(),
+            "x":f,
+            "y":signal,
             "x_label":"Fréquence (Hz)"
         }
 
     return {
-        "x": t.tolist(),
-        "y": signal.tolist(),        
+        "x": t,
+        "y": signal,        
     }
 
 @app.get("/longley-rice-loss-simulation")
+@simulation_endpoint(cache=True, cost=sweep_cost("num_points"))
 def run_longley_rice_loss_simulation(
     frequency_MHz: float = 900,
     height_tx: float = 30,
@@ -1064,18 +3406,259 @@ def run_longley_rice_loss_simulation(
         dict: Distances, losses, and simulation parameters
     """
     distances_km = np.linspace(1, 100, num_points)  # Distances in km
-    losses = [calculate_longley_rice_loss(d, frequency_MHz, height_tx, height_rx, terrain_irregularity, climate) for d in distances_km]
+    losses = calculate_longley_rice_loss(distances_km, frequency_MHz, height_tx, height_rx, terrain_irregularity, climate)
 
     return {
-        "x": distances_km.tolist(),
+        "x": distances_km,
         "y": losses,
         "x_label":'Distance en km',
         "y_label":'Perte en db',        
     }
 
 
+def compare_models_cost(params: dict) -> CostEstimate:
+    """Cost model of /compare-models: one multiply-add per model and distance."""
+    validate_positive(num_points=params["num_points"])
+    n = params["num_points"] * max(len(params["models"].split(",")), 1)
+    # loss and validity matrices + the shared log10(d), and their serialization (as the
+    # signal endpoints, SAMPLE_BYTES per pair of values)
+    return CostEstimate(n, 6 * n, (9 + SAMPLE_BYTES // 2) * n + SAMPLE_BYTES * params["num_points"],
+                        values=n + params["num_points"])
+
+
+@app.get("/compare-models")
+@simulation_endpoint(cache=True, cost=compare_models_cost)
+def compare_propagation_models(
+    models: str = ",".join(PROPAGATION_MODELS),   # comma-separated keys of PROPAGATION_MODELS
+    d_min_km: float = 0.1,
+    d_max_km: float = 20,
+    num_points: int = 500,
+    spacing: str = "linear",                      # linear or log
+    frequency_MHz: float = 900,
+    height_tx: float = 30,
+    height_rx: float = 1.5,
+    environment: str = "urban",
+    mask_invalid: str = "Oui",
+):
+    """
+    Path loss of several propagation models over one shared distance axis.
+
+    Every model is reduced to L = A + B·log10(d) (two-ray: one such line per side of its
+    breakpoint) from two scalar evaluations, so log10(d) is computed once for all of them
+    and the (models × distances) matrix costs one multiply-add per point.
+
+    Args:
+        models (str): comma-separated models among fspl, itu-r-p1411, hata, cost231,
+            two-ray and longley-rice
+        d_min_km, d_max_km (float): distance axis in km
+        num_points (int): number of distances
+        spacing (str): 'linear' or 'log' spacing of the distances
+        frequency_MHz, height_tx, height_rx, environment: link parameters common to all models
+        mask_invalid (str): 'Oui' to blank (null) the points outside a model's validity range
+
+    Returns:
+        dict: "x" (distances in km), "models", "y" (models × distances losses in dB) and
+              "valid" (models × distances, True within the model's validity range)
+    """
+    names = [name.strip() for name in models.split(",") if name.strip()]
+    if not names:
+        raise HTTPException(400, "At least one model is required")
+    unknown = [name for name in names if name not in PROPAGATION_MODELS]
+    if unknown:
+        raise HTTPException(400, f"Unknown model {unknown[0]}, expected one of {list(PROPAGATION_MODELS)}")
+    validate_positive(d_min_km=d_min_km, d_max_km=d_max_km, num_points=num_points,
+                      frequency_MHz=frequency_MHz, height_tx=height_tx, height_rx=height_rx)
+    if d_max_km <= d_min_km:
+        raise HTTPException(400, "d_max_km must be greater than d_min_km")
+    if spacing == "linear":
+        distances_km = np.linspace(d_min_km, d_max_km, num_points)
+    elif spacing == "log":
+        distances_km = np.geomspace(d_min_km, d_max_km, num_points)
+    else:
+        raise HTTPException(400, "spacing must be 'linear' or 'log'")
+
+    # (models,) coefficients, then a single broadcast over the shared log10(d)
+    intercept, slope, intercept_far, slope_far, breakpoint_km = (
+        np.array(column, dtype=float)[:, None] for column in zip(*(
+            propagation_coefficients(name, frequency_MHz, height_tx, height_rx, environment)
+            for name in names)))
+    log_d = np.log10(distances_km)
+    losses = intercept + slope * log_d
+    far = log_d > np.log10(breakpoint_km)
+    if far.any():
+        losses = np.where(far, intercept_far + slope_far * log_d, losses)
+
+    valid = np.stack([propagation_validity(name, distances_km, frequency_MHz, height_tx, height_rx)
+                      for name in names])
+    if mask_invalid == "Oui":
+        losses[~valid] = np.nan
+
+    return {
+        "x": distances_km,
+        "models": names,
+        "y": losses,
+        "valid": valid,
+        "validity": {name: PROPAGATION_VALIDITY[name] for name in names},
+        "x_label": 'Distance en km',
+        "y_label": 'Perte en db',
+    }
+
+
+# Working set of one chunk of a parameter sweep (combinations × distances float64 temporaries)
+SWEEP_CHUNK_BYTES = 4 * 2**20
+SWEEP_MAX_VALUES = 4_000_000
+# Numeric axes of /parameter-sweep, in tensor order; environment comes first, distance_km last
+SWEEP_LINK_AXES = ("frequency_MHz", "height_tx", "height_rx")
+
+
+def parse_sweep_axis(name: str, spec: str) -> np.ndarray:
+    """
+    Values of a sweep axis given as a single value ("900"), a comma-separated list
+    ("900,1800,2100") or an inclusive linear range "start:stop:count" ("150:2000:38").
+    """
+    try:
+        if ":" in spec:
+            start, stop, count = spec.split(":")
+            if int(count) < 1:
+                raise ValueError
+            values = np.linspace(float(start), float(stop), int(count))
+        else:
+            values = np.array([float(value) for value in spec.split(",") if value.strip()])
+    except ValueError:
+        raise HTTPException(400, f"{name} must be a value, a comma-separated list or start:stop:count")
+    if values.size == 0:
+        raise HTTPException(400, f"{name} must not be empty")
+    validate_positive(**{name: values.min()})
+    return values
+
+
+def parameter_sweep_axes(params: dict) -> dict:
+    """Coordinates of every axis of /parameter-sweep, in tensor order."""
+    environments = [value.strip() for value in params["environment"].split(",") if value.strip()]
+    if not environments:
+        raise HTTPException(400, "environment must not be empty")
+    axes = {"environment": environments}
+    for name in SWEEP_LINK_AXES + ("distance_km",):
+        axes[name] = parse_sweep_axis(name, params[name])
+    return axes
+
+
+def sweep_path_loss(model, environments, frequency_MHz, height_tx, height_rx, distances_km,
+                    chunk_bytes=SWEEP_CHUNK_BYTES):
+    """
+    Path loss of `model` over the Cartesian product of its parameters.
+
+    The link combinations (frequency × height_tx × height_rx) are walked in chunks, each
+    broadcast against the distances in one call of the vectorized kernel, so that the
+    (chunk × distances) temporaries stay within `chunk_bytes` whatever the sweep size.
+
+    Returns:
+        np.ndarray: losses (dB) of shape (environments, frequencies, height_tx, height_rx, distances)
+    """
+    link_shape = (len(frequency_MHz), len(height_tx), len(height_rx))
+    combinations = int(np.prod(link_shape))
+    # ~8 live float64 temporaries of shape (chunk, distances) inside the kernels
+    chunk = max(1, int(chunk_bytes // (8 * 8 * len(distances_km))))
+
+    losses = np.empty((len(environments), combinations, len(distances_km)))
+    for e, environment in enumerate(environments):
+        for start in range(0, combinations, chunk):
+            f, t, r = np.unravel_index(np.arange(start, min(start + chunk, combinations)), link_shape)
+            losses[e, start:start + chunk] = PROPAGATION_MODELS[model](
+                distances_km, frequency_MHz[f][:, None], height_tx[t][:, None], height_rx[r][:, None], environment)
+    return losses.reshape(len(environments), *link_shape, len(distances_km))
+
+
+def model_coverage_radius(model, frequency_MHz, height_tx, height_rx, environment, threshold_db, d_min, d_max):
+    """Coverage radius (km) of a PROPAGATION_MODELS entry in [d_min, d_max] km; arrays broadcast."""
+    if model == "two-ray":
+        return two_ray_coverage_radius(height_tx, height_rx, frequency_MHz, threshold_db,
+                                       d_min * 1000, d_max * 1000) / 1000
+    return solve_coverage_radius(
+        lambda d: PROPAGATION_MODELS[model](d, frequency_MHz, height_tx, height_rx, environment),
+        threshold_db, d_min, d_max, inverse=invert_log_linear)
+
+
+def parameter_sweep_cost(params: dict) -> CostEstimate:
+    """Cost model of /parameter-sweep: one kernel evaluation per point of the tensor."""
+    n = int(np.prod([len(values) for values in parameter_sweep_axes(params).values()]))
+    # float64 loss tensor + validity mask and their serialization (SAMPLE_BYTES per pair
+    # of values, as the signal endpoints), the kernels run in chunks
+    return CostEstimate(n, 4 * SAMPLE_FLOPS * n, (9 + SAMPLE_BYTES // 2) * n + SWEEP_CHUNK_BYTES, values=n)
+
+
+@app.get("/parameter-sweep")
+@simulation_endpoint(cache=True, concurrency=HEAVY_CONCURRENCY, cost=parameter_sweep_cost)
+def parameter_sweep(
+    model: str = "hata",                   # key of PROPAGATION_MODELS
+    environment: str = "urban",            # comma-separated environments
+    frequency_MHz: str = "900",            # value, list "a,b,c" or range "start:stop:count"
+    height_tx: str = "30",
+    height_rx: str = "1.5",
+    distance_km: str = "1:20:100",
+    threshold_db: float = 120.0,           # max acceptable path loss for the coverage radius
+    mask_invalid: str = "Oui",
+):
+    """
+    Path loss over the Cartesian product of the model parameters, with coverage radii.
+
+    Every numeric axis accepts a value, a comma-separated list or a "start:stop:count"
+    range, e.g. loss vs distance for every BS height from 20 to 200 m and every frequency
+    from 150 to 2000 MHz is height_tx=20:200:10&frequency_MHz=150:2000:38 in one call.
+
+    Args:
+        model (str): one of fspl, itu-r-p1411, hata, cost231, two-ray, longley-rice
+        environment (str): comma-separated environments (urban, suburban, rural/open)
+        frequency_MHz, height_tx, height_rx, distance_km (str): axes of the sweep
+        threshold_db (float): max acceptable path loss (dB) of the coverage radius
+        mask_invalid (str): 'Oui' to blank (null) the points outside the model's validity range
+
+    Returns:
+        dict: "dims" (axis names, in order), "coords" (values of every axis), "y" (loss
+              tensor in dB over all dims), "coverage_radius_km" (over all dims but
+              distance_km, searched within the swept distances) and "valid" (over all
+              dims but environment, True within the model's validity range)
+    """
+    if model not in PROPAGATION_MODELS:
+        raise HTTPException(400, f"Unknown model {model}, expected one of {list(PROPAGATION_MODELS)}")
+    axes = parameter_sweep_axes({"environment": environment, "frequency_MHz": frequency_MHz,
+                                 "height_tx": height_tx, "height_rx": height_rx, "distance_km": distance_km})
+    if np.prod([len(values) for values in axes.values()]) > SWEEP_MAX_VALUES:
+        raise HTTPException(400, f"The sweep must not exceed {SWEEP_MAX_VALUES} points")
+    distances_km = axes["distance_km"]
+
+    losses = sweep_path_loss(model, axes["environment"], *(axes[name] for name in SWEEP_LINK_AXES), distances_km)
+
+    # Link parameters as (frequency, height_tx, height_rx) grids, one radius per environment
+    link = np.meshgrid(*(axes[name] for name in SWEEP_LINK_AXES), indexing="ij")
+    radius_km = np.stack([
+        np.broadcast_to(model_coverage_radius(model, *link, environment, threshold_db,
+                                              distances_km.min(), distances_km.max()), link[0].shape)
+        for environment in axes["environment"]])
+
+    valid = propagation_validity(model, distances_km, *(grid[..., None] for grid in link))
+    if mask_invalid == "Oui":
+        losses[:, ~valid] = np.nan
+        radius_km = np.where(valid.any(axis=-1), radius_km, np.nan)
+
+    return {
+        "model": model,
+        "dims": list(axes),
+        "coords": axes,
+        "shape": list(losses.shape),
+        "y": losses,
+        "coverage_radius_km": radius_km,
+        "valid": valid,
+        "threshold_db": threshold_db,
+        "y_label": 'Perte en db',
+    }
+
+
 @app.get("/ofdm")
-async def ofdm_on_sine(
+@simulation_endpoint(cache=is_seeded, concurrency=HEAVY_CONCURRENCY,
+                     cost=signal_cost(block="fftlen", taps=lambda params: 3 if params["showAtten"].lower() == "oui" else 0),
+                     degrade="sampling_interval")
+def ofdm_on_sine(
     fftlen: int = 64,
     gilen: int = 16,
     data_sc: int = 48,
@@ -1084,8 +3667,13 @@ async def ofdm_on_sine(
     frequency_Mhz: float = 1.0,      # Frequency of the sine wave in Hz    
     duration: float = 1.0,             # Duration in seconds    
     sampling_interval: float = 0.001,  # Sampling interval in seconds        
-    showDomain:str = "domaine fréquentiel" #domaine temporel || domaine fréquentiel
+    showDomain:str = "domaine fréquentiel", #domaine temporel || domaine fréquentiel
+    seed: Optional[int] = None,
+    channel_profile: Optional[str] = None,   # TDL channel (EPA, EVA, ETU, exponential) instead of 3 sample-spaced paths
+    delay_spread_ns: float = 100.0,          # decay of the exponential profile (≈ its RMS delay spread)
+    spectrum: SpectrumParams = Depends(),
 ):    
+    rng = make_rng(seed)
     t = generate_time_array(duration=duration, Te=sampling_interval)
 
     # Generate sinusoid
@@ -1098,14 +3686,19 @@ async def ofdm_on_sine(
     reshaped = sine_wave.reshape((num_symbols, fftlen)).T
 
     # Generate complex OFDM signal
-    ofdm_time = np.fft.ifft(reshaped, axis=0)
+    ofdm_time = scipy.fft.ifft(reshaped, axis=0, workers=FFT_WORKERS)
     with_cp = np.vstack([ofdm_time[-gilen:, :], ofdm_time])
     complex_signal = with_cp.flatten()
 
     # Apply fading if enabled
-    if showAtten.lower() == "oui":
+    if showAtten.lower() == "oui" and channel_profile is not None:
+        channel = TappedDelayLine.from_query(channel_profile, sampling_interval, delay_spread_ns)
+        faded, gain = channel.apply(complex_signal, sampling_interval, rng=rng)
+        faded_complex, gain = faded[0], gain[0]
+        mean_chh_sq = np.mean(np.abs(gain)**2)
+    elif showAtten.lower() == "oui":
         num_paths = 3  # Example value, adjust as needed
-        faded_complex, gain = apply_fading_with_input(complex_signal,fading_model=1, num_paths=num_paths)
+        faded_complex, gain = apply_fading_with_input(complex_signal,fading_model=1, num_paths=num_paths, rng=rng)
         mean_chh_sq = np.mean(np.abs(gain)**2)
     else:
         faded_complex = complex_signal
@@ -1121,46 +3714,161 @@ async def ofdm_on_sine(
 
     # Add noise to real part
     real_signal = np.real(faded_complex)
-    noise = np.random.normal(0, noise_std, len(real_signal))
+    noise = rng.normal(0, noise_std, len(real_signal))
     final_signal = real_signal + noise
 
     # Prepare output
     if showDomain == "domaine temporel":                
-        return {"x":t.tolist(),"y":final_signal.tolist()}
+        return {"x":t,"y":final_signal}
     else:        
-        N = len(final_signal)
-        fft_result = np.fft.fft(final_signal)
-        spectrum = np.abs(fft_result[:N // 2]) ** 2  # Power spectrum
-        freqs = np.fft.fftfreq(N, d=sampling_interval)[:N // 2]     # Only non-negative frequencies
-        return {"x":freqs.tolist(),"y":spectrum.tolist(),"x_label":"Fréquence (Hz)"}
+        # Power spectrum, only non-negative frequencies unless asked otherwise
+        freqs, power = generate_frequency(signal=final_signal, Te=sampling_interval,
+                                          **spectrum.options(one_sided=True, scaling="power"))
+        return {"x":freqs,"y":power,"x_label":"Fréquence (Hz)"}
+
+def ofdm_ber_cost(params: dict) -> CostEstimate:
+    """Cost model of /ofdm-ber: per symbol two FFTs and the channel, per SNR point and subcarrier the decisions."""
+    validate_positive(num_symbols=params["num_symbols"], fftlen=params["fftlen"], data_sc=params["data_sc"],
+                      esn0_points=params["esn0_points"])
+    symbols, fftlen = params["num_symbols"], params["fftlen"]
+    decisions = symbols * params["data_sc"] * params["esn0_points"]
+    flops = 2 * symbols * fft_flops(fftlen) + SAMPLE_FLOPS * decisions
+    if params["channel_profile"] is not None:
+        flops += symbols * fft_flops(2 * (fftlen + params["gilen"]))
+    return CostEstimate(decisions, flops, OFDM_BATCH_BYTES, values=3 * params["esn0_points"], fft_size=fftlen)
+
+
+@app.get("/ofdm-ber")
+@simulation_endpoint(cache=is_seeded, concurrency=HEAVY_CONCURRENCY, cost=ofdm_ber_cost)
+def ofdm_ber(
+    modulation_order: int = 16,        # 2 (BPSK), 4, 16, 64 or 256-QAM
+    fftlen: int = 64,
+    gilen: int = 16,
+    data_sc: int = 48,
+    num_symbols: int = 1000,           # OFDM symbols per SNR point
+    esn0_min: float = 0.0,
+    esn0_max: float = 30.0,
+    esn0_points: int = 16,
+    channel_profile: Optional[str] = None,   # TDL profile (EPA, EVA, ETU, exponential), None for AWGN only
+    delay_spread_ns: float = 100.0,          # decay of the exponential profile (≈ its RMS delay spread)
+    sampling_interval_ns: float = 50.0,      # 20 MHz, as 802.11a with the default 64 / 16 / 48
+    seed: Optional[int] = None,
+):
+    """
+    Link-level BER / SER of an OFDM system versus Es/N0 (per data subcarrier).
+
+    Returns:
+        dict: x (Es/N0 in dB), y (BER), ser, and with AWGN only the theoretical ser_theory
+    """
+    validate_positive(num_symbols=num_symbols, esn0_points=esn0_points, sampling_interval_ns=sampling_interval_ns)
+    if not 0 <= gilen <= fftlen:
+        raise HTTPException(400, "gilen must be between 0 and fftlen")
+    Te = sampling_interval_ns * 1e-9
+    channel = None
+    if channel_profile is not None:
+        channel = TappedDelayLine.from_query(channel_profile, Te, delay_spread_ns)
+    esn0 = np.linspace(esn0_min, esn0_max, esn0_points)
+
+    symbol_errors, bit_errors = simulate_ofdm_link(modulation_order, fftlen, gilen, data_sc, num_symbols,
+                                                   esn0, channel, Te, make_rng(seed))
+    symbols = num_symbols * data_sc
+    bits = symbols * int(math.log2(modulation_order))
+    result = {
+        "x": esn0,
+        "y": bit_errors / bits,
+        "ser": symbol_errors / symbols,
+        "bits": bits,
+        "x_label": "Es/N0 (dB)",
+        "y_label": "BER",
+    }
+    if channel is None:
+        result["ser_theory"] = qam_awgn_ser(esn0, modulation_order)
+    return result
+
+
+def mimo_capacity_cost(params: dict) -> CostEstimate:
+    """Cost model of /mimo-capacity: one Hermitian eigenvalue problem per realization."""
+    validate_positive(realizations=params["realizations"], nr=params["nr"], nt=params["nt"],
+                      snr_points=params["snr_points"])
+    count, points = params["realizations"], params["snr_points"]
+    size, other = min(params["nr"], params["nt"]), max(params["nr"], params["nt"])
+    flops = count * (8 * size * size * other + 30 * size ** 3) + SAMPLE_FLOPS * count * points * size
+    nbytes = count * (64 * params["nr"] * params["nt"] + 16 * points * size)
+    return CostEstimate(count, flops, nbytes, values=3 * points)
+
+
+@app.get("/mimo-capacity")
+@simulation_endpoint(cache=is_seeded, concurrency=HEAVY_CONCURRENCY, cost=mimo_capacity_cost)
+def mimo_capacity(
+    nr: int = 4,                       # receive antennas
+    nt: int = 4,                       # transmit antennas
+    envelope: str = "rayleigh",        # rayleigh | rician
+    k_db: float = 10.0,                # Rice factor (dB)
+    rx_correlation: float = 0.0,       # ρ of the exponential correlation between receive antennas
+    tx_correlation: float = 0.0,       # ... and between transmit antennas
+    snr_min: float = 0.0,
+    snr_max: float = 30.0,
+    snr_points: int = 16,
+    realizations: int = 10000,
+    outage: float = Query(0.1, gt=0, lt=1),    # outage probability of the outage capacity
+    seed: Optional[int] = None,
+):
+    """
+    Ergodic and outage capacity of an Nr×Nt MIMO channel without channel knowledge at
+    the transmitter, versus the SNR per receive antenna.
+
+    Returns:
+        dict: x (SNR in dB), y (ergodic capacity, bit/s/Hz), y_outage (capacity exceeded
+              with probability 1 - outage) and the SISO AWGN capacity for reference
+    """
+    validate_positive(snr_points=snr_points, realizations=realizations)
+    snr = np.linspace(snr_min, snr_max, snr_points)
+    H = mimo_channels(realizations, nr, nt, envelope, db_to_watts(k_db), rx_correlation, tx_correlation,
+                      make_rng(seed))
+    capacities = mimo_capacities(H, snr)
+    return {
+        "x": snr,
+        "y": capacities.mean(axis=1),
+        "y_outage": np.quantile(capacities, outage, axis=1),
+        "siso_awgn": np.log2(1 + db_to_watts(snr)),
+        "x_label": "SNR (dB)",
+        "y_label": "Capacité (bit/s/Hz)",
+    }
+
 
 @app.get("/rician-path-loss")
+@simulation_endpoint(cache=is_seeded)
 def run_rician_pathLoss(
     distance:float = 10.0, 
     k_db: int = 10,
     frequency_hz: float = 900.0,      # Frequency of the sine wave in Hz
 
     threshold_db:   float = 120.0,   # Max acceptable path loss (dB)
-    max_distance_km:float = 5.0,     # Sweep out to this distance (km)
-    steps:          int   = 1000     # Resolution of sweep
+    max_distance_km:float = 5.0,     # Search out to this distance (km)
+    tolerance_m:    float = 1.0,     # Precision of the radius search (m); analytic inverses are exact
+    seed: Optional[int] = None,
 ):
     min_d = 1e-4  # km (~0.1 m) to avoid log10(0)
-    distances = np.linspace(min_d, max_distance_km, steps)
-    losses    = np.array([
-        rician_path_loss(distance=d* 1000, K=k_db, freq=frequency_hz * 1e6)  # distance in meters
-        for d in distances
-    ])
 
+    # Determine coverage radius under threshold_db from the large-scale loss
+    # (a fresh fading draw per distance would make the radius random on each run)
+    coverageRadius = solve_coverage_radius(
+        lambda d: log_distance_loss(distance=d * 1000, freq=frequency_hz * 1e6),  # distance in meters
+        threshold_db, min_d, max_distance_km,
+        inverse=invert_log_linear, tolerance=tolerance_m / 1000) * 1000
 
-    # 3) Determine coverage radius under threshold_db
-    coverageRadius = calculate_coverage_radius(distances, losses, threshold_db) * 1000
-
-    path_loss_dB = rician_path_loss(distance=distance * 1000, K=k_db, freq=frequency_hz * 1e6)  # distance in meters
+    path_loss_dB = rician_path_loss(distance=distance * 1000, K=k_db, freq=frequency_hz * 1e6,
+                                    rng=make_rng(seed))  # distance in meters
     return {"value":path_loss_dB,"coverageRadius":coverageRadius}
 
 
 @app.get("/rician")
-async def run_rician_model(
+@simulation_endpoint(cache=is_seeded, concurrency=HEAVY_CONCURRENCY,
+                     cost=signal_cost(taps=lambda params: 1000 if params["show_signal_type"] == "convol_sign"
+                                      and params["showLoss"] == "Oui" and params["speed_kmh"] is None else 0,
+                                      fading=lambda params: params["speed_kmh"] is not None),
+                     degrade="sampling_interval")
+def run_rician_model(
     k_db: int = 10,
     signal_power: int = 20,
     show_signal_type:str = "convol_sign", 
@@ -1169,8 +3877,12 @@ async def run_rician_model(
     frequency_hz: float = 900.0,      # Frequency of the sine wave in Hz
     showLoss:str = "Oui",  
     distance:float = 10.0, 
-    showDomain:str = "domaine fréquentiel" #domaine temporel || domaine fréquentiel
+    showDomain:str = "domaine fréquentiel", #domaine temporel || domaine fréquentiel
+    seed: Optional[int] = None,
+    speed_kmh: Optional[float] = None,   # mobile speed: time-varying (Jakes) channel instead of 1000 i.i.d. taps
+    spectrum: SpectrumParams = Depends(),
 ):
+    rng = make_rng(seed)
     # Generate sinusoidal waveform
     # Calculate amplitude from signal power (for sine wave, power = A^2 / 2)
     amplitude = np.sqrt(2 * signal_power)
@@ -1183,7 +3895,12 @@ async def run_rician_model(
     mu = math.sqrt(K / (2 * (K + 1)))  # Mean
     sigma = math.sqrt(1 / (2 * (K + 1)))  # Standard deviation
 
-    h = (sigma * np.random.randn(N) + mu) + 1j * (sigma * np.random.randn(N) + mu)
+    if speed_kmh is None:
+        h = (sigma * rng.standard_normal(N) + mu) + 1j * (sigma * rng.standard_normal(N) + mu)
+    else:
+        # Flat fading seen by the moving receiver, one gain per time sample
+        fading = FadingProcess(max_doppler(speed_kmh, frequency_hz * 1e6), "rician", K=K, rng=rng)
+        h = fading.gains(t)
     h_mag = np.abs(h)        
 
     obj = {}
@@ -1198,36 +3915,38 @@ async def run_rician_model(
         if showLoss == "Oui":
             # Convolve the Rician channel response with the sinusoidal waveform
             # Path loss applied to signal amplitude
-            path_loss_dB = rician_path_loss(distance=distance, K=K, freq=frequency_hz * 1e6)  # distance in meters
+            path_loss_dB = rician_path_loss(distance=distance, K=K, freq=frequency_hz * 1e6, rng=rng)  # distance in meters
             gain_linear = db_to_amplitude(-path_loss_dB)
             signal *= gain_linear  # Apply path loss
-            Y = np.convolve(h, signal, mode='same')
+            Y = convolve(h, signal, mode='same') if speed_kmh is None else h * signal
             signal = np.abs(Y)                           
 
 
     if showDomain == "domaine temporel":
-        obj["x"] = t.tolist()
+        obj["x"] = t
     else:
-        f,signal = generate_frequency(signal=signal,Te=sampling_interval)
-        obj["x"] = f.tolist()
+        f,signal = generate_frequency(signal=signal, Te=sampling_interval, **spectrum.options())
+        obj["x"] = f
         obj["x_label"] = "Fréquence (Hz)"
 
-    obj["y"] = signal.tolist()    
+    obj["y"] = signal    
 
     # Return JSON object
     return obj
 
 
 @app.get("/nakagami-fading-path-loss")
-def simulate_nakagami_fading_signal(
+@simulation_endpoint(cache=is_seeded)
+def simulate_nakagami_fading_path_loss(
     m: float = 1.0,                    # Nakagami m parameter
     omega: float = 1.0,                # Nakagami ω parameter
     distance: float = 1.0,            # Distance in meters
     frequency_hz: float = 900e6,       # Carrier frequency in Hz    
 
     threshold_db:   float = 120.0,   # Max acceptable path loss (dB)
-    max_distance_km:float = 5.0,     # Sweep out to this distance (km)
-    steps:          int   = 1000     # Resolution of sweep
+    max_distance_km:float = 5.0,     # Search out to this distance (km)
+    tolerance_m:    float = 1.0,     # Precision of the radius search (m); analytic inverses are exact
+    seed: Optional[int] = None,
 ):    
     c = 3e8
     wavelength = c / frequency_hz
@@ -1237,29 +3956,70 @@ def simulate_nakagami_fading_signal(
     PL0   = 20 * np.log10(4 * np.pi * d0_m / wavelength)
     PL_ref_dB = PL0 + 20 * np.log10(d0_m / d0_m)  # = PL0
 
-    # 2) One Nakagami fade sample at the reference point
-    fading_power = nakagami_fading(m=m, omega=omega, size=1)[0]
+    # 2) One Nakagami fade sample at the reference point (one per link when batched)
+    fading_power = nakagami_fading(m=m, omega=omega, size=np.broadcast(m, omega, PL_ref_dB).shape or None,
+                                   rng=make_rng(seed))
     h = np.sqrt(fading_power)
     fading_loss_ref = -20 * np.log10(h)
 
     total_ref_dB = PL_ref_dB + fading_loss_ref
 
-    # 3) Sweep distances and compute *average* large-scale loss (no fading)
+    # 3) *Average* large-scale loss vs distance (no fading)
     #    (so coverage isn’t random on each run)
-    distances_km = np.linspace(1e-4, max_distance_km, steps)
-    d_m = distances_km * 1e3
-    # path‐loss exponent n=2
-    PLs_db = 20 * np.log10(4 * np.pi * d_m / wavelength) + 20 * np.log10(d_m / d0_m)
+    def large_scale_loss(distances_km):
+        d_m = distances_km * 1e3
+        # path‐loss exponent n=2
+        return 20 * np.log10(4 * np.pi * d_m / wavelength) + 20 * np.log10(d_m / d0_m)
 
     # 4) Coverage radius under threshold_db
-    coverageRadius = calculate_coverage_radius(distances_km, PLs_db, threshold_db) * 1000
+    coverageRadius = solve_coverage_radius(
+        large_scale_loss, threshold_db, 1e-4, max_distance_km,
+        inverse=invert_log_linear, tolerance=tolerance_m / 1000) * 1000
 
     return {
-        "value_dB":           float(total_ref_dB),
+        "value_dB":           total_ref_dB,
         "coverageRadius":  coverageRadius
     }
 
+def nakagami_doppler_fading(rng=None, *, m, omega, showLoss, speed_kmh=None, carrier_frequency_MHz=900.0, **_):
+    """Doppler fading of /nakagami-fading-signal, or None for independent draws at every sample."""
+    if showLoss != "Oui" or speed_kmh is None:
+        return None
+    return FadingProcess(max_doppler(speed_kmh, carrier_frequency_MHz * 1e6), "nakagami", m=m, omega=omega, rng=rng)
+
+
+def nakagami_waveform(t, index, n, *, frequency_hz, signal_power, m, omega, showLoss, rng=None, fading=None, **_):
+    """
+    Signal of /nakagami-fading-signal at times t: the fading envelope follows `fading`
+    (a FadingProcess) if given, else is drawn independently per sample from `rng`.
+    """
+    # Calculate amplitude from signal power (for sine wave, power = A^2 / 2)
+    amplitude = np.sqrt(2 * signal_power)
+
+    # Generate sinusoidal signal
+    signal = amplitude * np.sin(2 * np.pi * frequency_hz * t)
+
+    if showLoss == "Oui" and fading is not None:
+        signal *= np.abs(fading.gains(t))
+    elif showLoss == "Oui":
+        # Generate Nakagami fading envelope
+        # h^2 follows Gamma(m, omega/m), so h = sqrt(Gamma(m, omega/m))        
+        # Nakagami fading envelope
+        fading = nakagami_fading(m=m, omega=omega, size=t.size, rng=rng)
+        h = np.sqrt(fading)
+        # Apply fading to the signal
+        signal *= h    
+    return signal
+
+
 @app.get("/nakagami-fading-signal")
+@simulation_endpoint(cache=lambda params: params["showLoss"] != "Oui" or is_seeded(params),
+                     cost=signal_cost(fading=lambda params: params["showLoss"] == "Oui"
+                                      and params["speed_kmh"] is not None),
+                     degrade="sampling_interval",
+                     signal_model=SignalModel(nakagami_waveform, fading=nakagami_doppler_fading,
+                                              stochastic=lambda params: params["showLoss"] == "Oui"
+                                              and params["speed_kmh"] is None))
 def simulate_nakagami_fading_signal(
     frequency_hz: float = 900.0,      # Frequency of the sine wave in Hz
     signal_power: float = 3.0,         # Power of the input sine wave
@@ -1268,7 +4028,11 @@ def simulate_nakagami_fading_signal(
     duration: float = 1.0,             # Duration in seconds    
     sampling_interval: float = 0.001,  # Sampling interval in seconds        
     showLoss:str = "Oui",
-    showDomain:str = "domaine temporel" #domaine temporel || domaine fréquentiel
+    showDomain:str = "domaine temporel", #domaine temporel || domaine fréquentiel
+    seed: Optional[int] = None,
+    speed_kmh: Optional[float] = None,     # Mobile speed, for time-correlated fading
+    carrier_frequency_MHz: float = 900.0,  # Carrier of the Doppler shift
+    spectrum: SpectrumParams = Depends(),
 ):
     """
     Simulate a sinusoidal signal with Nakagami fading applied, returning time, signal, and parameters.
@@ -1280,38 +4044,626 @@ def simulate_nakagami_fading_signal(
         omega (float): Nakagami spread parameter (average power of fading, omega > 0).
         duration (float): Duration of the simulation in seconds.
         sampling_interval (float): Time step between samples in seconds.        
+        seed (int, optional): Seed of the fading generator, for reproducible draws.
+        speed_kmh (float, optional): Mobile speed; the fading then varies at the Doppler rate
+            of carrier_frequency_MHz (Jakes spectrum) instead of independently per sample.
 
     Returns:
         dict: JSON containing 'time', 'signal', and 'parameters'.
     """
     # Generate time array    
     t = generate_time_array(duration=duration,Te=sampling_interval)
-
-    # Calculate amplitude from signal power (for sine wave, power = A^2 / 2)
-    amplitude = np.sqrt(2 * signal_power)
-
-    # Generate sinusoidal signal
-    signal = amplitude * np.sin(2 * np.pi * frequency_hz * t)
-
-    if showLoss == "Oui":
-        # Generate Nakagami fading envelope
-        # h^2 follows Gamma(m, omega/m), so h = sqrt(Gamma(m, omega/m))        
-        # Nakagami fading envelope
-        fading = nakagami_fading(m=m, omega=omega, size=len(t))
-        h = np.sqrt(fading)
-        # Apply fading to the signal
-        signal *= h    
+    rng = make_rng(seed)
+    fading = nakagami_doppler_fading(rng, m=m, omega=omega, showLoss=showLoss, speed_kmh=speed_kmh,
+                                     carrier_frequency_MHz=carrier_frequency_MHz)
+    signal = nakagami_waveform(t, None, t.size, frequency_hz=frequency_hz, signal_power=signal_power,
+                               m=m, omega=omega, showLoss=showLoss, rng=rng, fading=fading)
 
     obj = {}
 
     if showDomain == "domaine temporel":
-        obj["x"] = t.tolist()        
+        obj["x"] = t        
     else:
-        f,signal = generate_frequency(signal=signal,Te=sampling_interval)
-        obj["x"] = f.tolist()
+        f,signal = generate_frequency(signal=signal, Te=sampling_interval, **spectrum.options())
+        obj["x"] = f
         obj["x_label"] = "Fréquence (Hz)"        
 
-    obj["y"] = signal.tolist()
+    obj["y"] = signal
     # Return JSON response
     return obj
 
+
+# --------------------------
+# Batch Endpoints
+# --------------------------
+
+# Every *-path-loss model the 3D scene can assign to an antenna, keyed by its endpoint.
+PATH_LOSS_ENDPOINTS = {
+    "/rayleign-path-loss": rayleginPathLoss,
+    "/Cost231/pathLoss": pathLossCost,
+    "/fspl-dbLoss": fsplPathLoss,
+    "/itu-r-p1411-pathLoss": ituPathLoss,
+    "/hata-path-loss": hataPathLoss,
+    "/two-ray-ground-path-loss": run_two_ray_path_loss,
+    "/weissberger-path-loss": run_weissberger_pathLoss,
+    "/longley-rice-path-loss": longleyRacePathLoss,
+    "/rician-path-loss": run_rician_pathLoss,
+    "/nakagami-fading-path-loss": simulate_nakagami_fading_path_loss,
+}
+
+# Handlers whose parameters size their arrays (num_paths) and cannot be stacked
+SCALAR_PATH_LOSS_ENDPOINTS = {"/rayleign-path-loss"}
+
+
+class AntennaPathLossQuery(BaseModel):
+    id: Optional[Union[int, str]] = None
+    modelType: str                                  # endpoint of the model, e.g. "/hata-path-loss"
+    params: Dict[str, Union[float, str]] = {}       # same names as the endpoint's query parameters
+
+
+class BatchPathLossRequest(BaseModel):
+    antennas: List[AntennaPathLossQuery]
+
+
+@functools.lru_cache(maxsize=None)
+def query_type_adapter(annotation) -> TypeAdapter:
+    return TypeAdapter(annotation)
+
+
+def bind_query_params(handler, params: dict) -> dict:
+    """
+    Resolve `params` against the query parameters of an endpoint: defaults are filled in,
+    values are validated by pydantic against the annotated type (so 2.5 is rejected for an
+    int, 422 as for the same GET query) and unknown names are ignored.
+    """
+    bound = {}
+    for name, parameter in inspect.signature(inspect.unwrap(handler)).parameters.items():
+        if name not in params:
+            bound[name] = parameter.default
+            continue
+        value = params[name]
+        if parameter.annotation is str and not isinstance(value, str):
+            value = str(value)    # a query string is always text
+        try:
+            bound[name] = query_type_adapter(parameter.annotation).validate_python(value)
+        except ValidationError as error:
+            raise HTTPException(422, f"{name}: {error.errors()[0]['msg']}")
+    return bound
+
+
+@app.post("/batch-path-loss")
+@simulation_endpoint
+def batch_path_loss(body: BatchPathLossRequest):
+    """
+    Path loss and coverage radius for many antennas in a single round trip.
+
+    Antennas are grouped by model and by their string parameters (environment, climate...);
+    each group is evaluated with one call of the model's *-path-loss handler, its numeric
+    parameters stacked into arrays that the vectorized kernels broadcast. A seeded antenna is
+    evaluated on its own, with a fresh generator, so that it returns what its GET query returns.
+
+    Returns:
+        dict: {"results": [{"id", "value", "coverageRadius"}, ...]} in request order
+    """
+    groups = {}
+    for index, antenna in enumerate(body.antennas):
+        path = "/" + antenna.modelType.lstrip("/")
+        handler = PATH_LOSS_ENDPOINTS.get(path)
+        if handler is None:
+            raise HTTPException(400, f"Unknown modelType {antenna.modelType}")
+        params = bind_query_params(handler, antenna.params)
+        labels = tuple(sorted((name, value) for name, value in params.items() if isinstance(value, str)))
+        # draws of one generator cannot be shared between antennas that each expect their seed's
+        alone = index if params.get("seed") is not None else None
+        groups.setdefault((path, labels, alone), []).append((index, params))
+
+    results = [None] * len(body.antennas)
+    for (path, labels, alone), members in groups.items():
+        handler = inspect.unwrap(PATH_LOSS_ENDPOINTS[path])
+        if path in SCALAR_PATH_LOSS_ENDPOINTS or alone is not None:
+            outputs = [handler(**params) for _, params in members]
+        else:
+            stacked = {name: np.array([params[name] for _, params in members])
+                       for name in members[0][1] if name not in dict(labels)}
+            output = handler(**stacked, **dict(labels))
+            columns = {key: np.broadcast_to(value, len(members)) for key, value in output.items()}
+            outputs = [{key: column[i] for key, column in columns.items()} for i in range(len(members))]
+
+        for (index, _), output in zip(members, outputs):
+            results[index] = {
+                "id": body.antennas[index].id,
+                "value": float(output.get("value", output.get("value_dB"))),
+                "coverageRadius": float(output["coverageRadius"]),
+            }
+
+    return {"results": results}
+
+
+# --------------------------
+# Coverage Raster
+# --------------------------
+
+EARTH_RADIUS_KM = 6371.0
+# Working set of one chunk (cells × transmitters × float32 temporaries), sized for the CPU cache
+HEATMAP_CHUNK_BYTES = 4 * 2**20
+HEATMAP_MAX_CELLS = 4_000_000
+
+
+class RasterTransmitter(BaseModel):
+    id: Optional[Union[int, str]] = None
+    # [lat, lng] in degrees as the map antennas, or [lat, lng, altitude] as the 3D scene (altitude unused)
+    position: List[float] = Field(min_length=2, max_length=3)
+    model: str = "hata"              # key of PROPAGATION_MODELS
+    height: float = 30               # antenna height (m)
+    frequency: float = 900           # MHz
+    power: float = 43                # EIRP (dBm)
+    environment: str = "urban"
+
+
+class CoverageRasterRequest(BaseModel):
+    bbox: List[float]                # [south, west, north, east] in degrees
+    rows: int = 200
+    cols: int = 200
+    rx_height: float = 1.5           # mobile height (m)
+    threshold_dbm: float = -100.0    # receiver sensitivity
+    transmitters: List[RasterTransmitter]
+
+
+def compute_coverage_raster(bbox, rows, cols, tx_lat, tx_lon, tx_height, tx_frequency, tx_power,
+                            tx_models, rx_height=1.5, chunk_bytes=HEATMAP_CHUNK_BYTES):
+    """
+    Best-server received power over a lat/lng grid for many transmitters.
+
+    All PROPAGATION_MODELS are log-linear in distance (two-ray piecewise), so each
+    transmitter is reduced once to L = A + B·log10(d) and a cell only costs one shared
+    log10(d) and a multiply-add per transmitter. The grid is walked in chunks of cells
+    so that the (cells × transmitters) float32 working arrays stay within `chunk_bytes`.
+
+    Args:
+        bbox: (south, west, north, east) in degrees; rows run north → south, cols west → east
+        tx_*: 1D arrays, one entry per transmitter (heights in m, frequency in MHz, EIRP in dBm)
+        tx_models: list of (model, environment) per transmitter, keys of PROPAGATION_MODELS
+
+    Returns:
+        power_dbm (rows × cols float32), best_server (rows × cols int32)
+    """
+    south, west, north, east = bbox
+    lat = (north - (np.arange(rows) + 0.5) * ((north - south) / rows)).astype(np.float32)
+    lon = (west + (np.arange(cols) + 0.5) * ((east - west) / cols)).astype(np.float32)
+
+    # Sort transmitters by model so that every group is a contiguous block of columns
+    order = sorted(range(len(tx_models)), key=lambda i: tx_models[i])
+    tx_lat, tx_lon, tx_height, tx_frequency, tx_power = (
+        np.asarray(values, dtype=float)[order] for values in (tx_lat, tx_lon, tx_height, tx_frequency, tx_power))
+    n_tx = len(order)
+
+    # Per-transmitter coefficients: loss = intercept + slope·log10(d_km), beyond log10(breakpoint)
+    # the far branch (intercept_far, slope_far) applies
+    intercept, slope = np.empty(n_tx), np.empty(n_tx)
+    intercept_far, slope_far = np.empty(n_tx), np.empty(n_tx)
+    breakpoint_km = np.full(n_tx, np.inf)
+    piecewise_blocks = []
+    stop = 0
+    for (model, environment), members in itertools.groupby(order, key=lambda i: tx_models[i]):
+        block = slice(stop, stop + len(list(members)))
+        stop = block.stop
+        (intercept[block], slope[block], intercept_far[block], slope_far[block],
+         breakpoint_km[block]) = propagation_coefficients(
+            model, tx_frequency[block], tx_height[block], rx_height, environment)
+        if model == "two-ray":
+            piecewise_blocks.append(block)
+
+    # Work on log10(d²) = 2·log10(d) to skip the square root: halve the slopes, double the breakpoint
+    eirp_minus_a = (tx_power - intercept).astype(np.float32)
+    eirp_minus_a_far = (tx_power - intercept_far).astype(np.float32)
+    half_slope, half_slope_far = (0.5 * slope).astype(np.float32), (0.5 * slope_far).astype(np.float32)
+    log_breakpoint_sq = (2 * np.log10(breakpoint_km)).astype(np.float32)
+    tx_lat, tx_lon = tx_lat.astype(np.float32), tx_lon.astype(np.float32)
+
+    km_per_deg = np.float32(EARTH_RADIUS_KM * np.pi / 180)
+    # ~4 live float32 arrays of shape (chunk, n_tx) at the peak
+    chunk = max(1, int(chunk_bytes // (4 * 4 * max(n_tx, 1))))
+
+    power = np.empty(rows * cols, dtype=np.float32)
+    best = np.empty(rows * cols, dtype=np.int32)
+    for start in range(0, rows * cols, chunk):
+        cells = np.arange(start, min(start + chunk, rows * cols))
+        cell_lat = lat[cells // cols][:, None]
+        cell_lon = lon[cells % cols][:, None]
+        # equirectangular distance, accurate over city/regional extents
+        dx = (cell_lon - tx_lon) * (km_per_deg * np.cos(np.radians(cell_lat)))
+        dy = (cell_lat - tx_lat) * km_per_deg
+        dx *= dx
+        dy *= dy
+        dx += dy
+        # d ≥ 1 m so that log10(0) never happens
+        np.maximum(dx, np.float32(1e-6), out=dx)
+        log_d_sq = np.log10(dx, out=dy)
+
+        # received = EIRP − (A + B·log10 d)
+        received = half_slope * log_d_sq
+        np.subtract(eirp_minus_a, received, out=received)
+        for block in piecewise_blocks:
+            far = log_d_sq[:, block] > log_breakpoint_sq[block]
+            received[:, block] = np.where(
+                far, eirp_minus_a_far[block] - half_slope_far[block] * log_d_sq[:, block], received[:, block])
+        best[cells] = np.argmax(received, axis=1)
+        power[cells] = np.take_along_axis(received, best[cells][:, None], axis=1)[:, 0]
+
+    best = np.asarray(order, dtype=np.int32)[best]
+    return power.reshape(rows, cols), best.reshape(rows, cols)
+
+
+def raster_cost(body: CoverageRasterRequest) -> CostEstimate:
+    """Cost model of /coverage-raster: one log-linear evaluation per cell and transmitter."""
+    cells = max(body.rows, 0) * max(body.cols, 0)
+    links = cells * len(body.transmitters)
+    # float32 output layers + float64 cell coordinates, the links are processed in chunks
+    return CostEstimate(links, 10 * links, HEATMAP_CHUNK_BYTES + 28 * cells, values=3 * cells)
+
+
+@app.post("/coverage-raster")
+@simulation_endpoint(concurrency=HEAVY_CONCURRENCY, cost=lambda params: raster_cost(params["body"]))
+def coverage_raster(body: CoverageRasterRequest):
+    """
+    Received-power heatmap for a set of transmitters over a bounding box.
+
+    Returns:
+        dict: rows × cols layers "power_dbm" (best-server received power), "best_server"
+              (index into transmitters, -1 where no server reaches threshold_dbm) and
+              "margin_db" (power above threshold_dbm)
+    """
+    if len(body.bbox) != 4:
+        raise HTTPException(400, "bbox must be [south, west, north, east]")
+    validate_positive(rows=body.rows, cols=body.cols)
+    if body.rows * body.cols > HEATMAP_MAX_CELLS:
+        raise HTTPException(400, f"rows × cols must not exceed {HEATMAP_MAX_CELLS}")
+    if not body.transmitters:
+        raise HTTPException(400, "At least one transmitter is required")
+    for tx in body.transmitters:
+        if tx.model not in PROPAGATION_MODELS:
+            raise HTTPException(400, f"Unknown model {tx.model}, expected one of {list(PROPAGATION_MODELS)}")
+
+    power_dbm, best_server = compute_coverage_raster(
+        body.bbox, body.rows, body.cols,
+        tx_lat=[tx.position[0] for tx in body.transmitters],
+        tx_lon=[tx.position[1] for tx in body.transmitters],
+        tx_height=[tx.height for tx in body.transmitters],
+        tx_frequency=[tx.frequency for tx in body.transmitters],
+        tx_power=[tx.power for tx in body.transmitters],
+        tx_models=[(tx.model, tx.environment) for tx in body.transmitters],
+        rx_height=body.rx_height,
+    )
+    margin_db = power_dbm - np.float32(body.threshold_dbm)
+    best_server[margin_db < 0] = -1
+
+    return {
+        "bbox": body.bbox,
+        "rows": body.rows,
+        "cols": body.cols,
+        "transmitters": [tx.id for tx in body.transmitters],
+        "power_dbm": power_dbm,
+        "best_server": best_server,
+        "margin_db": margin_db,
+    }
+
+
+# --------------------------
+# Terrain
+# --------------------------
+
+# DEM used by /terrain-longley-rice: a directory of SRTM .hgt tiles or a GeoTIFF (needs rasterio)
+TERRAIN_PATH = os.environ.get("SIM_TERRAIN")
+# SRTM tiles kept memory-mapped at once (each map only pages in what is read)
+TERRAIN_OPEN_TILES = 64
+SRTM_VOID = -32768
+# Surface refractivity N_s (N-units) of the ITM radio climates, which sets the effective earth radius
+LONGLEY_RICE_REFRACTIVITY = {
+    "Équatorial":                   360,
+    "Continental subtropical":      320,
+    "Maritime subtropical":         370,
+    "Désert":                       280,
+    "Tempéré continental":          301,
+    "Tempéré maritime":             320,   # over land
+    "Tempéré maritime sur mer":     350,
+}
+TERRAIN_MAX_SAMPLES = 4_000_000
+
+
+class SrtmTiles:
+    """
+    Elevation from a directory of SRTM .hgt tiles (1201² or 3601² big-endian int16,
+    named after their south-west corner, e.g. N33W008.hgt).
+
+    Tiles are memory-mapped on first use, so sampling only reads the pages touched;
+    points on a missing tile (SRTM has none over the sea) are at 0 m.
+    """
+
+    def __init__(self, directory: str, max_open: int = TERRAIN_OPEN_TILES):
+        self.directory = directory
+        self.max_open = max_open
+        self.tiles = OrderedDict()       # (lat0, lon0) → np.memmap or None, least recently used first
+        self.lock = threading.Lock()
+
+    def tile(self, lat0: int, lon0: int) -> Optional[np.memmap]:
+        with self.lock:
+            if (lat0, lon0) in self.tiles:
+                self.tiles.move_to_end((lat0, lon0))
+                return self.tiles[(lat0, lon0)]
+            name = f"{'N' if lat0 >= 0 else 'S'}{abs(lat0):02d}{'E' if lon0 >= 0 else 'W'}{abs(lon0):03d}.hgt"
+            path = os.path.join(self.directory, name)
+            tile = None
+            if os.path.exists(path):
+                size = math.isqrt(os.path.getsize(path) // 2)
+                tile = np.memmap(path, dtype=">i2", mode="r", shape=(size, size))
+            self.tiles[(lat0, lon0)] = tile
+            if len(self.tiles) > self.max_open:
+                self.tiles.popitem(last=False)
+            return tile
+
+    def sample(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        """Bilinear elevation (m) at every (lat, lon) in degrees; any shape."""
+        lat, lon = np.broadcast_arrays(np.asarray(lat, dtype=float), np.asarray(lon, dtype=float))
+        elevation = np.zeros(lat.shape, dtype=np.float32)
+        lat0, lon0 = np.floor(lat).astype(int), np.floor(lon).astype(int)
+        keys = (lat0 + 90) * 360 + (lon0 + 180)
+        for key in np.unique(keys):
+            tile = self.tile(int(key // 360) - 90, int(key % 360) - 180)
+            if tile is None:
+                continue
+            inside = keys == key
+            n = tile.shape[0] - 1
+            # row 0 is the northern edge of the tile, column 0 its western edge
+            row = (lat0[inside] + 1 - lat[inside]) * n
+            col = (lon[inside] - lon0[inside]) * n
+            elevation[inside] = bilinear(tile, row, col, void=SRTM_VOID)
+        return elevation
+
+
+class GeoTiffTerrain:
+    """
+    Elevation from a single-band GeoTIFF in geographic coordinates (EPSG:4326), read
+    through rasterio one window at a time: only the bounding box of the points is loaded.
+    """
+
+    def __init__(self, path: str):
+        if rasterio is None:
+            raise HTTPException(400, "GeoTIFF terrain requires rasterio")
+        self.dataset = rasterio.open(path)
+        if self.dataset.crs is not None and not self.dataset.crs.is_geographic:
+            raise HTTPException(400, "The GeoTIFF terrain must be in geographic (lat/lon) coordinates")
+        self.lock = threading.Lock()
+
+    def sample(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        """Bilinear elevation (m) at every (lat, lon) in degrees; any shape."""
+        lat, lon = np.broadcast_arrays(np.asarray(lat, dtype=float), np.asarray(lon, dtype=float))
+        # fractional (col, row) of the pixel centres
+        col, row = ~self.dataset.transform * (lon, lat)
+        col, row = col - 0.5, row - 0.5
+        top, left = max(int(np.floor(row.min())), 0), max(int(np.floor(col.min())), 0)
+        bottom = min(int(np.floor(row.max())) + 2, self.dataset.height)
+        right = min(int(np.floor(col.max())) + 2, self.dataset.width)
+        if bottom <= top or right <= left:
+            return np.zeros(lat.shape, dtype=np.float32)
+        with self.lock:
+            window = self.dataset.read(1, window=rasterio.windows.Window(left, top, right - left, bottom - top))
+        return bilinear(window, row - top, col - left, void=self.dataset.nodata)
+
+
+def bilinear(grid, row: np.ndarray, col: np.ndarray, void=None) -> np.ndarray:
+    """
+    Bilinear sample of a 2D grid (array or memmap) at fractional (row, col), clamped to it.
+
+    Only the four neighbours of each point are read; neighbours equal to `void` are
+    left out and the others reweighted (0 where all four are voids).
+    """
+    rows, cols = grid.shape
+    r0 = np.clip(np.floor(row).astype(np.intp), 0, rows - 2)
+    c0 = np.clip(np.floor(col).astype(np.intp), 0, cols - 2)
+    fr = np.clip(row - r0, 0, 1)
+    fc = np.clip(col - c0, 0, 1)
+    total = np.zeros(row.shape)
+    weights = np.zeros(row.shape)
+    for dr, dc, weight in ((0, 0, (1 - fr) * (1 - fc)), (0, 1, (1 - fr) * fc),
+                           (1, 0, fr * (1 - fc)), (1, 1, fr * fc)):
+        values = np.asarray(grid[r0 + dr, c0 + dc], dtype=float)
+        if void is not None:
+            weight = np.where(values == void, 0.0, weight)
+        total += weight * values
+        weights += weight
+    return np.divide(total, weights, out=np.zeros(row.shape), where=weights > 0).astype(np.float32)
+
+
+@functools.lru_cache(maxsize=1)
+def terrain_source(path: Optional[str]):
+    """The DEM configured by SIM_TERRAIN: SrtmTiles for a directory, GeoTiffTerrain for a file."""
+    if path is None:
+        raise HTTPException(400, "No terrain configured: set SIM_TERRAIN to a directory of .hgt tiles or a GeoTIFF")
+    if os.path.isdir(path):
+        return SrtmTiles(path)
+    if path.lower().endswith((".tif", ".tiff")):
+        return GeoTiffTerrain(path)
+    raise HTTPException(400, "SIM_TERRAIN must be a directory of .hgt tiles or a .tif file")
+
+
+def radial_points(lat: float, lon: float, azimuth_deg: np.ndarray, distance_km: np.ndarray):
+    """Great-circle destinations (lat, lon in degrees) of every azimuth × distance from (lat, lon)."""
+    phi, lam = np.radians(lat), np.radians(lon)
+    theta = np.radians(azimuth_deg)[:, None]
+    delta = np.asarray(distance_km)[None, :] / EARTH_RADIUS_KM
+    sin_phi2 = np.sin(phi) * np.cos(delta) + np.cos(phi) * np.sin(delta) * np.cos(theta)
+    phi2 = np.arcsin(np.clip(sin_phi2, -1, 1))
+    lam2 = lam + np.arctan2(np.sin(theta) * np.sin(delta) * np.cos(phi), np.cos(delta) - np.sin(phi) * sin_phi2)
+    return np.degrees(phi2), (np.degrees(lam2) + 540) % 360 - 180
+
+
+def effective_earth_radius(climate: str) -> float:
+    """Effective earth radius (km) of the ITM for the surface refractivity of a radio climate."""
+    refractivity = LONGLEY_RICE_REFRACTIVITY.get(climate, 301)
+    return EARTH_RADIUS_KM / (1 - 0.04665 * np.exp(refractivity / 179.3))
+
+
+def knife_edge_loss(nu):
+    """Diffraction loss J(ν) (dB) of a single knife edge (ITU-R P.526), 0 below ν = -0.78."""
+    nu = np.asarray(nu, dtype=float)
+    return np.where(nu > -0.78, 6.9 + 20 * np.log10(np.sqrt((nu - 0.1) ** 2 + 1) + nu - 0.1), 0.0)
+
+
+def terrain_path_parameters(profiles: np.ndarray, step_km: float, height_tx, height_rx,
+                            frequency_MHz: float, earth_radius_km: float) -> dict:
+    """
+    ITM terrain parameters of the paths from the first to the last sample of each profile.
+
+    Args:
+        profiles: (paths, k + 1) terrain elevations (m), sampled every step_km from the transmitter
+        height_tx, height_rx: antenna heights above ground (m)
+
+    Returns:
+        dict of (paths,) arrays: "delta_h" (interdecile range of the terrain around its
+        least-squares line over 10-90 % of the path, m), "effective_height_tx/rx" (antenna
+        height above that line, m), "horizon_tx/rx" (distance to each radio horizon, km;
+        smooth-earth horizon of the effective height on line-of-sight paths) and
+        "diffraction" (knife-edge loss of the most obstructing point, dB)
+    """
+    paths, count = profiles.shape
+    d_km = (count - 1) * step_km
+    x_km = np.arange(count) * step_km
+    z = profiles.astype(float)
+
+    # Least-squares line over the 10 %-90 % part of the path
+    span = slice(int(np.floor(0.1 * (count - 1))), int(np.ceil(0.9 * (count - 1))) + 1)
+    xs, zs = x_km[span], z[:, span]
+    x_mean, z_mean = xs.mean(), zs.mean(axis=1, keepdims=True)
+    variance = ((xs - x_mean) ** 2).sum()
+    slope = ((xs - x_mean) * (zs - z_mean)).sum(axis=1, keepdims=True) / variance if variance > 0 else 0 * z_mean
+    residual = zs - (z_mean + slope * (xs - x_mean))
+    q10, q90 = np.quantile(residual, [0.1, 0.9], axis=1)
+    delta_h = q90 - q10
+    fit_tx = (z_mean - slope * x_mean)[:, 0]
+    fit_rx = (z_mean + slope * (d_km - x_mean))[:, 0]
+    effective_tx = height_tx + np.maximum(z[:, 0] - fit_tx, 0)
+    effective_rx = height_rx + np.maximum(z[:, -1] - fit_rx, 0)
+
+    # Elevation angles (rad) of the interior points seen from each antenna, over a curved earth
+    antenna_tx, antenna_rx = z[:, :1] + height_tx, z[:, -1:] + height_rx
+    interior = x_km[1:-1]
+    horizons = {}
+    for end, antenna, distance, effective in (("tx", antenna_tx, interior, effective_tx),
+                                              ("rx", antenna_rx, d_km - interior, effective_rx)):
+        angle = (z[:, 1:-1] - antenna) / (1000 * distance) - distance / (2 * earth_radius_km)
+        to_other = (antenna_rx - antenna_tx if end == "tx" else antenna_tx - antenna_rx)[:, 0] / (1000 * d_km) \
+            - d_km / (2 * earth_radius_km)
+        smooth = np.sqrt(2 * earth_radius_km * effective / 1000)
+        if interior.size:
+            obstructed = angle.max(axis=1) > to_other
+            horizons[end] = np.where(obstructed, distance[np.argmax(angle, axis=1)], smooth)
+        else:
+            horizons[end] = smooth
+
+    # Knife edge at the interior point that rises highest above the line between the antennas
+    diffraction = np.zeros(paths)
+    if interior.size:
+        bulge = 1000 * interior * (d_km - interior) / (2 * earth_radius_km)
+        clearance = z[:, 1:-1] + bulge - (antenna_tx + (antenna_rx - antenna_tx) * interior / d_km)
+        wavelength = SPEED_OF_LIGHT / (frequency_MHz * 1e6)
+        nu = clearance * np.sqrt(2 * d_km / (wavelength * 1000 * interior * (d_km - interior)))
+        diffraction = knife_edge_loss(nu.max(axis=1))
+
+    return {
+        "delta_h": delta_h,
+        "effective_height_tx": effective_tx,
+        "effective_height_rx": effective_rx,
+        "horizon_tx": horizons["tx"],
+        "horizon_rx": horizons["rx"],
+        "diffraction": diffraction,
+    }
+
+
+def terrain_cost(params: dict) -> CostEstimate:
+    """Cost model of /terrain-longley-rice: the terrain samples, then one path scan per ring."""
+    validate_positive(radials=params["radials"], samples=params["samples"], rings=params["rings"])
+    n = params["radials"] * params["samples"]
+    return CostEstimate(n, 40 * n + 30 * n * params["rings"], 8 * 8 * n, values=7 * params["radials"] * params["rings"])
+
+
+@app.get("/terrain-longley-rice")
+@simulation_endpoint(cache=True, concurrency=HEAVY_CONCURRENCY, cost=terrain_cost)
+def terrain_longley_rice(
+    lat: float,
+    lon: float,
+    frequency_MHz: float = 900,
+    height_tx: float = 30,
+    height_rx: float = 1.5,
+    climate: str = 'Tempéré continental',
+    radius_km: float = 20,
+    radials: int = 360,        # azimuths, evenly spaced from north
+    samples: int = 256,        # terrain samples per radial
+    rings: int = 32,           # receiver distances per radial
+):
+    """
+    Longley-Rice loss around a transmitter over the terrain of the configured DEM.
+
+    Terrain profiles are read along `radials` azimuths with vectorized bilinear sampling of
+    the memory-mapped DEM; for the path to every ring the ITM terrain parameters (Δh,
+    effective heights, radio horizons) are derived from the profile, and the loss is
+    calculate_longley_rice_loss with that Δh and those effective heights. As in the ITM,
+    the horizons split the paths into regions: beyond horizon_tx + horizon_rx (the
+    diffraction region) the knife-edge diffraction of the most obstructing point is added,
+    within it (line of sight) nothing is.
+
+    Args:
+        lat, lon (float): transmitter position in degrees
+        climate (str): radio climate, sets the effective earth radius (LONGLEY_RICE_REFRACTIVITY)
+        radius_km (float): length of the radials
+        radials, samples, rings (int): azimuths, terrain samples per radial, receiver distances
+
+    Returns:
+        dict: "azimuth_deg" (radials), "x" (ring distances, km) and radials × rings arrays
+              "y" (loss in dB), "delta_h_m", "effective_height_tx_m", "effective_height_rx_m",
+              "horizon_tx_km", "horizon_rx_km", "diffraction_db" (0 on line-of-sight paths)
+    """
+    validate_positive(frequency_MHz=frequency_MHz, height_tx=height_tx, height_rx=height_rx, radius_km=radius_km)
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise HTTPException(400, "lat must be in [-90, 90] and lon in [-180, 180]")
+    if climate not in LONGLEY_RICE_REFRACTIVITY:
+        raise HTTPException(400, f"climate must be one of {list(LONGLEY_RICE_REFRACTIVITY)}")
+    if samples < 2 or rings > samples - 1:
+        raise HTTPException(400, "samples must be at least 2 and rings at most samples - 1")
+    if radials * samples > TERRAIN_MAX_SAMPLES:
+        raise HTTPException(400, f"radials × samples must not exceed {TERRAIN_MAX_SAMPLES}")
+
+    azimuth_deg = np.arange(radials) * (360 / radials)
+    step_km = radius_km / (samples - 1)
+    lat_points, lon_points = radial_points(lat, lon, azimuth_deg, np.arange(samples) * step_km)
+    profiles = terrain_source(TERRAIN_PATH).sample(lat_points, lon_points)
+    # the transmitter sits at the start of every radial
+    profiles[:, 0] = profiles[0, 0]
+
+    earth_radius_km = effective_earth_radius(climate)
+    ends = np.unique(np.linspace(0, samples - 1, rings + 1).round().astype(int)[1:])
+    columns = [terrain_path_parameters(profiles[:, :end + 1], step_km, height_tx, height_rx,
+                                       frequency_MHz, earth_radius_km) for end in ends]
+    layers = {name: np.stack([column[name] for column in columns], axis=1) for name in columns[0]}
+
+    distances_km = ends * step_km
+    # Diffraction region: the horizons do not reach each other. Terrain horizons sit on the
+    # samples, so a single obstacle gives horizon_tx + horizon_rx = d within half a step
+    beyond_horizon = layers["horizon_tx"] + layers["horizon_rx"] < distances_km + step_km / 2
+    layers["diffraction"] = np.where(beyond_horizon, layers["diffraction"], 0.0)
+    losses = calculate_longley_rice_loss(
+        distances_km, frequency_MHz, layers["effective_height_tx"], layers["effective_height_rx"],
+        layers["delta_h"], climate) + layers["diffraction"]
+
+    return {
+        "azimuth_deg": azimuth_deg,
+        "x": distances_km,
+        "y": losses,
+        "delta_h_m": layers["delta_h"],
+        "effective_height_tx_m": layers["effective_height_tx"],
+        "effective_height_rx_m": layers["effective_height_rx"],
+        "horizon_tx_km": layers["horizon_tx"],
+        "horizon_rx_km": layers["horizon_rx"],
+        "diffraction_db": layers["diffraction"],
+        "x_label": 'Distance en km',
+        "y_label": 'Perte en db',
+    }
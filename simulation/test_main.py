@@ -0,0 +1,470 @@
+import asyncio
+import json
+import struct
+import tracemalloc
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(main.app)
+
+
+# --------------------------
+# Batch Path Loss
+# --------------------------
+
+BATCH_ANTENNAS = [
+    {"id": 1, "modelType": "/hata-path-loss", "params": {"f": 900, "h_b": 30, "distance": 2}},
+    {"id": 2, "modelType": "/hata-path-loss", "params": {"f": 1800, "h_b": 50, "distance": 3}},
+    {"id": 3, "modelType": "two-ray-ground-path-loss", "params": {"h_b": 20, "threshold_db": 100}},
+    {"id": 4, "modelType": "/fspl-dbLoss", "params": {"distance": 2}},
+    {"id": 5, "modelType": "/Cost231/pathLoss", "params": {"distance": 2, "f": 1800, "environment": "urban"}},
+    {"id": 6, "modelType": "/Cost231/pathLoss", "params": {"distance": 2, "f": 1900}},
+    {"id": 7, "modelType": "/itu-r-p1411-pathLoss", "params": {"distance": 0.5}},
+    {"id": 8, "modelType": "/longley-rice-path-loss", "params": {"distance": 2}},
+    {"id": 9, "modelType": "/nakagami-fading-path-loss", "params": {"seed": 1, "m": 1}},
+    {"id": 10, "modelType": "/nakagami-fading-path-loss", "params": {"seed": 1, "m": 2}},
+    {"id": 11, "modelType": "/nakagami-fading-path-loss", "params": {"seed": 2, "m": 2}},
+    {"id": 12, "modelType": "/rician-path-loss", "params": {"seed": 3}},
+    {"id": 13, "modelType": "/rayleign-path-loss", "params": {"seed": 3}},
+]
+
+
+def test_batch_path_loss_matches_get(client):
+    response = client.post("/batch-path-loss", json={"antennas": BATCH_ANTENNAS})
+    assert response.status_code == 200
+    for antenna, result in zip(BATCH_ANTENNAS, response.json()["results"]):
+        single = client.get("/" + antenna["modelType"].lstrip("/"), params=antenna["params"]).json()
+        assert result["id"] == antenna["id"]
+        assert result["value"] == pytest.approx(single.get("value", single.get("value_dB")), rel=1e-12)
+        assert result["coverageRadius"] == pytest.approx(single["coverageRadius"], rel=1e-12)
+
+
+def test_batch_path_loss_rejects_invalid_params(client):
+    antennas = [{"modelType": "/rayleign-path-loss", "params": {"num_paths": 2.5}}]
+    assert client.post("/batch-path-loss", json={"antennas": antennas}).status_code == 422
+    antennas = [{"modelType": "/no-such-model", "params": {}}]
+    assert client.post("/batch-path-loss", json={"antennas": antennas}).status_code == 400
+
+
+# --------------------------
+# Simulation Executor
+# --------------------------
+
+def test_streams_are_admitted_when_created():
+    executor = main.SimulationExecutor(workers=1, max_queue=1)
+    responses = [executor.stream("test", None, iter([b"a", b"b"])) for _ in range(2)]
+    assert executor.in_flight == 2
+    with pytest.raises(main.HTTPException) as error:
+        executor.stream("test", None, iter([b"c"]))
+    assert error.value.status_code == 429
+
+    async def send_all(response):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        await response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+        return b"".join(message.get("body", b"") for message in sent)
+
+    assert asyncio.run(send_all(responses[0])) == b"ab"
+    assert executor.in_flight == 1
+
+
+def test_unsent_stream_releases_its_slot():
+    executor = main.SimulationExecutor(workers=1, max_queue=0)
+    response = executor.stream("test", None, iter([b"a"]))
+
+    async def gone(message):
+        raise OSError("client went away")
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    with pytest.raises(Exception):
+        asyncio.run(response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, gone))
+    assert executor.in_flight == 0
+    executor.stream("test", None, iter([b"a"]))     # the slot is free again
+
+
+def test_streamed_endpoint_releases_its_slot(client, monkeypatch):
+    executor = main.SimulationExecutor(workers=1, max_queue=0)
+    monkeypatch.setattr(main, "SIMULATION_EXECUTOR", executor)
+    assert client.get("/fspl", params={"stream": "true", "duration": 1}).status_code == 200
+    assert executor.in_flight == 0
+    executor.admit()
+    assert client.get("/fspl", params={"stream": "true", "duration": 1}).status_code == 429
+
+
+# --------------------------
+# Response Encoding
+# --------------------------
+
+def test_msgpack_matches_reference_packer():
+    msgpack = pytest.importorskip("msgpack")
+    payload = {
+        "x": 1.5, "label": "Fréquence (Hz)", "long": "x" * 300, "none": None, "flag": True,
+        "ints": [0, 127, 128, 255, 256, 2**16, 2**32, 2**63, -1, -32, -33, -129, -2**15 - 1, -2**31 - 1],
+        "nested": [{"deep": [1.25, "a"]}], **{f"key{i}": i for i in range(20)},
+    }
+    out = []
+    main.msgpack_pack(payload, out)
+    assert b"".join(out) == msgpack.packb(payload)
+
+
+def octet_arrays(response) -> dict:
+    """Arrays of an application/octet-stream response, from its X-Arrays layout."""
+    arrays = {}
+    for entry in json.loads(response.headers["x-arrays"]):
+        count = int(np.prod(entry["shape"]))
+        arrays[entry["name"]] = np.frombuffer(response.content, entry["dtype"], count,
+                                              entry["offset"]).reshape(entry["shape"])
+    return arrays
+
+
+TIME_DOMAIN = {"showDomain": "domaine temporel", "duration": 0.5, "sampling_interval": 1e-4}
+
+
+def test_binary_encodings_round_trip(client):
+    full = client.get("/fspl", params=TIME_DOMAIN).json()
+    x, y = np.array(full["x"]), np.array(full["y"])
+
+    arrays = octet_arrays(client.get("/fspl", params=TIME_DOMAIN, headers={"accept": "application/octet-stream"}))
+    assert np.array_equal(arrays["x"], x) and np.array_equal(arrays["y"], y)
+
+    response = client.get("/fspl", params=TIME_DOMAIN, headers={"accept": "application/octet-stream;dtype=float32"})
+    arrays = octet_arrays(response)
+    assert arrays["y"].dtype == np.float32
+    assert np.array_equal(arrays["y"], y.astype(np.float32))
+
+    msgpack = pytest.importorskip("msgpack")
+    response = client.get("/fspl", params=TIME_DOMAIN, headers={"accept": "application/msgpack"})
+    assert response.headers["content-type"] == "application/msgpack"
+    decoded = msgpack.unpackb(response.content)
+    for name, expected in (("x", x), ("y", y)):
+        array = decoded[name]
+        values = np.frombuffer(array["data"], array["dtype"]).reshape(array["shape"])
+        assert np.array_equal(values, expected)
+
+
+def test_json_compression_round_trip(client):
+    plain = client.get("/fspl", params=TIME_DOMAIN, headers={"accept-encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    compressed = client.get("/fspl", params=TIME_DOMAIN, headers={"accept-encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.json() == plain.json()
+
+
+def test_unsupported_media_type_is_rejected(client):
+    assert client.get("/fspl", headers={"accept": "text/html"}).status_code == 406
+    assert client.get("/fspl", headers={"accept": "application/octet-stream;dtype=int8"}).status_code == 406
+
+
+def rebuild_axis(axis: dict) -> np.ndarray:
+    """Values of an axis described by describe_uniform_axis."""
+    if axis.get("layout") == "fft":
+        count = axis["count"]
+        k = np.concatenate((np.arange((count - 1) // 2 + 1), np.arange(-(count // 2), 0)))
+        return k * axis["step"]
+    values = axis["start"] + np.arange(axis["count"], dtype=float) * axis["step"]
+    if "stop" in axis:
+        values[-1] = axis["stop"]
+    return values
+
+
+@pytest.mark.parametrize("values", [
+    np.arange(1001) * 1e-4,
+    np.linspace(0.1, 20, 500),
+    np.fft.fftfreq(1024, d=1e-3),
+    np.fft.fftfreq(999, d=0.25),
+])
+def test_uniform_axis_description_is_exact(values):
+    assert np.array_equal(rebuild_axis(main.describe_uniform_axis(values)), values)
+
+
+def test_irregular_axis_is_not_described():
+    assert main.describe_uniform_axis(np.geomspace(0.1, 20, 50)) is None
+
+
+@pytest.mark.parametrize("path, params", [
+    ("/fspl", TIME_DOMAIN),
+    ("/fspl", {"showDomain": "domaine fréquentiel"}),
+    ("/hata", {"duration": 0.5, "sampling_interval": 1e-4}),
+    ("/compare-models", {"num_points": 333}),
+])
+def test_implicit_axis_rebuilds_the_array_axis(client, path, params):
+    full = client.get(path, params=params).json()
+    implicit = client.get(path, params={**params, "axis": "implicit"}).json()
+    assert isinstance(implicit["x"], dict)
+    assert np.array_equal(rebuild_axis(implicit["x"]), np.array(full["x"]))
+    assert implicit["y"] == full["y"]
+
+
+# --------------------------
+# Streaming and Windows
+# --------------------------
+
+SIGNAL_CASES = [
+    ("/fspl", {"showDomain": "domaine temporel"}),
+    ("/hata", {}),
+    ("/itu-r-p1411", {}),
+    ("/weissberger-signal-simulation", {"showDomain": "domaine temporel"}),
+    ("/longley-rice-signal-simulation", {"showDomain": "domaine temporel"}),
+    ("/two-ray-ground-with-signal", {"showDomain": "domaine temporel"}),
+    ("/nakagami-fading-signal", {"seed": 3}),
+    ("/nakagami-fading-signal", {"seed": 3, "speed_kmh": 30}),
+    ("/Cost231/fading", {"apply_fading": "Oui", "speed_kmh": 50, "seed": 1}),
+    ("/weissberger-signal-simulation", {"showDomain": "domaine temporel", "representation": "baseband",
+                                        "d_min": 1, "d_max": 1.01}),
+]
+
+
+def octet_frames(response) -> dict:
+    """Fields of a streamed application/octet-stream response, its frames concatenated."""
+    fields = response.headers["x-stream-fields"].split(",")
+    dtype = np.dtype(response.headers["x-stream-dtype"])
+    blocks, offset, body = [], 0, response.content
+    while offset < len(body):
+        (count,) = struct.unpack_from("<I", body, offset)
+        offset += 4
+        blocks.append([np.frombuffer(body, dtype, count, offset + i * count * dtype.itemsize)
+                       for i in range(len(fields))])
+        offset += len(fields) * count * dtype.itemsize
+    return {field: np.concatenate([block[i] for block in blocks]) for i, field in enumerate(fields)}
+
+
+@pytest.mark.parametrize("path, params", SIGNAL_CASES)
+def test_stream_equals_full_run(client, path, params):
+    # 2.5 blocks of STREAM_BLOCK_SAMPLES
+    params = {**params, "duration": 2.5 * main.STREAM_BLOCK_SAMPLES * 1e-5, "sampling_interval": 1e-5}
+    binary = {"accept": "application/octet-stream"}
+    full = octet_arrays(client.get(path, params=params, headers=binary))
+
+    streamed = octet_frames(client.get(path, params={**params, "stream": "true"}, headers=binary))
+    assert streamed.keys() <= full.keys()
+    for field, values in streamed.items():
+        assert np.array_equal(values, full[field]), field
+
+    lines = client.get(path, params={**params, "stream": "true"}).text.strip().split("\n")
+    assert len(lines) == 3
+    blocks = [json.loads(line) for line in lines]
+    assert np.array_equal(np.concatenate([block["y"] for block in blocks]), full["y"])
+
+
+@pytest.mark.parametrize("path, params", SIGNAL_CASES)
+@pytest.mark.parametrize("t_start, t_end, resolution", [
+    (-0.5, 0.25, None), (None, -1.0, 100), (0.3, None, 7), (-10, 10, None), (0.1234, 0.1734, None),
+])
+def test_window_equals_slice_of_full_run(client, path, params, t_start, t_end, resolution):
+    params = {**params, "duration": 3.7, "sampling_interval": 3e-4}
+    full = client.get(path, params=params).json()
+    x, y = np.array(full["x"]), np.array(full["y"])
+    window = {name: value for name, value in (("t_start", t_start), ("t_end", t_end), ("resolution", resolution))
+              if value is not None}
+    zoomed = client.get(path, params={**params, **window}).json()
+
+    inside = np.ones(x.size, dtype=bool)
+    if t_start is not None:
+        inside &= x >= t_start
+    if t_end is not None:
+        inside &= x <= t_end
+    index = np.flatnonzero(inside)
+    if resolution is not None:
+        index = index[::max(1, -(-index.size // resolution))]
+    assert np.array_equal(zoomed["x"], x[index])
+    assert np.array_equal(zoomed["y"], y[index])
+
+
+def test_window_needs_the_time_domain(client):
+    spectrum = {"showDomain": "domaine fréquentiel"}
+    assert client.get("/fspl", params={**spectrum, "t_start": 0.1}).status_code == 400
+    assert client.get("/fspl", params={**spectrum, "stream": "true"}).status_code == 400
+
+
+# --------------------------
+# Admission Control
+# --------------------------
+
+COST_CASES = [
+    ("/fspl", {"showDomain": "domaine temporel", "duration": 2, "sampling_interval": 1e-5}),
+    ("/nakagami-fading-signal", {"duration": 2, "sampling_interval": 1e-5, "seed": 1}),
+    ("/Cost231/fading", {"duration": 2, "sampling_interval": 1e-5, "apply_fading": "Oui", "speed_kmh": 50,
+                         "seed": 1}),
+    ("/ofdm", {"duration": 2, "sampling_interval": 1e-5, "showAtten": "Oui", "seed": 1}),
+    ("/tdl-channel", {"realizations": 2000, "seed": 1}),
+    ("/fading-statistics", {"envelope": "rician", "shadowing_db": 6, "realizations": 2000, "seed": 1}),
+    ("/ofdm-ber", {"num_symbols": 5000, "esn0_points": 4, "channel_profile": "ETU", "seed": 1}),
+    ("/mimo-capacity", {"realizations": 20000, "seed": 1}),
+    ("/parameter-sweep", {"distance_km": "0.1:10:500", "frequency_MHz": "150:1500:200"}),
+    ("/compare-models", {"num_points": 50000}),
+]
+
+
+@pytest.mark.parametrize("accept", ["application/json", "application/octet-stream"])
+@pytest.mark.parametrize("path, params", COST_CASES)
+def test_estimated_bytes_bound_peak_memory(client, path, params, accept):
+    tracemalloc.start()
+    try:
+        response = client.get(path, params=params, headers={"accept": accept})
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert response.status_code == 200
+    # within 10 %, plus the fixed overhead of the request itself
+    assert peak <= 1.1 * int(response.headers["x-estimated-bytes"]) + 2 * 2**20
+
+
+def test_oversized_request_is_degraded_or_rejected(client, monkeypatch):
+    params = {"showDomain": "domaine temporel", "duration": 1000, "sampling_interval": 1e-7}
+    degraded = client.get("/fspl", params=params)
+    assert degraded.status_code == 200
+    assert degraded.headers["x-degraded"].startswith("sampling_interval=")
+    assert int(degraded.headers["x-estimated-bytes"]) <= main.SIM_MAX_BYTES
+
+    monkeypatch.setattr(main, "SIM_OVERLOAD", "reject")
+    assert client.get("/fspl", params=params).status_code == 400
+
+
+# --------------------------
+# Response Cache
+# --------------------------
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = main.ResponseCache(64 * 2**20)
+    monkeypatch.setattr(main, "RESPONSE_CACHE", cache)
+    return cache
+
+
+def test_cache_hit_and_miss(client, cache):
+    first = client.get("/hata-path-loss", params={"f": 901})
+    assert first.headers["x-cache"] == "MISS"
+    second = client.get("/hata-path-loss", params={"f": 901.0})    # same parameters
+    assert second.headers["x-cache"] == "HIT"
+    assert second.content == first.content
+    assert client.get("/hata-path-loss", params={"f": 902}).headers["x-cache"] == "MISS"
+    # the encoding is part of the key
+    assert client.get("/hata-path-loss", params={"f": 901},
+                      headers={"accept": "application/octet-stream"}).headers["x-cache"] == "MISS"
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 3
+
+
+def test_unseeded_random_responses_are_not_cached(client, cache):
+    assert "x-cache" not in client.get("/nakagami-fading-signal").headers
+    assert client.get("/nakagami-fading-signal", params={"seed": 1}).headers["x-cache"] == "MISS"
+    assert client.get("/nakagami-fading-signal", params={"seed": 1}).headers["x-cache"] == "HIT"
+
+
+def test_cache_evicts_least_recently_used(client, cache):
+    size = len(client.get("/hata-path-loss", params={"f": 1000}).content)
+    cache.max_bytes = int(2.5 * size)
+    for f in (1001, 1002, 1001, 1003):       # 1002 is then the least recently used
+        client.get("/hata-path-loss", params={"f": f})
+    assert cache.stats()["evictions"] == 2
+    assert client.get("/hata-path-loss", params={"f": 1001}).headers["x-cache"] == "HIT"
+    assert client.get("/hata-path-loss", params={"f": 1002}).headers["x-cache"] == "MISS"
+    assert cache.size <= cache.max_bytes
+
+
+# --------------------------
+# Link Simulation
+# --------------------------
+
+@pytest.mark.parametrize("order", main.MODULATION_ORDERS)
+def test_ofdm_ser_matches_awgn_theory(client, order):
+    result = client.get("/ofdm-ber", params={"modulation_order": order, "num_symbols": 2000, "esn0_min": 0,
+                                             "esn0_max": 24, "esn0_points": 7, "seed": 1}).json()
+    ser, theory = np.array(result["ser"]), np.array(result["ser_theory"])
+    symbols = 2000 * 48
+    assert np.all(np.abs(ser - theory) <= 5 * np.sqrt(theory * (1 - theory) / symbols) + 5 / symbols)
+
+
+def test_ofdm_channel_within_cyclic_prefix_is_equalized(client):
+    result = client.get("/ofdm-ber", params={"channel_profile": "EVA", "sampling_interval_ns": 200,
+                                             "esn0_min": 200, "esn0_max": 200, "esn0_points": 1,
+                                             "seed": 3}).json()
+    assert result["ser"] == [0.0]
+
+
+@pytest.mark.parametrize("envelope, params", [
+    ("rayleigh", {}), ("rician", {"k_db": 6}), ("nakagami", {"m": 2.5}),
+])
+def test_fading_statistics_monte_carlo_matches_closed_form(client, envelope, params):
+    query = {"envelope": envelope, **params, "realizations": 400, "samples": 1000, "seed": 2}
+    exact = client.get("/fading-statistics", params={**query, "method": "closed_form"}).json()
+    sampled = client.get("/fading-statistics", params={**query, "method": "monte_carlo"}).json()
+    assert np.all(np.abs(np.array(sampled["y"]) - exact["y"]) <= 5 * np.array(sampled["y_stderr"]) + 1e-5)
+    assert sampled["fade_margin_db"] == pytest.approx(exact["fade_margin_db"], abs=0.2)
+
+
+# --------------------------
+# Terrain
+# --------------------------
+
+def plane(lat, lon):
+    """Elevation of the synthetic tile away from its ridge: a tilted plane."""
+    return 100 * (lat - 33) + 50 * (lon + 8)
+
+
+def ridge(lon):
+    """300 m ridge running north-south along lon = -7.2."""
+    return 300 * np.exp(-((lon + 7.2) / 0.01) ** 2)
+
+
+@pytest.fixture
+def srtm_directory(tmp_path):
+    n = 1201
+    lat = 34 - np.arange(n) / (n - 1)       # row 0 is the northern edge
+    lon = -8 + np.arange(n) / (n - 1)
+    elevation = plane(lat[:, None], lon[None, :]) + ridge(lon[None, :])
+    elevation[600, 600] = main.SRTM_VOID
+    elevation.round().astype(">i2").tofile(tmp_path / "N33W008.hgt")
+    return tmp_path
+
+
+def test_srtm_tiles_sample_bilinearly(srtm_directory):
+    tiles = main.SrtmTiles(str(srtm_directory))
+    lat = np.array([33.2, 33.77, 33.0125, 33.9])
+    lon = np.array([-7.9, -7.3, -7.62, -7.05])
+    # the plane is exact at the posts and bilinear between them, to the 0.5 m rounding
+    assert np.allclose(tiles.sample(lat, lon), plane(lat, lon), atol=0.5)
+    # the void post is left out next to it: its neighbours still give the plane
+    lat, lon = 33.5 - 0.25 / 1200, -7.5 + 0.25 / 1200
+    assert tiles.sample(lat, lon) == pytest.approx(plane(lat, lon), abs=0.5)
+    # no tile (sea) is at 0 m
+    assert np.all(tiles.sample(np.array([10.5, -20.5]), np.array([10.5, 5.5])) == 0)
+
+
+def test_terrain_longley_rice_over_sea_is_plain_longley_rice(client, srtm_directory, monkeypatch, cache):
+    monkeypatch.setattr(main, "TERRAIN_PATH", str(srtm_directory))
+    result = client.get("/terrain-longley-rice", params={"lat": 10, "lon": 10, "radials": 4, "samples": 100,
+                                                         "rings": 4, "radius_km": 20}).json()
+    assert np.all(np.array(result["diffraction_db"]) == 0)
+    flat = main.calculate_longley_rice_loss(np.array(result["x"]), 900, 30, 1.5, 0, "Tempéré continental")
+    assert np.allclose(result["y"], np.broadcast_to(flat, np.shape(result["y"])))
+
+
+def test_ridge_adds_diffraction_behind_it(client, srtm_directory, monkeypatch, cache):
+    monkeypatch.setattr(main, "TERRAIN_PATH", str(srtm_directory))
+    # the ridge is ~18.6 km east of the transmitter
+    result = client.get("/terrain-longley-rice", params={"lat": 33.5, "lon": -7.4, "radials": 4, "samples": 256,
+                                                         "rings": 8, "radius_km": 40}).json()
+    distances, diffraction = np.array(result["x"]), np.array(result["diffraction_db"])
+    east, others = diffraction[1], diffraction[[0, 2, 3]]
+    assert np.all(east[distances < 18] == 0)
+    assert np.all(east[distances > 19] > others[:, distances > 19].max(axis=0) + 20)
+
+
+def test_terrain_needs_a_dem(client, monkeypatch):
+    monkeypatch.setattr(main, "TERRAIN_PATH", None)
+    assert client.get("/terrain-longley-rice", params={"lat": 33.5, "lon": -7.5}).status_code == 400